@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+
+    iceweather: Look up information about Icelandic weather (observations, forecasts,
+    human readable descriptive texts, etc.) using vedur.is xmlweather API.
+
+    Copyright (c) 2019-2023 Miðeind ehf.
+    Original author: Sveinbjorn Thordarson
+
+    BSD 3-clause License (see License.txt).
+
+
+    Offline benchmarks for response parsing, station lookups and
+    end-to-end fetch throughput (against a local stand-in server).
+
+    Responses are built from the recorded XML in benchmarks/fixtures,
+    with the station element repeated for each requested station ID.
+    For each benchmark, the best of several timing runs is reported as
+    operations per second, along with the peak memory allocated during
+    a single operation (measured with tracemalloc).
+
+    Usage:
+
+        python benchmarks/bench.py [-k FILTER] [--json FILE]
+                                   [--compare FILE] [--tolerance 0.2]
+
+    Use --json to save results and --compare to check a later run
+    against them; the script exits with status 1 if any benchmark is
+    slower than the saved result by more than the tolerance.
+
+"""
+
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import argparse
+import itertools
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from iceweather import weather  # noqa: E402
+from iceweather.stations import station_table  # noqa: E402
+
+_FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Minimum duration of each timing run (seconds) and number of runs
+_MIN_RUN_TIME = 0.2
+_REPEAT = 3
+
+# Root element of the per-station (or per-text) elements in each fixture
+_ELEMENT_TAGS = {"obs": "station", "forec": "station", "txt": "text"}
+
+Benchmark = Tuple[str, Callable[[], object]]
+
+
+class Fixture:
+    """A recorded API response, split into the document head, a template
+    for the station (or text) element and the document tail, so that
+    responses can be built for any list of IDs."""
+
+    def __init__(self, endpoint: str) -> None:
+        with open(os.path.join(_FIXTURES_DIR, f"{endpoint}.xml"), "rb") as f:
+            doc = f.read()
+        tag = _ELEMENT_TAGS[endpoint].encode()
+        start = doc.index(b"<" + tag + b" ")
+        end = doc.rindex(b"</" + tag + b">") + len(tag) + 3
+        self.head, self.tail = doc[:start], doc[end:]
+        self.element = re.sub(rb'\bid="[^"]*"', b'id="{id}"', doc[start:end], count=1)
+
+    def response(self, ids: Sequence[str]) -> bytes:
+        return b"".join(
+            [self.head]
+            + [self.element.replace(b"{id}", i.encode()) for i in ids]
+            + [self.tail]
+        )
+
+
+_FIXTURES = {endpoint: Fixture(endpoint) for endpoint in _ELEMENT_TAGS}
+
+
+def _chunks(data: bytes, size: int = weather._STREAM_CHUNK_SIZE) -> List[bytes]:
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serves fixture-based responses for any IDs in the query string."""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+    # Headers and body are written separately; without this, Nagle's
+    # algorithm and delayed ACKs add ~40 ms to each small response
+    disable_nagle_algorithm = True
+    _responses: Dict[Tuple[str, str], bytes] = {}
+
+    def do_GET(self) -> None:
+        query = parse_qs(urlparse(self.path).query)
+        key = (query["type"][0], query["ids"][0])
+        body = self._responses.get(key)
+        if body is None:
+            body = _FIXTURES[key[0]].response(key[1].split(";"))
+            self._responses[key] = body
+        self.send_response(200)
+        self.send_header("Content-Type", "text/xml; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+def _start_server() -> ThreadingHTTPServer:
+    """Start the stand-in server on a free local port and point the
+    library's API URLs at it."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    weather.set_base_url(f"http://127.0.0.1:{server.server_address[1]}/")
+    return server
+
+
+def _all_ids() -> List[str]:
+    return [str(i) for i in station_table().ids]
+
+
+def parse_benchmarks() -> Iterator[Benchmark]:
+    def parse(endpoint: str, ids: List[str]) -> Callable[[], object]:
+        chunks = _chunks(_FIXTURES[endpoint].response(ids))
+        return lambda: list(weather._parse_stream(endpoint, chunks))
+
+    ids = _all_ids()
+    for endpoint in ("obs", "forec"):
+        for n in (1, 50, len(ids)):
+            yield f"parse {endpoint} x{n}", parse(endpoint, ids[:n])
+    yield "parse txt x5", parse("txt", ["2", "3", "5", "6", "7"])
+
+
+def lookup_benchmarks() -> Iterator[Benchmark]:
+    from iceweather import (
+        closest_stations,
+        closest_stations_many,
+        id_for_station,
+        station_for_id,
+    )
+
+    rnd = random.Random(42)
+    points = [(rnd.uniform(63.3, 66.6), rnd.uniform(-24.5, -13.5)) for _ in range(1000)]
+    cycle = itertools.cycle(points)
+    yield "closest_stations", lambda: closest_stations(*next(cycle))
+    yield "closest_stations limit=5", lambda: closest_stations(*next(cycle), limit=5)
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        yield "closest_stations_many x1000", lambda: closest_stations_many(points)
+    table = station_table()
+    ids = itertools.cycle(table.ids)
+    names = itertools.cycle(table.names)
+    yield "station_for_id", lambda: station_for_id(next(ids))
+    yield "id_for_station", lambda: id_for_station(next(names))
+
+
+def fetch_benchmarks() -> Iterator[Benchmark]:
+    from iceweather import (
+        forecast_for_stations,
+        observation_for_all_stations,
+        observation_for_station,
+        observation_for_stations,
+    )
+
+    _start_server()
+    ids = _all_ids()
+    yield "fetch obs x1", lambda: observation_for_station(1, use_cache=False)
+    yield "fetch obs x50", lambda: observation_for_stations(ids[:50], use_cache=False)
+    yield "fetch obs all", lambda: observation_for_all_stations(use_cache=False)
+    yield "fetch forec x50", lambda: forecast_for_stations(ids[:50], use_cache=False)
+    yield "fetch obs all (cached)", lambda: observation_for_all_stations()
+
+
+def measure(fn: Callable[[], object]) -> Dict[str, float]:
+    """Time fn, returning operations per second (best of several runs)
+    and the peak memory allocated by a single call, in KiB."""
+
+    def run(number: int) -> float:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        return time.perf_counter() - t0
+
+    fn()  # Warm up
+    # Find a number of calls which takes at least _MIN_RUN_TIME
+    number = 1
+    elapsed = run(number)
+    while elapsed < _MIN_RUN_TIME:
+        number = max(number * 2, int(number * 1.2 * _MIN_RUN_TIME / max(elapsed, 1e-9)))
+        elapsed = run(number)
+    best = min([elapsed] + [run(number) for _ in range(_REPEAT - 1)]) / number
+
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"ops_per_sec": 1.0 / best, "peak_kib": peak / 1024}
+
+
+def _compare(
+    results: Dict[str, Dict[str, float]], baseline_file: str, tolerance: float
+) -> List[str]:
+    """Return descriptions of benchmarks slower than the baseline."""
+    with open(baseline_file, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    slower = []
+    for name, r in results.items():
+        b = baseline.get(name)
+        if b and r["ops_per_sec"] < b["ops_per_sec"] * (1.0 - tolerance):
+            slower.append(
+                f"{name}: {r['ops_per_sec']:,.1f} ops/sec "
+                f"(baseline {b['ops_per_sec']:,.1f})"
+            )
+    return slower
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Run iceweather benchmarks offline.")
+    ap.add_argument("-k", dest="filter", help="only run benchmarks containing FILTER")
+    ap.add_argument("--json", help="save results to a JSON file")
+    ap.add_argument("--compare", help="compare results with a saved JSON file")
+    ap.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="allowed relative slowdown when comparing (default 0.2)",
+    )
+    args = ap.parse_args(argv)
+
+    results: Dict[str, Dict[str, float]] = {}
+    print(f"{'benchmark':<30} {'ops/sec':>14} {'usec/op':>12} {'peak KiB':>10}")
+    for group in (parse_benchmarks, lookup_benchmarks, fetch_benchmarks):
+        for name, fn in group():
+            if args.filter and args.filter not in name:
+                continue
+            r = results[name] = measure(fn)
+            print(
+                f"{name:<30} {r['ops_per_sec']:>14,.1f} "
+                f"{1e6 / r['ops_per_sec']:>12,.1f} {r['peak_kib']:>10,.1f}"
+            )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        slower = _compare(results, args.compare, args.tolerance)
+        if slower:
+            print("\nSlower than baseline:\n  " + "\n  ".join(slower))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,30 +10,214 @@
     BSD 3-clause License (see License.txt).
 
 
-    Try to fetch observation data from all weather stations.
+    Check observation data from all weather stations, in batched
+    concurrent requests, and report on each station's health.
+
+    Usage:
+
+        python check_stations.py [--report FILE] [--dead-list FILE]
+                                 [--threshold N] [--max-age HOURS]
+                                 [--chunk-size 50] [--workers 8]
+
+    A station is healthy if it returns a valid observation, without
+    errors, made within --max-age hours. The JSON report lists each
+    station's status, error message, valid flag, observation time and
+    age. If the report file already exists, the number of consecutive
+    failed checks per station is carried over from it, so that running
+    the check regularly (e.g. daily) identifies stations which never
+    return valid data. Stations which have failed --threshold checks in
+    a row are written to the --dead-list file, which can be loaded with
+    iceweather.load_dead_stations() to skip them in closest station
+    lookups.
+
+    If the API call for a chunk of stations fails, its stations are
+    reported as "unavailable" with the call's error, and their failure
+    counts are left unchanged: an API outage says nothing about the
+    stations. The other chunks are still checked. The circuit breaker
+    is disabled, so that a few failed calls don't fail the whole run.
 
 """
 
-from pprint import pprint
+from typing import Dict, List, Optional, Tuple
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 
-from iceweather.stations import STATIONS
-from iceweather import observation_for_station
+from requests import RequestException
 
-for s in STATIONS:
-    sid = s["id"]
-    name = s["name"]
-    # print(f"Checking {sid}: {name}")
-    d = None
+from iceweather import (
+    configure_circuit_breaker,
+    observation_for_stations,
+    station_list,
+)
+from iceweather.records import parse_time
+
+_DEFAULT_MAX_AGE = 24.0  # Hours
+_DEFAULT_THRESHOLD = 3
+_DEFAULT_CHUNK_SIZE = 50
+_DEFAULT_WORKERS = 8
+
+
+def _fetch_chunk(ids: List[int], lang: str) -> Tuple[Dict[str, Dict], Optional[str]]:
+    """Fetch observations for a chunk of stations in one API call. Returns
+    the results by station ID, and the error message if the call failed."""
     try:
-        d = observation_for_station(s["id"])
-        err = d["results"][0]["err"]
-        valid = d["results"][0]["valid"]
-        if err or not valid:
-            raise Exception(f"Error fetching data for station {sid}:{name}: {err}")
-    except Exception as e:
-        print(e)
-    if d:
-        pass
-        # pprint(d)
-    else:
-        print("ERROR !!!! " + str(s))
+        results = observation_for_stations(
+            ids, lang, use_cache=False, chunk_size=len(ids)
+        )["results"]
+    except RequestException as e:
+        return {}, str(e)
+    return {r.get("id"): r for r in results}, None
+
+
+def check_stations(
+    lang: str = "is",
+    max_age: float = _DEFAULT_MAX_AGE,
+    now: Optional[datetime] = None,
+    chunk_size: int = _DEFAULT_CHUNK_SIZE,
+    workers: int = _DEFAULT_WORKERS,
+) -> List[Dict]:
+    """Fetch observations for all stations, in concurrent calls for
+    chunk_size stations each, and return a report entry for each, with
+    status "ok", "error" (error message from the API), "invalid" (no
+    valid data), "missing" (no result), "old" (observation older than
+    max_age hours) or "unavailable" (the API call for the station's
+    chunk failed, with its error message)."""
+    now = now or datetime.now(timezone.utc)
+    stations = station_list()
+    ids = [s["id"] for s in stations]
+    chunks = [ids[i : i + chunk_size] for i in range(0, len(ids), chunk_size)]
+    by_id: Dict[str, Dict] = {}
+    call_errors: Dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        fetched = executor.map(lambda c: _fetch_chunk(c, lang), chunks)
+        for chunk, (results, error) in zip(chunks, fetched):
+            by_id.update(results)
+            if error is not None:
+                call_errors.update((str(i), error) for i in chunk)
+
+    report = []
+    for s in stations:
+        r = by_id.get(str(s["id"]))
+        entry: Dict = {
+            "id": s["id"],
+            "name": s["name"],
+            "status": "ok",
+            "err": None,
+            "valid": None,
+            "time": None,
+            "age": None,
+        }
+        error = call_errors.get(str(s["id"]))
+        if error is not None:
+            entry["status"] = "unavailable"
+            entry["err"] = error
+        elif r is None:
+            entry["status"] = "missing"
+        else:
+            t = parse_time(r.get("time"))
+            entry["err"] = r.get("err") or None
+            entry["valid"] = r.get("valid") == "1"
+            if t is not None:
+                entry["time"] = t.isoformat()
+                entry["age"] = round((now - t).total_seconds())
+            if entry["err"]:
+                entry["status"] = "error"
+            elif not entry["valid"] or t is None:
+                entry["status"] = "invalid"
+            elif entry["age"] > max_age * 3600:
+                entry["status"] = "old"
+        report.append(entry)
+    return report
+
+
+def _previous_failures(path: str) -> Dict[int, int]:
+    """Read consecutive failure counts from a previous report, if any."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        previous = json.load(f)
+    return {s["id"]: s.get("failures", 0) for s in previous.get("stations", [])}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Check all iceweather stations.")
+    ap.add_argument("--report", help="write (or update) a JSON report")
+    ap.add_argument("--dead-list", help="write a JSON list of dead station IDs")
+    ap.add_argument(
+        "--threshold",
+        type=int,
+        default=_DEFAULT_THRESHOLD,
+        help="consecutive failed checks for a station to count as dead "
+        f"(default {_DEFAULT_THRESHOLD})",
+    )
+    ap.add_argument(
+        "--max-age",
+        type=float,
+        default=_DEFAULT_MAX_AGE,
+        help=f"max observation age in hours (default {_DEFAULT_MAX_AGE:g})",
+    )
+    ap.add_argument("--lang", default="is", choices=("is", "en"))
+    ap.add_argument(
+        "--chunk-size",
+        type=int,
+        default=_DEFAULT_CHUNK_SIZE,
+        help=f"stations per API call (default {_DEFAULT_CHUNK_SIZE})",
+    )
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=_DEFAULT_WORKERS,
+        help=f"concurrent API calls (default {_DEFAULT_WORKERS})",
+    )
+    args = ap.parse_args(argv)
+
+    # Check each station, rather than failing fast while the API is down
+    configure_circuit_breaker(enabled=False, serve_stale=False)
+    now = datetime.now(timezone.utc)
+    stations = check_stations(
+        args.lang, args.max_age, now, args.chunk_size, args.workers
+    )
+
+    failures = _previous_failures(args.report) if args.report else {}
+    for s in stations:
+        previous = failures.get(s["id"], 0)
+        if s["status"] == "ok":
+            s["failures"] = 0
+        elif s["status"] == "unavailable":
+            # Not the station's fault, so neither a success nor a failure
+            s["failures"] = previous
+        else:
+            s["failures"] = previous + 1
+        if s["status"] not in ("ok", "unavailable"):
+            print(f"{s['id']}: {s['name']}: {s['status']} {s['err'] or ''}".rstrip())
+    for err in sorted({s["err"] for s in stations if s["status"] == "unavailable"}):
+        print(f"API call failed: {err}")
+    dead = sorted(s["id"] for s in stations if s["failures"] >= args.threshold)
+    ok = sum(s["status"] == "ok" for s in stations)
+    unavailable = sum(s["status"] == "unavailable" for s in stations)
+    print(
+        f"{ok} of {len(stations)} stations OK, {unavailable} unavailable, "
+        f"{len(dead)} dead"
+    )
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(
+                {"checked": now.isoformat(), "stations": stations, "dead": dead},
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+    if args.dead_list:
+        with open(args.dead_list, "w", encoding="utf-8") as f:
+            json.dump(dead, f)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,21 +9,95 @@
 
 """
 
-from .weather import (
-    observation_for_stations,
-    observation_for_station,
-    observation_for_stations,
-    observation_for_closest,
-    forecast_for_stations,
-    forecast_for_station,
-    forecast_for_closest,
-    forecast_text,
-    station_list,
-    closest_stations,
-    id_for_station,
-    station_for_id,
-    STATIONS,
-)
+from typing import Any, Dict, List
+
+import importlib
+
+# Public names and the submodules they are imported from on first access.
+# Importing the package itself is cheap: station lookups (lookup.py) don't
+# load requests or the XML parser, which are only imported along with
+# weather.py, on first access to one of its names. Submodules (e.g.
+# iceweather.weather) are also imported on first attribute access.
+_LAZY_IMPORTS: Dict[str, str] = {
+    "observation_for_stations": "weather",
+    "observation_for_station": "weather",
+    "observation_for_closest": "weather",
+    "observation_for_closest_many": "weather",
+    "observation_for_all_stations": "weather",
+    "forecast_for_stations": "weather",
+    "forecast_for_station": "weather",
+    "forecast_for_closest": "weather",
+    "forecast_for_closest_many": "weather",
+    "forecast_text": "weather",
+    "iter_observations": "weather",
+    "iter_forecasts": "weather",
+    "iter_texts": "weather",
+    "configure_http": "weather",
+    "make_session": "weather",
+    "set_session": "weather",
+    "set_base_url": "weather",
+    "configure_cache": "weather",
+    "cache_stats": "weather",
+    "invalidate_cache": "weather",
+    "clear_cache": "weather",
+    "configure_fetch": "weather",
+    "configure_circuit_breaker": "weather",
+    "circuit_state": "weather",
+    "CircuitOpenError": "breaker",
+    "configure_rate_limit": "ratelimit",
+    "rate_limits": "ratelimit",
+    "RateLimit": "ratelimit",
+    "PARAMS": "weather",
+    "station_list": "lookup",
+    "closest_stations": "lookup",
+    "closest_stations_many": "lookup",
+    "id_for_station": "lookup",
+    "stations_for_name": "lookup",
+    "station_for_id": "lookup",
+    "set_dead_stations": "lookup",
+    "load_dead_stations": "lookup",
+    "dead_stations": "lookup",
+    "STATIONS": "stations",
+    "Observation": "records",
+    "ForecastStep": "records",
+    "StationForecast": "records",
+    "forecast_columns": "columnar",
+    "observation_at": "interpolate",
+    "observations_at": "interpolate",
+    "Grid": "grid",
+    "grid_observations": "grid",
+    "Refresher": "refresher",
+    "ObservationStore": "store",
+    "CallRecord": "metrics",
+    "add_call_hook": "metrics",
+    "remove_call_hook": "metrics",
+    "metrics_snapshot": "metrics",
+    "prometheus_metrics": "metrics",
+    "reset_metrics": "metrics",
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        if not name.startswith("_"):
+            try:
+                # Importing a submodule also sets it as a package attribute
+                return importlib.import_module(f".{name}", __name__)
+            except ModuleNotFoundError as e:
+                if e.name != f"{__name__}.{name}":
+                    raise
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
+
 
 __version__ = "0.2.3"
 __author__ = "Miðeind ehf."
@@ -0,0 +1,397 @@
+"""
+
+    iceweather: Look up information about Icelandic weather (observations, forecasts,
+    human readable descriptive texts, etc.) using vedur.is xmlweather API.
+
+    Copyright (c) 2019-2023 Miðeind ehf.
+    Original author: Sveinbjorn Thordarson
+
+    BSD 3-clause License (see License.txt).
+
+
+    Asynchronous (asyncio) versions of the weather API functions.
+    Requires aiohttp (pip install iceweather[aio]).
+
+"""
+
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
+
+import asyncio
+import time
+import weakref
+
+import aiohttp
+from requests import RequestException
+
+from . import weather
+from .metrics import CallRecord, recording
+from .ratelimit import limited_async
+from .weather import (
+    _ALL_PARAMS,
+    _ArgType,
+    _DEFAULT_LANG,
+    _ParamsType,
+    _RETRY_STATUS_CODES,
+    _STREAM_CHUNK_SIZE,
+    _SUPPORTED_LANGS,
+    _TEXT_LANG,
+    _api_url,
+    _arg_to_str_list,
+    _cached_results,
+    _chunked,
+    _circuit,
+    _closest_candidates,
+    _merge_results,
+    _params_str,
+    _pick_result,
+    _stale_results,
+    _station_ids,
+    _StreamParser,
+    closest_stations,
+)
+
+_DEFAULT_CONCURRENCY: int = 10
+
+# User-supplied session, if any (see set_session)
+_user_session: Optional[aiohttp.ClientSession] = None
+# Default sessions, per event loop, with an async generator that closes
+# the session when the loop shuts down (see _close_on_shutdown)
+_sessions: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_concurrency: int = _DEFAULT_CONCURRENCY
+# Semaphore limiting concurrent API calls, per event loop
+_semaphores: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def configure(concurrency: int = _DEFAULT_CONCURRENCY) -> None:
+    """Set the maximum number of concurrent API calls made by this module."""
+    global _concurrency
+    if concurrency < 1:
+        raise ValueError("concurrency must be positive")
+    _concurrency = concurrency
+    _semaphores.clear()
+
+
+def set_session(session: Optional[aiohttp.ClientSession]) -> None:
+    """Use the given aiohttp session for all calls to the weather API.
+    Passing None reverts to a default session, created on next use.
+    A user-supplied session is not closed by close()."""
+    global _user_session
+    _user_session = session
+
+
+def _timeout() -> aiohttp.ClientTimeout:
+    """Convert the HTTP timeout setting in weather.py for aiohttp."""
+    t = weather._timeout
+    if isinstance(t, tuple):
+        return aiohttp.ClientTimeout(sock_connect=t[0], sock_read=t[1])
+    return aiohttp.ClientTimeout(total=t)
+
+
+async def _close_on_shutdown(session: aiohttp.ClientSession) -> AsyncIterator[None]:
+    """Async generator which closes the session when it is finalized.
+    Event loops finalize their async generators before closing (as in
+    asyncio.run()), so the session is closed while its loop still runs."""
+    try:
+        yield
+    finally:
+        await session.close()
+
+
+async def _get_session() -> aiohttp.ClientSession:
+    """Return the session used for API calls, creating a pooled keep-alive
+    session for the running event loop if needed."""
+    if _user_session is not None:
+        return _user_session
+    loop = asyncio.get_running_loop()
+    entry = _sessions.get(loop)
+    if entry is not None and not entry[0].closed:
+        return entry[0]
+    connector = aiohttp.TCPConnector(limit=weather._pool_size)
+    session = aiohttp.ClientSession(connector=connector, timeout=_timeout())
+    closer = _close_on_shutdown(session)
+    _sessions[loop] = (session, closer)
+    await closer.__anext__()
+    return session
+
+
+def _semaphore() -> asyncio.Semaphore:
+    """Return the semaphore limiting concurrent API calls in the running loop."""
+    loop = asyncio.get_running_loop()
+    sem = _semaphores.get(loop)
+    if sem is None:
+        sem = _semaphores[loop] = asyncio.Semaphore(_concurrency)
+    return sem
+
+
+async def close() -> None:
+    """Close the default session for the running event loop. This is done
+    automatically when the loop shuts down, if it finalizes async
+    generators (as asyncio.run() does); otherwise call it before then."""
+    entry = _sessions.pop(asyncio.get_running_loop(), None)
+    if entry is not None:
+        await entry[1].aclose()
+
+
+async def _fetch_chunk(
+    endpoint: str, ids: List[str], lang: str, params: str = _ALL_PARAMS
+) -> List[Dict]:
+    """Use aiohttp to fetch results for a list of IDs in a single API call,
+    parsing the response incrementally as it is downloaded. The call is
+    subject to the circuit breaker (see weather.configure_circuit_breaker)."""
+    url = _api_url(endpoint, ids, lang, params)
+    with _circuit(endpoint, url):
+        return await _fetch_with_retries(endpoint, url, len(ids))
+
+
+async def _fetch_with_retries(endpoint: str, url: str, num_ids: int) -> List[Dict]:
+    """Fetch and parse results from an API URL. Retries connection errors
+    and 5xx responses with exponential backoff, using the settings from
+    weather.configure_http()."""
+    retries = weather._retries
+    attempt = 0
+    while True:
+        # Each attempt is recorded as a separate call in the metrics
+        with recording(CallRecord(endpoint, url, num_ids)) as record:
+            try:
+                async with _semaphore(), limited_async(endpoint, record):
+                    t0 = time.perf_counter()
+                    session = await _get_session()
+                    async with session.get(url) as result:
+                        status = result.status
+                        if status == 200:
+                            return await _read_results(endpoint, result, record, t0)
+                record.error = f"API status code {status}"
+                if status not in _RETRY_STATUS_CODES or attempt >= retries:
+                    raise RequestException(f"API status code {status} for URL: {url}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                record.error = str(e) or type(e).__name__
+                if attempt >= retries:
+                    raise RequestException(
+                        f"API call failed for URL: {url}: {e}"
+                    ) from e
+        await asyncio.sleep(weather._backoff_factor * (2**attempt))
+        attempt += 1
+
+
+async def _read_results(
+    endpoint: str, result: aiohttp.ClientResponse, record: CallRecord, t0: float
+) -> List[Dict]:
+    """Read and parse a response body as it is downloaded, measuring
+    the time spent waiting for each chunk (since t0) and parsing it."""
+    parser = _StreamParser(endpoint)
+    results: List[Dict] = []
+    async for data in result.content.iter_chunked(_STREAM_CHUNK_SIZE):
+        t1 = time.perf_counter()
+        record.received(t1 - t0, len(data))
+        parsed = parser.feed(data)
+        t0 = time.perf_counter()
+        record.parsed(t0 - t1, len(parsed))
+        results.extend(parsed)
+    parsed = parser.close()
+    record.parsed(time.perf_counter() - t0, len(parsed))
+    results.extend(parsed)
+    return results
+
+
+async def _fetch_chunk_or_stale(
+    endpoint: str, ids: List[str], lang: str, params: str, use_cache: bool
+) -> List[Dict]:
+    """Fetch results for a chunk of IDs, falling back on stale cached
+    results if the API call fails (when using the cache)."""
+    try:
+        return await _fetch_chunk(endpoint, ids, lang, params)
+    except RequestException as e:
+        if not use_cache:
+            raise
+        return _stale_results(endpoint, ids, lang, params, e)
+
+
+async def _fetch_results(
+    endpoint: str,
+    ids: List[str],
+    lang: str,
+    use_cache: bool = True,
+    chunk_size: Optional[int] = None,
+    params: str = _ALL_PARAMS,
+) -> List[Dict]:
+    """Fetch parsed results for the given IDs from an API endpoint,
+    using cached results where available. IDs are split into chunks
+    (see weather.configure_fetch) which are fetched concurrently."""
+    use_cache = use_cache and weather._CACHE.enabled
+    found, missing = _cached_results(endpoint, ids, lang, params, use_cache)
+    fetched: List[Dict] = []
+    if missing:
+        chunks = await asyncio.gather(
+            *(
+                _fetch_chunk_or_stale(endpoint, chunk, lang, params, use_cache)
+                for chunk in _chunked(missing, chunk_size or weather._chunk_size)
+            )
+        )
+        for results in chunks:
+            fetched.extend(results)
+    return _merge_results(endpoint, ids, lang, params, found, fetched, use_cache)
+
+
+async def observation_for_stations(
+    station_ids: _ArgType,
+    lang: str = _DEFAULT_LANG,
+    use_cache: bool = True,
+    chunk_size: Optional[int] = None,
+    params: _ParamsType = None,
+) -> Dict:
+    """Returns weather observations for the given station IDs.
+    See weather.observation_for_stations."""
+    assert lang in _SUPPORTED_LANGS
+
+    ids = _arg_to_str_list(station_ids)
+    p = _params_str(params)
+    return {"results": await _fetch_results("obs", ids, lang, use_cache, chunk_size, p)}
+
+
+async def observation_for_station(
+    station_id: Union[str, int],
+    lang: str = _DEFAULT_LANG,
+    use_cache: bool = True,
+    params: _ParamsType = None,
+) -> Dict:
+    """Returns weather observations for the given station ID.
+    Wrapper for observation_for_stations."""
+    assert isinstance(station_id, (str, int))
+
+    return await observation_for_stations(station_id, lang, use_cache, params=params)
+
+
+async def _result_for_closest(
+    endpoint: str,
+    lat: float,
+    lon: float,
+    lang: str,
+    num_stations_to_try: int,
+    use_cache: bool,
+    params: str = _ALL_PARAMS,
+) -> Tuple[Dict, Dict]:
+    """Fetch results for the closest stations in a single API call
+    and return the first valid one."""
+    stations = closest_stations(lat, lon, limit=max(num_stations_to_try, 1))
+    ids = _station_ids(stations)
+    results = await _fetch_results(endpoint, ids, lang, use_cache, params=params)
+    return _pick_result(stations, {r.get("id", ""): r for r in results})
+
+
+async def _results_for_closest_many(
+    endpoint: str,
+    points: Iterable[Tuple[float, float]],
+    lang: str,
+    num_stations_to_try: int,
+    use_cache: bool,
+    params: str = _ALL_PARAMS,
+) -> List[Tuple[Dict, Dict]]:
+    """Fetch results for the closest stations to all points in a single
+    (chunked) batch and pick the first valid one for each point."""
+    candidates, ids = _closest_candidates(points, num_stations_to_try)
+    results = await _fetch_results(endpoint, ids, lang, use_cache, params=params)
+    by_id = {r.get("id", ""): r for r in results}
+    return [_pick_result(stations, by_id) for stations in candidates]
+
+
+async def observation_for_closest(
+    lat: float,
+    lon: float,
+    lang: str = _DEFAULT_LANG,
+    num_stations_to_try: int = 3,
+    use_cache: bool = True,
+    params: _ParamsType = None,
+) -> Tuple[Dict, Dict]:
+    """Returns weather observation from closest weather station given coordinates.
+    Tries up to num_stations_to_try stations, returns the first one that works."""
+    assert lang in _SUPPORTED_LANGS
+
+    return await _result_for_closest(
+        "obs", lat, lon, lang, num_stations_to_try, use_cache, _params_str(params)
+    )
+
+
+async def observation_for_closest_many(
+    points: Iterable[Tuple[float, float]],
+    lang: str = _DEFAULT_LANG,
+    num_stations_to_try: int = 3,
+    use_cache: bool = True,
+    params: _ParamsType = None,
+) -> List[Tuple[Dict, Dict]]:
+    """Batch version of observation_for_closest, for many (lat, lon) points.
+    See weather.observation_for_closest_many."""
+    assert lang in _SUPPORTED_LANGS
+
+    return await _results_for_closest_many(
+        "obs", points, lang, num_stations_to_try, use_cache, _params_str(params)
+    )
+
+
+async def forecast_for_stations(
+    station_ids: _ArgType,
+    lang: str = _DEFAULT_LANG,
+    use_cache: bool = True,
+    chunk_size: Optional[int] = None,
+    params: _ParamsType = None,
+) -> Dict:
+    """Returns weather forecast from given weather station IDs."""
+    assert lang in _SUPPORTED_LANGS
+
+    ids = _arg_to_str_list(station_ids)
+    p = _params_str(params)
+    return {
+        "results": await _fetch_results("forec", ids, lang, use_cache, chunk_size, p)
+    }
+
+
+async def forecast_for_station(
+    station_id: Union[str, int],
+    lang: str = _DEFAULT_LANG,
+    use_cache: bool = True,
+    params: _ParamsType = None,
+) -> Dict:
+    """Returns weather forecast from given weather station ID.
+    Wrapper for forecast_for_stations."""
+    assert isinstance(station_id, (str, int))
+
+    return await forecast_for_stations(station_id, lang, use_cache, params=params)
+
+
+async def forecast_for_closest(
+    lat: float,
+    lon: float,
+    lang: str = _DEFAULT_LANG,
+    num_stations_to_try: int = 3,
+    use_cache: bool = True,
+    params: _ParamsType = None,
+) -> Tuple[Dict, Dict]:
+    """Returns weather forecast from closest weather station given coordinates.
+    Tries up to num_stations_to_try stations, returns the first one that works."""
+    assert lang in _SUPPORTED_LANGS
+
+    return await _result_for_closest(
+        "forec", lat, lon, lang, num_stations_to_try, use_cache, _params_str(params)
+    )
+
+
+async def forecast_for_closest_many(
+    points: Iterable[Tuple[float, float]],
+    lang: str = _DEFAULT_LANG,
+    num_stations_to_try: int = 3,
+    use_cache: bool = True,
+    params: _ParamsType = None,
+) -> List[Tuple[Dict, Dict]]:
+    """Batch version of forecast_for_closest, for many (lat, lon) points.
+    See weather.observation_for_closest_many."""
+    assert lang in _SUPPORTED_LANGS
+
+    return await _results_for_closest_many(
+        "forec", points, lang, num_stations_to_try, use_cache, _params_str(params)
+    )
+
+
+async def forecast_text(types: _ArgType, use_cache: bool = True) -> Dict:
+    """Request a descriptive text from the weather API.
+    See weather.forecast_text for text types."""
+    t = _arg_to_str_list(types)
+    return {"results": await _fetch_results("txt", t, _TEXT_LANG, use_cache, params="")}
@@ -0,0 +1,101 @@
+"""
+
+    iceweather: Look up information about Icelandic weather (observations, forecasts,
+    human readable descriptive texts, etc.) using vedur.is xmlweather API.
+
+    Copyright (c) 2019-2023 Miðeind ehf.
+    Original author: Sveinbjorn Thordarson
+
+    BSD 3-clause License (see License.txt).
+
+
+    Circuit breaker for calls to the weather API, which fails calls fast
+    while the API is unavailable instead of letting them wait for timeouts.
+
+"""
+
+from typing import Callable
+
+import threading
+import time
+
+from requests import RequestException
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpenError(RequestException):
+    """Raised instead of calling the weather API while the circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Trips (opens) after failure_threshold consecutive failed calls, after
+    which calls are refused until reset_timeout seconds have passed. Then
+    a single trial call is let through (half-open state): if it succeeds
+    the circuit closes, otherwise it stays open for another reset_timeout
+    seconds. Another trial is also let through if the previous one hasn't
+    reported back within reset_timeout.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be positive")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0  # Consecutive failures
+        self._opened = 0.0  # When the circuit opened (or the last trial started)
+
+    @property
+    def state(self) -> str:
+        """Current state: CLOSED, OPEN or HALF_OPEN (next call is a trial)."""
+        with self._lock:
+            if self._failures < self.failure_threshold:
+                return CLOSED
+            if self._clock() - self._opened < self.reset_timeout:
+                return OPEN
+            return HALF_OPEN
+
+    def allow(self) -> bool:
+        """Check whether a call may be made now."""
+        with self._lock:
+            if self._failures < self.failure_threshold:
+                return True
+            now = self._clock()
+            if now - self._opened < self.reset_timeout:
+                return False
+            # Let a trial call through, and hold others back meanwhile
+            self._opened = now
+            return True
+
+    def record_success(self) -> None:
+        """Report a successful call, closing the circuit."""
+        with self._lock:
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        """Report a failed call, opening the circuit at the threshold."""
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._opened = self._clock()
+
+    def reset(self) -> None:
+        """Close the circuit."""
+        self.record_success()
+
+    def __repr__(self) -> str:
+        return (
+            f"CircuitBreaker(failure_threshold={self.failure_threshold!r}, "
+            f"reset_timeout={self.reset_timeout!r}, state={self.state!r})"
+        )
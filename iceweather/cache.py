@@ -0,0 +1,136 @@
+"""
+
+    iceweather: Look up information about Icelandic weather (observations, forecasts,
+    human readable descriptive texts, etc.) using vedur.is xmlweather API.
+
+    Copyright (c) 2019-2023 Miðeind ehf.
+    Original author: Sveinbjorn Thordarson
+
+    BSD 3-clause License (see License.txt).
+
+
+    In-process TTL + LRU cache for parsed weather API results.
+
+"""
+
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+from collections import OrderedDict
+import threading
+import time
+
+
+# Cache keys are (endpoint, station/text ID, lang, weather parameters)
+CacheKey = Tuple[str, str, str, str]
+
+# Default time-to-live, in seconds, per API endpoint ("type" query parameter).
+# Observations are updated every 10-60 minutes, forecasts a few times a day.
+DEFAULT_TTLS: Dict[str, float] = {
+    "obs": 5 * 60.0,
+    "forec": 30 * 60.0,
+    "txt": 30 * 60.0,
+}
+DEFAULT_MAXSIZE: int = 4096
+
+
+class ResponseCache:
+    """
+    Thread-safe cache of parsed per-station (or per-text) API results,
+    with a time-to-live per endpoint and least-recently-used eviction
+    once maxsize entries are held.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_MAXSIZE,
+        ttls: Optional[Mapping[str, float]] = None,
+        enabled: bool = True,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttls: Dict[str, float] = {**DEFAULT_TTLS, **(ttls or {})}
+        self.enabled = enabled
+        # Values are (time stored, result, entry-specific TTL or None)
+        self._data: "OrderedDict[CacheKey, Tuple[float, Dict, Optional[float]]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: CacheKey) -> Optional[Dict]:
+        """Return the cached result for key, or None if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or time.monotonic() - entry[0] > self._ttl(entry, key):
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def get_stale(self, key: CacheKey) -> Optional[Tuple[Dict, float]]:
+        """Return (result, age in seconds) for key even if it has expired,
+        or None if missing. Expired entries are kept until evicted, so this
+        returns the last result stored. Doesn't count as a hit or miss."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            return entry[1], time.monotonic() - entry[0]
+
+    def _ttl(self, entry: Tuple[float, Dict, Optional[float]], key: CacheKey) -> float:
+        ttl = entry[2]
+        return self.ttls.get(key[0], 0.0) if ttl is None else ttl
+
+    def put(self, key: CacheKey, value: Dict, ttl: Optional[float] = None) -> None:
+        """Store a result, evicting the least recently used entries if full.
+        If ttl is given, it overrides the endpoint's time-to-live for this entry."""
+        with self._lock:
+            self._data[key] = (time.monotonic(), value, ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(
+        self,
+        endpoint: Optional[str] = None,
+        ids: Optional[Iterable[str]] = None,
+        lang: Optional[str] = None,
+    ) -> int:
+        """Remove entries matching all of the given criteria (None matches
+        anything), for any weather parameters. Returns the number of
+        entries removed."""
+        id_set = None if ids is None else frozenset(str(i) for i in ids)
+        with self._lock:
+            doomed = [
+                k
+                for k in self._data
+                if (endpoint is None or k[0] == endpoint)
+                and (id_set is None or k[1] in id_set)
+                and (lang is None or k[2] == lang)
+            ]
+            for k in doomed:
+                del self._data[k]
+            return len(doomed)
+
+    def clear(self) -> None:
+        """Remove all entries and reset statistics."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss statistics and current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
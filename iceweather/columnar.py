@@ -0,0 +1,247 @@
+"""
+
+    iceweather: Look up information about Icelandic weather (observations, forecasts,
+    human readable descriptive texts, etc.) using vedur.is xmlweather API.
+
+    Copyright (c) 2019-2023 Miðeind ehf.
+    Original author: Sveinbjorn Thordarson
+
+    BSD 3-clause License (see License.txt).
+
+
+    Columnar (NumPy) export of multi-station forecasts.
+
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import time
+import xml.etree.ElementTree as ET
+
+from requests import RequestException
+
+from . import weather
+from .metrics import CallRecord, recording, timed_chunks
+from .ratelimit import limited_chunks
+from .records import _TEXT_PARAMS
+from .weather import (
+    _ArgType,
+    _DEFAULT_LANG,
+    _ParamsType,
+    _SUPPORTED_LANGS,
+    _api_stream,
+    _api_url,
+    _arg_to_str_list,
+    _cached_results,
+    _chunked,
+    _circuit,
+    _get_executor,
+    _node_text,
+    _params_str,
+    _stale_results,
+)
+
+# Element nesting depth of stations, forecast steps and step values
+_STATION_DEPTH = 2
+_STEP_DEPTH = 3
+_VALUE_DEPTH = 4
+
+_Columns = Dict[str, Tuple[List[int], List[str], List[str]]]
+
+
+class _ColumnCollector:
+    """Collects forecast values straight from XML parser events as
+    (station index, forecast time, value) columns per parameter,
+    without building a dict per station or forecast step. Results which
+    are already dicts (from the cache) can be added as well."""
+
+    def __init__(self, params: Optional[Iterable[str]]) -> None:
+        self.params = None if params is None else frozenset(params)
+        self.ids: List[str] = []
+        # Per parameter: station indices, forecast times and values
+        self.columns: _Columns = {}
+        self._step: List[Tuple[str, str]] = []
+
+    def feed(self, chunks: Iterable[bytes]) -> None:
+        parser: Any = ET.XMLPullParser(events=("start", "end"))
+        root: Optional[ET.Element] = None
+        depth = 0
+        for data in chunks:
+            parser.feed(data)
+            for event, elem in parser.read_events():
+                if event == "start":
+                    depth += 1
+                    if depth == 1:
+                        root = elem
+                    elif depth == _STATION_DEPTH:
+                        self.ids.append(elem.get("id", ""))
+                    continue
+                if depth == _VALUE_DEPTH:
+                    self._step.append((elem.tag, _node_text(elem)))
+                elif depth == _STEP_DEPTH:
+                    if elem.tag == "forecast":
+                        self._end_step()
+                    else:
+                        self._step = []
+                    elem.clear()
+                elif depth == _STATION_DEPTH and root is not None:
+                    root.remove(elem)
+                depth -= 1
+        parser.close()
+
+    def add(self, result: Dict) -> None:
+        self.ids.append(result.get("id", ""))
+        for step in result.get("forecast", ()):
+            self._step = list(step.items())
+            self._end_step()
+
+    def _end_step(self) -> None:
+        step, self._step = self._step, []
+        ftime = next((v for k, v in step if k == "ftime"), "")
+        if not ftime:
+            return
+        station = len(self.ids) - 1
+        for key, value in step:
+            if key == "ftime" or (self.params is not None and key not in self.params):
+                continue
+            col = self.columns.get(key)
+            if col is None:
+                col = self.columns[key] = ([], [], [])
+            col[0].append(station)
+            col[1].append(ftime)
+            col[2].append(value)
+
+
+def _collect_chunk(
+    ids: List[str], lang: str, params: str, use_cache: bool
+) -> _ColumnCollector:
+    """Fetch forecasts for a chunk of IDs in a single API call, collecting
+    columns as the response is parsed. If the call fails, stale results
+    from the cache are used instead (when using the cache)."""
+    c = _ColumnCollector(params.split(";"))
+    url = _api_url("forec", ids, lang, params)
+    try:
+        with _circuit("forec", url), recording(
+            CallRecord("forec", url, len(ids))
+        ) as record:
+            t0 = time.perf_counter()
+            chunks = timed_chunks(record, _api_stream(url))
+            c.feed(limited_chunks("forec", record, chunks))
+            # Parsing is interleaved with downloading, count the remainder
+            elapsed = time.perf_counter() - t0 - record.queued
+            record.parsed(elapsed - record.wait - record.download, len(c.ids))
+    except RequestException as e:
+        if not use_cache:
+            raise
+        c = _ColumnCollector(params.split(";"))
+        for r in _stale_results("forec", ids, lang, params, e):
+            c.add(r)
+    return c
+
+
+def _to_float(s: str) -> float:
+    try:
+        return float(s.replace(",", "."))
+    except ValueError:
+        return float("nan")
+
+
+def forecast_columns(
+    station_ids: _ArgType,
+    lang: str = _DEFAULT_LANG,
+    params: _ParamsType = None,
+    chunk_size: Optional[int] = None,
+    use_cache: bool = True,
+) -> Dict[str, Any]:
+    """
+    Returns weather forecasts for the given station IDs in columnar form:
+
+    {
+        "ids": int array of station IDs (stations axis),
+        "times": datetime64[s] array of forecast times (time axis, sorted),
+        "values": { param: 2D array indexed by [station, time], ... },
+    }
+
+    Numeric parameters are float arrays with NaN for missing values;
+    text parameters (D, W, SNC, SED) are object arrays with None for
+    missing values. If params is given, only those parameters are requested
+    and included.
+    Forecasts are fetched in concurrent chunks, as by
+    forecast_for_stations(), and values are collected directly from the
+    parsed XML, without building a dict per station or forecast step.
+    Cached results are used where available (unless use_cache is False),
+    as are stale results if the API fails, but fetched results are not
+    stored in the cache, as that would take the dicts this avoids.
+    Requires NumPy.
+    """
+    import numpy as np
+
+    assert lang in _SUPPORTED_LANGS
+
+    ids = _arg_to_str_list(station_ids)
+    p = _params_str(params)
+    use_cache = use_cache and weather._CACHE.enabled
+    found, missing = _cached_results("forec", ids, lang, p, use_cache)
+    cached = _ColumnCollector(p.split(";"))
+    for r in found.values():
+        cached.add(r)
+    collectors = [cached]
+    chunks = _chunked(missing, chunk_size or weather._chunk_size)
+    if len(chunks) == 1:
+        collectors.append(_collect_chunk(chunks[0], lang, p, use_cache))
+    elif chunks:
+        collectors.extend(
+            _get_executor().map(
+                lambda chunk: _collect_chunk(chunk, lang, p, use_cache), chunks
+            )
+        )
+
+    # Concatenate the collected stations, offsetting station indices
+    station_ids_out: List[str] = []
+    merged: _Columns = {}
+    for c in collectors:
+        offset = len(station_ids_out)
+        station_ids_out.extend(c.ids)
+        for key, (st, tm, vals) in c.columns.items():
+            m = merged.setdefault(key, ([], [], []))
+            m[0].extend(i + offset for i in st)
+            m[1].extend(tm)
+            m[2].extend(vals)
+
+    # Cached stations come first; put all stations in the requested order
+    position = {sid: i for i, sid in enumerate(dict.fromkeys(ids))}
+    order = sorted(
+        range(len(station_ids_out)),
+        key=lambda i: position.get(station_ids_out[i], len(position)),
+    )
+    row_of = np.empty(len(order), dtype=np.intp)
+    row_of[order] = np.arange(len(order))
+    station_ids_out = [station_ids_out[i] for i in order]
+
+    all_times = sorted({t for _, tm, _ in merged.values() for t in tm})
+    time_index = {t: i for i, t in enumerate(all_times)}
+    shape = (len(station_ids_out), len(all_times))
+
+    values: Dict[str, Any] = {}
+    for key, (st, tm, vals) in merged.items():
+        rows = row_of[np.fromiter(st, dtype=np.intp, count=len(st))]
+        cols = np.fromiter((time_index[t] for t in tm), dtype=np.intp, count=len(tm))
+        if key in _TEXT_PARAMS:
+            arr = np.full(shape, None, dtype=object)
+            arr[rows, cols] = [v or None for v in vals]
+        else:
+            arr = np.full(shape, np.nan)
+            arr[rows, cols] = np.fromiter(
+                (_to_float(v) if v else np.nan for v in vals),
+                dtype=np.float64,
+                count=len(vals),
+            )
+        values[key] = arr
+
+    return {
+        "ids": np.array([int(i) if i.isdigit() else -1 for i in station_ids_out]),
+        "times": np.array(
+            [t.replace(" ", "T") for t in all_times], dtype="datetime64[s]"
+        ),
+        "values": values,
+    }
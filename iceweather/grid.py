@@ -0,0 +1,196 @@
+"""
+
+    iceweather: Look up information about Icelandic weather (observations, forecasts,
+    human readable descriptive texts, etc.) using vedur.is xmlweather API.
+
+    Copyright (c) 2019-2023 Miðeind ehf.
+    Original author: Sveinbjorn Thordarson
+
+    BSD 3-clause License (see License.txt).
+
+
+    Gridded (raster) observations over Iceland, interpolated from all
+    weather stations by inverse distance weighting. Requires NumPy.
+
+    The weights of the nearest stations for each grid cell only depend on
+    the grid, and are computed once and cached, so that regenerating a
+    raster from fresh observations is a single vectorized operation.
+
+"""
+
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from functools import lru_cache
+
+from .interpolate import _DEFAULT_POWER, _station_values
+from .records import _TEXT_PARAMS
+from .stations import station_table
+from .util import iter_distance_matrix
+from .weather import (
+    _DEFAULT_LANG,
+    _ParamsType,
+    _SUPPORTED_LANGS,
+    _all_station_ids,
+    _fetch_results,
+    _params_str,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Default grid extent: (south, west, north, east) in degrees
+ICELAND_BOUNDS = (63.2, -24.6, 66.6, -13.4)
+
+_DEFAULT_RESOLUTION = 0.1  # Degrees
+_DEFAULT_K = 8
+
+# Distances (km) are clamped to this, so that cells at a station
+# get (nearly) all of the weight without dividing by zero
+_MIN_DISTANCE = 0.001
+
+
+def _axis(start: float, stop: float, step: float) -> "np.ndarray":
+    """Return coordinates from start, step apart, up to or just past stop."""
+    import numpy as np
+
+    return start + step * np.arange(int(np.ceil((stop - start) / step - 1e-9)) + 1)
+
+
+@lru_cache(maxsize=8)
+def _grid_weights(
+    bounds: Tuple[float, float, float, float],
+    resolution: float,
+    k: int,
+    power: float,
+    max_distance: Optional[float],
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Return the indices (cells x k) of the k nearest stations to each
+    grid cell, in station table order, and their (unnormalized) inverse
+    distance weights."""
+    import numpy as np
+
+    south, west, north, east = bounds
+    lats = _axis(south, north, resolution)
+    lons = _axis(west, east, resolution)
+    cells = np.column_stack([np.repeat(lats, len(lons)), np.tile(lons, len(lats))])
+    table = station_table()
+    coords = list(zip(table.lats, table.lons))
+    k = min(k, len(coords))
+
+    index = np.empty((len(cells), k), dtype=np.intp)
+    weights = np.empty((len(cells), k))
+    for start, block in iter_distance_matrix(cells, coords):
+        nearest = np.argpartition(block, k - 1, axis=1)[:, :k]
+        dist = np.take_along_axis(block, nearest, axis=1)
+        w = 1.0 / np.maximum(dist, _MIN_DISTANCE) ** power
+        if max_distance is not None:
+            w[dist > max_distance] = 0.0
+        index[start : start + len(block)] = nearest
+        weights[start : start + len(block)] = w
+    return index, weights
+
+
+class Grid:
+    """A regular lat/lon grid over Iceland (or the given bounds), with
+    cached weights for interpolating station values to the grid cells
+    from the k nearest stations (weights proportional to
+    1 / distance ** power). Cells with no station within max_distance km
+    (if given) have no value."""
+
+    __slots__ = ("bounds", "resolution", "lats", "lons", "_index", "_weights")
+
+    def __init__(
+        self,
+        resolution: float = _DEFAULT_RESOLUTION,
+        bounds: Tuple[float, float, float, float] = ICELAND_BOUNDS,
+        k: int = _DEFAULT_K,
+        power: float = _DEFAULT_POWER,
+        max_distance: Optional[float] = None,
+    ) -> None:
+        assert resolution > 0 and k > 0
+        south, west, north, east = (float(b) for b in bounds)
+        assert south < north and west < east
+        self.bounds = (south, west, north, east)
+        self.resolution = resolution
+        self.lats = _axis(south, north, resolution)  # South to north
+        self.lons = _axis(west, east, resolution)  # West to east
+        self._index, self._weights = _grid_weights(
+            self.bounds, resolution, k, power, max_distance
+        )
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """Raster shape: (number of latitudes, number of longitudes)."""
+        return len(self.lats), len(self.lons)
+
+    def interpolate(self, values: "np.ndarray") -> "np.ndarray":
+        """Interpolate station values to the grid. values has a row for each
+        station, in station table order, and a column for each quantity
+        (or is 1-D for a single quantity), with NaN for missing values.
+        Returns an array of shape (quantities, *self.shape), or self.shape
+        for 1-D input; NaN where no nearby station has a value."""
+        import numpy as np
+
+        values = np.asarray(values, dtype=float)
+        single = values.ndim == 1
+        if single:
+            values = values[:, None]
+        present = ~np.isnan(values)
+        # Weighted sums of values and of the weights of stations with values,
+        # so missing values are skipped and the other weights renormalized
+        near = np.where(present, values, 0.0)[self._index]
+        num = np.einsum("ck,ckq->qc", self._weights, near)
+        den = np.einsum("ck,ckq->qc", self._weights, present[self._index])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            raster = np.where(den > 0, num / den, np.nan)
+        raster = raster.reshape(values.shape[1], *self.shape)
+        return raster[0] if single else raster
+
+
+def grid_observations(
+    resolution: float = _DEFAULT_RESOLUTION,
+    params: _ParamsType = None,
+    lang: str = _DEFAULT_LANG,
+    use_cache: bool = True,
+    bounds: Tuple[float, float, float, float] = ICELAND_BOUNDS,
+    k: int = _DEFAULT_K,
+    power: float = _DEFAULT_POWER,
+    max_distance: Optional[float] = None,
+) -> Dict:
+    """Returns current observations from all stations interpolated to a
+    regular lat/lon grid (see Grid). The result has the grid coordinates
+    and a 2-D array (latitudes x longitudes, south-west corner first) for
+    each numeric parameter; if wind direction (D) is included, its vector
+    mean is given in degrees as wind_direction:
+
+        {"lats": array([63.2, ...]), "lons": array([-24.6, ...]),
+         "values": {"T": array([[...], ...]), "F": ...},
+         "wind_direction": array([[...], ...])}"""
+    import numpy as np
+
+    assert lang in _SUPPORTED_LANGS
+    p = _params_str(params)
+    keys = p.split(";")
+    numeric = [key for key in keys if key not in _TEXT_PARAMS]
+    grid = Grid(resolution, bounds, k, power, max_distance)
+    ids = _all_station_ids()
+    results = {
+        str(r.get("id")): r
+        for r in _fetch_results("obs", ids, lang, use_cache, params=p)
+    }
+    values, angles, _ = _station_values(results, ids, numeric)
+    # Wind direction is interpolated as a unit vector
+    columns = [values[:-1], np.sin(angles[:-1, None]), np.cos(angles[:-1, None])]
+    rasters = grid.interpolate(np.hstack(columns))
+
+    ret: Dict = {
+        "lats": grid.lats,
+        "lons": grid.lons,
+        "values": dict(zip(numeric, rasters)),
+    }
+    if "D" in keys:
+        x, y = rasters[-2], rasters[-1]
+        with np.errstate(invalid="ignore"):
+            direction = np.degrees(np.arctan2(x, y)) % 360.0
+        ret["wind_direction"] = np.where(np.hypot(x, y) > 1e-9, direction, np.nan)
+    return ret
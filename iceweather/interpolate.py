@@ -0,0 +1,230 @@
+"""
+
+    iceweather: Look up information about Icelandic weather (observations, forecasts,
+    human readable descriptive texts, etc.) using vedur.is xmlweather API.
+
+    Copyright (c) 2019-2023 Miðeind ehf.
+    Original author: Sveinbjorn Thordarson
+
+    BSD 3-clause License (see License.txt).
+
+
+    Spatially interpolated observations at arbitrary coordinates, using
+    inverse distance weighting (IDW) of observations from the nearest
+    stations. Requires NumPy.
+
+"""
+
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .lookup import closest_stations, closest_stations_many
+from .records import _TEXT_PARAMS, direction_name, parse_direction, parse_float
+from .util import haversine
+from .weather import (
+    _DEFAULT_LANG,
+    _ParamsType,
+    _SUPPORTED_LANGS,
+    _fetch_results,
+    _is_valid_result,
+    _params_str,
+    _station_ids,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Stations closer than this (km) count as being at the given location,
+# and get all the weight
+_EXACT_DISTANCE = 0.001
+
+_DEFAULT_K = 5
+_DEFAULT_POWER = 2.0
+
+
+def _station_values(
+    results: Dict[str, Dict], ids: List[str], keys: List[str]
+) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """Return station values (len(ids) + 1 x len(keys), NaN where missing),
+    wind directions in radians and validity flags, indexed like ids. The
+    extra last row is all missing, for padding."""
+    import numpy as np
+
+    values = np.full((len(ids) + 1, len(keys)), np.nan)
+    angles = np.full(len(ids) + 1, np.nan)
+    valid = np.zeros(len(ids) + 1, dtype=bool)
+    for i, sid in enumerate(ids):
+        r = results.get(sid)
+        if r is None or not _is_valid_result(r):
+            continue
+        valid[i] = True
+        for j, key in enumerate(keys):
+            v = parse_float(r.get(key))
+            if v is not None:
+                values[i, j] = v
+        d = parse_direction(r.get("D"))
+        if d is not None:
+            angles[i] = np.radians(d)
+    return values, angles, valid
+
+
+def _idw_weights(
+    distances: "np.ndarray", valid: "np.ndarray", power: float
+) -> "np.ndarray":
+    """Return normalized inverse distance weights (points x k). Invalid
+    stations get no weight; a valid station at the location gets all of it."""
+    import numpy as np
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        w = np.where(valid, 1.0 / distances**power, 0.0)
+    exact = valid & (distances < _EXACT_DISTANCE)
+    w = np.where(exact.any(axis=1, keepdims=True), exact.astype(float), w)
+    total = w.sum(axis=1, keepdims=True)
+    return np.divide(w, total, out=np.zeros_like(w), where=total > 0)
+
+
+def _weighted_mean(weights: "np.ndarray", values: "np.ndarray") -> "np.ndarray":
+    """Weighted mean of values (points x k x params) over the k stations,
+    ignoring missing (NaN) values and renormalizing the remaining weights."""
+    import numpy as np
+
+    present = ~np.isnan(values)
+    w = np.where(present, weights[:, :, None], 0.0)
+    num = np.where(present, w * values, 0.0).sum(axis=1)
+    den = w.sum(axis=1)
+    return np.divide(num, den, out=np.full_like(num, np.nan), where=den > 0)
+
+
+def _mean_direction(weights: "np.ndarray", angles: "np.ndarray") -> "np.ndarray":
+    """Weighted vector mean of wind directions (radians, points x k),
+    in degrees; NaN where there are no directions or they cancel out."""
+    import numpy as np
+
+    present = ~np.isnan(angles)
+    x = np.where(present, weights * np.sin(angles), 0.0).sum(axis=1)
+    y = np.where(present, weights * np.cos(angles), 0.0).sum(axis=1)
+    deg = np.degrees(np.arctan2(x, y)) % 360.0
+    return np.where(np.hypot(x, y) > 1e-9, deg, np.nan)
+
+
+def _interpolate(
+    points: Sequence[Tuple[float, float]],
+    neighbours: List[List[Dict]],
+    lang: str,
+    use_cache: bool,
+    params: str,
+    power: float,
+) -> List[Dict]:
+    """Interpolate observations at each point from its neighbouring
+    stations, with a single (batched) fetch for all of them."""
+    import numpy as np
+
+    keys = params.split(";")
+    # Text values are left out, except wind direction (averaged as a vector)
+    numeric = [k for k in keys if k not in _TEXT_PARAMS]
+    ids = list(dict.fromkeys(sid for n in neighbours for sid in _station_ids(n)))
+    results = {
+        str(r.get("id")): r
+        for r in _fetch_results("obs", ids, lang, use_cache, params=params)
+    }
+    values, angles, valid = _station_values(results, ids, numeric)
+
+    # Station indices (padded with the all-missing row) and coordinates
+    k = max((len(n) for n in neighbours), default=0)
+    pad = len(ids)
+    index = {sid: i for i, sid in enumerate(ids)}
+    idx = np.full((len(points), k), pad)
+    slat = np.full((len(points), k), np.nan)
+    slon = np.full((len(points), k), np.nan)
+    for p, stations in enumerate(neighbours):
+        idx[p, : len(stations)] = [index[str(s["id"])] for s in stations]
+        slat[p, : len(stations)] = [s["lat"] for s in stations]
+        slon[p, : len(stations)] = [s["lon"] for s in stations]
+
+    coords = np.asarray(points, dtype=float).reshape(-1, 2)
+    distances = haversine(coords[:, :1], coords[:, 1:], slat, slon)
+    weights = _idw_weights(distances, valid[idx], power)
+    means = _weighted_mean(weights, values[idx])
+    directions = (
+        _mean_direction(weights, angles[idx])
+        if "D" in keys
+        else np.full(len(points), np.nan)
+    )
+
+    ret = []
+    for p, stations in enumerate(neighbours):
+        vals: Dict[str, Optional[object]] = {
+            key: None if np.isnan(v) else float(v) for key, v in zip(numeric, means[p])
+        }
+        direction = None if np.isnan(directions[p]) else float(directions[p])
+        if "D" in keys:
+            vals["D"] = None if direction is None else direction_name(direction, lang)
+        ret.append(
+            {
+                "lat": float(coords[p, 0]),
+                "lon": float(coords[p, 1]),
+                "values": vals,
+                "wind_direction": direction,
+                "stations": [
+                    {
+                        "id": s["id"],
+                        "name": s["name"],
+                        "distance": float(distances[p, i]),
+                        "weight": float(weights[p, i]),
+                    }
+                    for i, s in enumerate(stations)
+                    if weights[p, i] > 0
+                ],
+            }
+        )
+    return ret
+
+
+def observations_at(
+    points: Iterable[Tuple[float, float]],
+    k: int = _DEFAULT_K,
+    power: float = _DEFAULT_POWER,
+    lang: str = _DEFAULT_LANG,
+    use_cache: bool = True,
+    params: _ParamsType = None,
+) -> List[Dict]:
+    """Returns interpolated weather observations at each of the given
+    (lat, lon) points (see observation_at). Observations for the nearest
+    stations of all points are fetched together."""
+    assert lang in _SUPPORTED_LANGS
+    assert k > 0
+    p = _params_str(params)
+    points = list(points)
+    if not points:
+        return []
+    return _interpolate(
+        points, closest_stations_many(points, limit=k), lang, use_cache, p, power
+    )
+
+
+def observation_at(
+    lat: float,
+    lon: float,
+    k: int = _DEFAULT_K,
+    power: float = _DEFAULT_POWER,
+    lang: str = _DEFAULT_LANG,
+    use_cache: bool = True,
+    params: _ParamsType = None,
+) -> Dict:
+    """Returns weather observations at the given coordinates, interpolated
+    from the k nearest stations by inverse distance weighting (weights
+    proportional to 1 / distance ** power). Numeric values are weighted
+    means over the stations that reported them; wind direction (D) is a
+    weighted vector mean, also given in degrees as wind_direction. Other
+    text values are left out. The result lists the contributing stations
+    with their distances (km) and weights, e.g.
+
+        {"lat": 64.13, "lon": -21.9,
+         "values": {"F": 4.2, "T": 7.9, "D": "SA", ...},
+         "wind_direction": 131.4,
+         "stations": [{"id": 1, "name": "Reykjavík",
+                       "distance": 1.3, "weight": 0.61}, ...]}"""
+    assert lang in _SUPPORTED_LANGS
+    assert k > 0
+    p = _params_str(params)
+    neighbours = [closest_stations(lat, lon, limit=k)]
+    return _interpolate([(lat, lon)], neighbours, lang, use_cache, p, power)[0]
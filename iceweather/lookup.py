@@ -0,0 +1,161 @@
+"""
+
+    iceweather: Look up information about Icelandic weather (observations, forecasts,
+    human readable descriptive texts, etc.) using vedur.is xmlweather API.
+
+    Copyright (c) 2019-2023 Miðeind ehf.
+    Original author: Sveinbjorn Thordarson
+
+    BSD 3-clause License (see License.txt).
+
+
+    Offline weather station lookups. This module does not import the
+    network or XML parsing dependencies of weather.py, so it is cheap to
+    import in processes that only need station metadata.
+
+"""
+
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import json
+
+from .stations import station_dicts, station_table
+from .spatial import StationIndex
+from .util import iter_distance_matrix
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# Spatial index for nearest station lookups, built on first use
+_station_index: Optional[StationIndex] = None
+
+# IDs of stations known not to return valid data (see check_stations.py),
+# which are skipped by closest station lookups
+_dead_stations: FrozenSet[int] = frozenset()
+
+
+def _get_station_index() -> StationIndex:
+    global _station_index
+    index = _station_index
+    if index is None:
+        dead = _dead_stations
+        index = StationIndex([s for s in station_dicts() if s["id"] not in dead])
+        _station_index = index
+    return index
+
+
+def set_dead_stations(station_ids: Iterable[Union[int, str]]) -> None:
+    """Skip the given stations in closest station lookups (closest_stations,
+    observation_for_closest etc.), e.g. stations which never return valid
+    data. Lookups by ID or name are unaffected. Pass an empty list to
+    use all stations again."""
+    global _dead_stations, _station_index
+    _dead_stations = frozenset(int(i) for i in station_ids)
+    _station_index = None
+
+
+def load_dead_stations(path: str) -> FrozenSet[int]:
+    """Load a list of dead station IDs from a JSON file (as written by
+    check_stations.py --dead-list) and skip them in closest station
+    lookups (see set_dead_stations). Returns the IDs."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data["dead"]
+    set_dead_stations(data)
+    return _dead_stations
+
+
+def dead_stations() -> FrozenSet[int]:
+    """Return the IDs of stations skipped in closest station lookups."""
+    return _dead_stations
+
+
+def station_list() -> List[Dict]:
+    """Return a list of all weather stations in Iceland."""
+    return station_dicts()
+
+
+def closest_stations(lat: float, lon: float, limit: int = 1) -> List[Dict]:
+    """Find the weather stations closest to the given location, closest first
+    (skipping dead stations, see set_dead_stations)."""
+    return _get_station_index().nearest(lat, lon, k=limit)
+
+
+def closest_stations_many(
+    points: Iterable[Tuple[float, float]], limit: int = 1
+) -> List[List[Dict]]:
+    """Find the weather stations closest to each of the given (lat, lon)
+    locations, closest first. Distances for all points are computed in
+    vectorized blocks, which is much faster than calling closest_stations()
+    in a loop for large batches. Requires NumPy."""
+    import numpy as np
+
+    pts = list(points)
+    if not pts or limit < 1:
+        return [[] for _ in pts]
+
+    table = station_table()
+    dead = _dead_stations
+    live = [i for i, sid in enumerate(table.ids) if sid not in dead]
+    coords = [(table.lats[i], table.lons[i]) for i in live]
+    all_stations = station_dicts()
+    stations = [all_stations[i] for i in live]
+    if not stations:
+        return [[] for _ in pts]
+    limit = min(limit, len(stations))
+    ret: List[List[Dict]] = []
+    for _, block in iter_distance_matrix(pts, coords):
+        nearest = _smallest(block, limit)
+        ret.extend([stations[i] for i in row] for row in nearest.tolist())
+    return ret
+
+
+def _smallest(block: "np.ndarray", limit: int) -> "np.ndarray":
+    """Return the column indices of the limit smallest values in each row
+    of block, smallest first, with ties in column order (as a stable sort
+    would give), without sorting whole rows."""
+    import numpy as np
+
+    if limit >= block.shape[1]:
+        return np.argsort(block, axis=1, kind="stable")[:, :limit]
+    # The limit-th smallest value in each row; ties with it at the partition
+    # boundary are all kept as candidates, so the lowest columns win
+    kth = np.partition(block, limit - 1, axis=1)[:, limit - 1 : limit]
+    rows, cols = np.nonzero(block <= kth)
+    order = np.lexsort((cols, block[rows, cols], rows))
+    rows, cols = rows[order], cols[order]
+    rank = np.arange(len(rows)) - np.searchsorted(rows, np.arange(len(block)))[rows]
+    return cols[rank < limit].reshape(len(block), limit)
+
+
+def stations_for_name(station_name: str) -> List[Dict]:
+    """Return all weather stations with the given name
+    (in station list order, empty list if none)."""
+    stations = station_dicts()
+    return [stations[i] for i in station_table().indices_for_name(station_name)]
+
+
+def id_for_station(station_name: str) -> Optional[int]:
+    """Return the numerical ID for a weather station, given its name.
+    If several stations share the name, the first one in the station list
+    is returned (see stations_for_name)."""
+    table = station_table()
+    matches = table.indices_for_name(station_name)
+    return table.ids[matches[0]] if matches else None
+
+
+def station_for_id(station_id: int) -> Optional[Dict]:
+    """Return the name of a weather station, given its numerical ID."""
+    i = station_table().index_for_id(station_id)
+    return None if i is None else station_dicts()[i]
@@ -0,0 +1,350 @@
+"""
+
+    iceweather: Look up information about Icelandic weather (observations, forecasts,
+    human readable descriptive texts, etc.) using vedur.is xmlweather API.
+
+    Copyright (c) 2019-2023 Miðeind ehf.
+    Original author: Sveinbjorn Thordarson
+
+    BSD 3-clause License (see License.txt).
+
+
+    Instrumentation of weather API calls: per-call timings of each phase,
+    response sizes, station counts, cache hits/misses and errors, kept in
+    a metrics registry (exportable in Prometheus text format) and passed
+    to user-supplied hooks.
+
+"""
+
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from contextlib import contextmanager
+import logging
+import math
+import threading
+import time
+
+_LOG = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the buckets in phase timing histograms
+_BUCKETS: Tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    math.inf,
+)
+
+# Metric name: (type, description)
+_METRICS: Dict[str, Tuple[str, str]] = {
+    "iceweather_api_calls_total": ("counter", "Weather API calls made"),
+    "iceweather_api_errors_total": ("counter", "Weather API calls that failed"),
+    "iceweather_api_response_bytes_total": (
+        "counter",
+        "Bytes received in API responses",
+    ),
+    "iceweather_api_ids_requested_total": (
+        "counter",
+        "Station (or text) IDs requested from the API",
+    ),
+    "iceweather_api_results_total": ("counter", "Results parsed from API responses"),
+    "iceweather_api_phase_seconds": (
+        "histogram",
+        "Time spent in each phase of API calls "
+        "(queued: waiting for the rate limit or concurrency cap, "
+        "wait: until the first body chunk, download: remaining body, "
+        "parse: XML parsing, total: sum of phases)",
+    ),
+    "iceweather_cache_hits_total": ("counter", "Results found in the response cache"),
+    "iceweather_cache_misses_total": (
+        "counter",
+        "Results not found in the response cache",
+    ),
+    "iceweather_circuit_open_total": (
+        "counter",
+        "API calls refused because the circuit breaker was open",
+    ),
+    "iceweather_stale_results_total": (
+        "counter",
+        "Expired cached results served because API calls failed",
+    ),
+}
+
+_Labels = Tuple[Tuple[str, str], ...]
+
+
+class CallRecord:
+    """Measurements for a single weather API call."""
+
+    __slots__ = (
+        "endpoint",
+        "url",
+        "ids",
+        "bytes",
+        "results",
+        "queued",
+        "wait",
+        "download",
+        "parse",
+        "error",
+    )
+
+    def __init__(self, endpoint: str, url: str, ids: int) -> None:
+        self.endpoint = endpoint
+        self.url = url
+        self.ids = ids  # Number of IDs requested
+        self.bytes = 0  # Response body size
+        self.results = 0  # Number of results parsed
+        self.queued = 0.0  # Seconds spent waiting for the rate limit (ratelimit.py)
+        self.wait = 0.0  # Seconds until the first body chunk arrived
+        self.download = 0.0  # Seconds spent receiving the rest of the body
+        self.parse = 0.0  # Seconds spent parsing
+        self.error: Optional[str] = None  # Error message if the call failed
+
+    @property
+    def total(self) -> float:
+        """Total time spent in the call (excluding time spent queued for
+        the rate limit and by the caller while consuming results from a
+        generator)."""
+        return self.wait + self.download + self.parse
+
+    def received(self, seconds: float, size: int) -> None:
+        """Record a body chunk of size bytes, received after waiting seconds."""
+        if not self.bytes:
+            self.wait += seconds
+        else:
+            self.download += seconds
+        self.bytes += size
+
+    def parsed(self, seconds: float, results: int) -> None:
+        """Record parsing time and the number of results it produced."""
+        self.parse += seconds
+        self.results += results
+
+    def __repr__(self) -> str:
+        return (
+            f"CallRecord(endpoint={self.endpoint!r}, ids={self.ids}, "
+            f"bytes={self.bytes}, results={self.results}, "
+            f"queued={self.queued:.4f}, wait={self.wait:.4f}, "
+            f"download={self.download:.4f}, parse={self.parse:.4f}, "
+            f"error={self.error!r})"
+        )
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self) -> None:
+        self.counts = [0] * len(_BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(_BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Thread-safe store of counters and histograms, keyed on metric
+    name and labels."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, _Labels], float] = {}
+        self._histograms: Dict[Tuple[str, _Labels], _Histogram] = {}
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        """Increment a counter."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Add an observation to a histogram."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            h = self._histograms.get(key)
+            if h is None:
+                h = self._histograms[key] = _Histogram()
+            h.observe(value)
+
+    def reset(self) -> None:
+        """Remove all recorded values."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> Dict[str, Dict[_Labels, object]]:
+        """Return current values: counter values, and for histograms
+        dicts with count, sum and cumulative bucket counts."""
+        ret: Dict[str, Dict[_Labels, object]] = {}
+        with self._lock:
+            for (name, labels), value in self._counters.items():
+                ret.setdefault(name, {})[labels] = value
+            for (name, labels), h in self._histograms.items():
+                cumulative = []
+                n = 0
+                for c in h.counts:
+                    n += c
+                    cumulative.append(n)
+                ret.setdefault(name, {})[labels] = {
+                    "count": h.count,
+                    "sum": h.sum,
+                    "buckets": dict(zip(_BUCKETS, cumulative)),
+                }
+        return ret
+
+    def prometheus_text(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for name, values in sorted(self.snapshot().items()):
+            kind, description = _METRICS.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in sorted(values.items()):
+                if not isinstance(value, dict):
+                    lines.append(f"{name}{_format_labels(labels)} {_fmt(value)}")
+                    continue
+                for bound, n in value["buckets"].items():
+                    le = "+Inf" if math.isinf(bound) else repr(bound)
+                    lb = _format_labels(labels + (("le", le),))
+                    lines.append(f"{name}_bucket{lb} {n}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {value['sum']!r}")
+                lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _fmt(value: object) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _format_labels(labels: _Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+# Registry used by the library
+REGISTRY = MetricsRegistry()
+
+CallHook = Callable[[CallRecord], None]
+_hooks: List[CallHook] = []
+_hooks_lock = threading.Lock()
+
+
+def add_call_hook(hook: CallHook) -> None:
+    """Call hook(record) with a CallRecord after each weather API call
+    (e.g. to forward measurements to OpenTelemetry or a log).
+    Exceptions raised by hooks are logged and otherwise ignored."""
+    global _hooks
+    with _hooks_lock:
+        _hooks = _hooks + [hook]
+
+
+def remove_call_hook(hook: CallHook) -> None:
+    """Remove a hook added with add_call_hook."""
+    global _hooks
+    with _hooks_lock:
+        _hooks = [h for h in _hooks if h != hook]
+
+
+def record_call(record: CallRecord) -> None:
+    """Record a completed (or failed) API call in the registry
+    and pass it to hooks."""
+    endpoint = record.endpoint
+    REGISTRY.inc("iceweather_api_calls_total", endpoint=endpoint)
+    if record.error is not None:
+        REGISTRY.inc("iceweather_api_errors_total", endpoint=endpoint)
+    REGISTRY.inc("iceweather_api_response_bytes_total", record.bytes, endpoint=endpoint)
+    REGISTRY.inc("iceweather_api_ids_requested_total", record.ids, endpoint=endpoint)
+    REGISTRY.inc("iceweather_api_results_total", record.results, endpoint=endpoint)
+    for phase in ("queued", "wait", "download", "parse", "total"):
+        REGISTRY.observe(
+            "iceweather_api_phase_seconds",
+            getattr(record, phase),
+            endpoint=endpoint,
+            phase=phase,
+        )
+    for hook in _hooks:
+        try:
+            hook(record)
+        except Exception:
+            _LOG.exception("Error in iceweather call hook")
+
+
+def record_cache(endpoint: str, hits: int, misses: int) -> None:
+    """Record response cache hits and misses for an endpoint."""
+    if hits:
+        REGISTRY.inc("iceweather_cache_hits_total", hits, endpoint=endpoint)
+    if misses:
+        REGISTRY.inc("iceweather_cache_misses_total", misses, endpoint=endpoint)
+
+
+def record_short_circuit(endpoint: str) -> None:
+    """Record an API call refused by the circuit breaker."""
+    REGISTRY.inc("iceweather_circuit_open_total", endpoint=endpoint)
+
+
+def record_stale(endpoint: str, results: int) -> None:
+    """Record stale results served in place of a failed API call."""
+    REGISTRY.inc("iceweather_stale_results_total", results, endpoint=endpoint)
+
+
+def metrics_snapshot() -> Dict[str, Dict[_Labels, object]]:
+    """Return the current values of all metrics (see MetricsRegistry.snapshot)."""
+    return REGISTRY.snapshot()
+
+
+def prometheus_metrics() -> str:
+    """Return all metrics in the Prometheus text exposition format,
+    e.g. for serving from a /metrics endpoint."""
+    return REGISTRY.prometheus_text()
+
+
+def reset_metrics() -> None:
+    """Reset all metrics to zero."""
+    REGISTRY.reset()
+
+
+@contextmanager
+def recording(record: CallRecord) -> Iterator[CallRecord]:
+    """Context manager which records the call when the block exits,
+    noting the error if an exception is raised."""
+    try:
+        yield record
+    except Exception as e:
+        record.error = str(e) or type(e).__name__
+        raise
+    finally:
+        record_call(record)
+
+
+def timed_chunks(record: CallRecord, chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Pass through response body chunks, recording the time spent
+    waiting for each one and its size."""
+    it = iter(chunks)
+    while True:
+        t0 = time.perf_counter()
+        try:
+            data = next(it)
+        except StopIteration:
+            return
+        record.received(time.perf_counter() - t0, len(data))
+        yield data
@@ -0,0 +1,456 @@
+"""
+
+    iceweather: Look up information about Icelandic weather (observations, forecasts,
+    human readable descriptive texts, etc.) using vedur.is xmlweather API.
+
+    Copyright (c) 2019-2023 Miðeind ehf.
+    Original author: Sveinbjorn Thordarson
+
+    BSD 3-clause License (see License.txt).
+
+
+    Local stand-in for the xmlweather.vedur.is API, for offline tests
+    and load testing. Serves synthetic (but realistically shaped)
+    observations, forecasts and texts for the query strings used in
+    weather.py, with configurable latency and error rates.
+
+    Usage:
+
+        with MockServer(latency=0.05, error_rate=0.01) as server:
+            set_base_url(server.url)
+            ...
+            set_base_url(None)
+
+    or from the command line:
+
+        python -m iceweather.mockserver --port 8000 --latency 0.05
+
+"""
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+import argparse
+import random
+import threading
+import time
+
+from .records import COMPASS_POINTS
+from .stations import station_table
+from .weather import PARAMS
+
+# Parameters included in forecasts (observations include all of PARAMS)
+_FORECAST_PARAMS: Tuple[str, ...] = ("F", "D", "T", "W", "N", "TD", "R")
+
+_WEATHER: Dict[str, Tuple[str, ...]] = {
+    "is": (
+        "Heiðskírt",
+        "Léttskýjað",
+        "Skýjað",
+        "Alskýjað",
+        "Lítils háttar rigning",
+        "Rigning",
+        "Slydda",
+        "Lítils háttar snjókoma",
+        "Snjókoma",
+        "Skúrir",
+        "Snjóél",
+        "Þoka",
+    ),
+    "en": (
+        "Clear sky",
+        "Partly cloudy",
+        "Cloudy",
+        "Overcast",
+        "Light rain",
+        "Rain",
+        "Sleet",
+        "Light snow",
+        "Snow",
+        "Rain showers",
+        "Snow showers",
+        "Fog",
+    ),
+}
+
+_SNOW_COVER: Dict[str, Tuple[str, ...]] = {
+    "is": ("Autt", "Flekkótt", "Alhvítt"),
+    "en": ("Bare", "Patchy", "Covered"),
+}
+
+_SNOW_TYPE: Dict[str, Tuple[str, ...]] = {
+    "is": ("Nýsnævi", "Lausamjöll", "Skari", "Hjarn"),
+    "en": ("New snow", "Loose snow", "Crust", "Packed snow"),
+}
+
+_NO_DATA_ERROR: Dict[str, str] = {
+    "is": "Engar nýlegar athuganir",
+    "en": "No recent observations",
+}
+_UNKNOWN_STATION_ERROR: Dict[str, str] = {
+    "is": "Stöð fannst ekki",
+    "en": "Station not found",
+}
+
+_TEXT_TITLES: Dict[str, str] = {
+    "2": "Veðurhorfur á landinu",
+    "3": "Veðurhorfur á höfuðborgarsvæðinu",
+    "5": "Veðurhorfur á landinu næstu daga",
+    "6": "Veðurhorfur á landinu næstu daga",
+    "7": "Weather outlook",
+    "9": "Veðuryfirlit",
+    "10": "Veðurlýsing",
+    "11": "Íslenskar viðvaranir fyrir land",
+    "12": "Veðurhorfur á landinu",
+    "14": "Enskar viðvaranir fyrir land",
+    "27": "Weather forecast for the next several days",
+    "30": "Miðhálendið",
+    "31": "Suðurland",
+    "32": "Faxaflói",
+    "33": "Breiðafjörður",
+    "34": "Vestfirðir",
+    "35": "Strandir og Norðurland vestra",
+    "36": "Norðurlandi eystra",
+    "37": "Austurland að Glettingi",
+    "38": "Austfirðir",
+    "39": "Suðausturland",
+    "42": "General synopsis",
+}
+
+_TEXT_SENTENCES: Tuple[str, ...] = (
+    "Austan og suðaustan 8-15 m/s og snjókoma eða slydda með köflum.",
+    "Úrkomulítið norðaustantil.",
+    "Hiti kringum frostmark.",
+    "Dregur úr vindi á morgun og styttir upp vestanlands.",
+    "Frost 0 til 8 stig.",
+    "Hægviðri og bjart með köflum.",
+)
+
+# Probability that a station doesn't report a given parameter
+_MISSING_RATE = 0.1
+
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_Latency = Union[float, Tuple[float, float]]
+
+
+def _num(x: float, decimals: int = 1) -> str:
+    """Format a number the way the API does (decimal comma)."""
+    return f"{x:.{decimals}f}".replace(".", ",")
+
+
+class MockServer:
+    """
+    Threaded HTTP server which answers xmlweather API queries
+    (type=obs, type=forec and type=txt) with synthetic XML for any
+    station ID in the station list. Unknown station IDs get results
+    with valid="0" and an error message, as from the real API.
+
+    Values are random but deterministic for each station and hour
+    (given the same seed), so repeated queries agree.
+
+    latency: seconds to wait before each response, or a (min, max) range
+    error_rate: probability of answering a request with HTTP 503
+    station_error_rate: probability of a station reporting no data (err set)
+    br_rate: probability of <br/> line breaks in weather descriptions
+    now: function returning the current time (for tests)
+
+    Set fail_next to answer that many of the next requests with HTTP 503.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: _Latency = 0.0,
+        error_rate: float = 0.0,
+        station_error_rate: float = 0.0,
+        br_rate: float = 0.1,
+        seed: int = 0,
+        now: Optional[Callable[[], datetime]] = None,
+    ) -> None:
+        self.latency = latency
+        self.error_rate = error_rate
+        self.station_error_rate = station_error_rate
+        self.br_rate = br_rate
+        self.seed = seed
+        self._now = now or (lambda: datetime.now(timezone.utc))
+        self._rnd = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.fail_next = 0
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        setattr(self._server, "mock", self)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server, for weather.set_base_url()."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}/"
+
+    def start(self) -> "MockServer":
+        """Start serving in a background (daemon) thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._server.serve_forever, name="iceweather-mock", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server and close its socket."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def serve_forever(self) -> None:
+        """Serve in the calling thread until interrupted."""
+        self._server.serve_forever()
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *args: object) -> None:
+        self.stop()
+
+    def _station_rnd(self, endpoint: str, sid: str, t: datetime) -> random.Random:
+        return random.Random(f"{self.seed}:{endpoint}:{sid}:{t:%Y%m%d%H}")
+
+    def _values(
+        self, rnd: random.Random, lang: str, params: Sequence[str], t: float
+    ) -> Dict[str, str]:
+        """Return escaped XML text for each of the given parameters,
+        for a temperature of about t."""
+        f = max(0.0, rnd.gauss(6.0, 4.0))
+        fx = f + rnd.uniform(0.0, 4.0)
+        w = escape(rnd.choice(_WEATHER[lang]))
+        if rnd.random() < self.br_rate:
+            # The API sometimes has HTML line breaks in descriptions
+            w = w + " <br/><br/> " + escape(rnd.choice(_WEATHER[lang]))
+        values = {
+            "F": str(round(f)),
+            "FX": str(round(fx)),
+            "FG": str(round(fx + rnd.uniform(0.0, 6.0))),
+            "D": rnd.choice(COMPASS_POINTS[lang]),
+            "T": _num(t),
+            "W": w,
+            "V": str(rnd.choice((1, 5, 10, 20, 30, 50, 70))),
+            "N": str(rnd.choice((0, 10, 30, 50, 70, 90, 100))),
+            "P": str(round(rnd.gauss(1005.0, 12.0))),
+            "RH": str(rnd.randint(40, 100)),
+            "SNC": escape(rnd.choice(_SNOW_COVER[lang])),
+            "SND": str(rnd.randint(0, 40)),
+            "SED": escape(rnd.choice(_SNOW_TYPE[lang])),
+            "RTE": _num(t - rnd.uniform(0.0, 3.0)),
+            "TD": _num(t - rnd.uniform(0.0, 8.0)),
+            "R": _num(max(0.0, rnd.gauss(0.0, 1.5))),
+        }
+        # Stations don't measure every parameter
+        return {p: "" if rnd.random() < _MISSING_RATE else values[p] for p in params}
+
+    def _station_head(
+        self, sid: str, lang: str, rnd: random.Random
+    ) -> Tuple[str, str, bool]:
+        """Return the opening of a station element (valid flag and name),
+        the error message, and whether the station has data."""
+        i = station_table().index_for_id(int(sid)) if sid.isdigit() else None
+        if i is None:
+            head = f'<station valid="0" id="{escape(sid)}"><name></name>'
+            return head, _UNKNOWN_STATION_ERROR[lang], False
+        name = escape(station_table().names[i])
+        head = f'<station valid="1" id="{sid}"><name>{name}</name>'
+        if rnd.random() < self.station_error_rate:
+            return head, _NO_DATA_ERROR[lang], False
+        return head, "", True
+
+    @staticmethod
+    def _link(endpoint: str, sid: str) -> str:
+        page = "athuganir/kort" if endpoint == "obs" else "spar/stadaspar"
+        return (
+            f"<link>https://www.vedur.is/vedur/{page}/hofudborgarsvaedid/"
+            f"#group=100&amp;station={escape(sid)}</link>"
+        )
+
+    def observations(self, ids: Sequence[str], lang: str, params: Sequence[str]) -> str:
+        """Return an observations document for the given station IDs."""
+        now = self._now().replace(minute=0, second=0, microsecond=0)
+        parts = ['<?xml version="1.0" encoding="utf-8"?>\n<observations>']
+        for sid in ids:
+            rnd = self._station_rnd("obs", sid, now)
+            head, err, ok = self._station_head(sid, lang, rnd)
+            t = rnd.gauss(1.0, 5.0)
+            values = self._values(rnd, lang, params, t) if ok else {}
+            parts.append(
+                head
+                + f"<time>{now.strftime(_TIME_FORMAT) if ok else ''}</time>"
+                + f"<err>{escape(err)}</err>"
+                + self._link("obs", sid)
+                + "".join(f"<{p}>{values.get(p, '')}</{p}>" for p in params)
+                + "</station>"
+            )
+        parts.append("</observations>\n")
+        return "\n".join(parts)
+
+    def forecasts(
+        self,
+        ids: Sequence[str],
+        lang: str,
+        params: Sequence[str],
+        steps: int = 24,
+        step_hours: int = 3,
+    ) -> str:
+        """Return a forecasts document for the given station IDs."""
+        now = self._now()
+        atime = now.replace(hour=now.hour // 6 * 6, minute=0, second=0, microsecond=0)
+        fparams = [p for p in params if p in _FORECAST_PARAMS]
+        parts = ['<?xml version="1.0" encoding="utf-8"?>\n<forecasts>']
+        for sid in ids:
+            rnd = self._station_rnd("forec", sid, atime)
+            head, err, ok = self._station_head(sid, lang, rnd)
+            parts.append(
+                head
+                + f"<atime>{atime:{_TIME_FORMAT}}</atime>"
+                + f"<err>{escape(err)}</err>"
+                + self._link("forec", sid)
+            )
+            t = rnd.gauss(1.0, 5.0)
+            for step in range(steps if ok else 0):
+                ftime = atime + timedelta(hours=step_hours * (step + 1))
+                t += rnd.gauss(0.0, 1.0)
+                values = self._values(rnd, lang, fparams, t)
+                parts.append(
+                    f"<forecast><ftime>{ftime:{_TIME_FORMAT}}</ftime>"
+                    + "".join(f"<{p}>{values[p]}</{p}>" for p in fparams)
+                    + "</forecast>"
+                )
+            parts.append("</station>")
+        parts.append("</forecasts>\n")
+        return "\n".join(parts)
+
+    def texts(self, ids: Sequence[str]) -> str:
+        """Return a texts document for the given text IDs."""
+        now = self._now().replace(minute=0, second=0, microsecond=0)
+        parts = ['<?xml version="1.0" encoding="utf-8"?>\n<texts>']
+        for tid in ids:
+            rnd = self._station_rnd("txt", tid, now)
+            title = _TEXT_TITLES.get(tid, "Veðurhorfur")
+            # Texts have HTML line breaks between paragraphs
+            content = "<br/>".join(
+                escape(s) for s in rnd.sample(_TEXT_SENTENCES, rnd.randint(2, 4))
+            )
+            parts.append(
+                f'<text id="{escape(tid)}"><title>{escape(title)}</title>'
+                f"<creation>{now - timedelta(hours=1):{_TIME_FORMAT}}</creation>"
+                f"<valid_from>{now:{_TIME_FORMAT}}</valid_from>"
+                f"<valid_to>{now + timedelta(days=2):{_TIME_FORMAT}}</valid_to>"
+                f"<content>{content}</content></text>"
+            )
+        parts.append("</texts>\n")
+        return "\n".join(parts)
+
+    def _respond(self, path: str) -> Tuple[int, str]:
+        """Return the HTTP status and body for a request path."""
+        with self._lock:
+            self.requests += 1
+            fail = self._rnd.random() < self.error_rate or self.fail_next > 0
+            self.fail_next = max(0, self.fail_next - 1)
+            latency = (
+                self._rnd.uniform(*self.latency)
+                if isinstance(self.latency, tuple)
+                else self.latency
+            )
+        if latency > 0:
+            time.sleep(latency)
+        if fail:
+            return 503, "Service Unavailable"
+
+        query = parse_qs(urlparse(path).query)
+        endpoint = query.get("type", [""])[0]
+        if query.get("op_w", [""])[0] != "xml" or endpoint not in (
+            "obs",
+            "forec",
+            "txt",
+        ):
+            return 400, "Bad Request"
+        ids = [i for i in query.get("ids", [""])[0].split(";") if i]
+        lang = query.get("lang", ["is"])[0]
+        lang = lang if lang in COMPASS_POINTS else "is"
+        p = query.get("params", [""])[0]
+        params = [x for x in p.split(";") if x in PARAMS] if p else PARAMS
+
+        if endpoint == "obs":
+            return 200, self.observations(ids, lang, params)
+        if endpoint == "forec":
+            return 200, self.forecasts(ids, lang, params)
+        return 200, self.texts(ids)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+    # Headers and body are written separately; without this, Nagle's
+    # algorithm and delayed ACKs add ~40 ms to each small response
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        mock: MockServer = getattr(self.server, "mock")
+        status, text = mock._respond(self.path)
+        body = text.encode("utf-8")
+        self.send_response(status)
+        content_type = "text/xml" if status == 200 else "text/plain"
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Run a local stand-in xmlweather API.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8000)
+    ap.add_argument(
+        "--latency",
+        type=float,
+        nargs="+",
+        default=[0.0],
+        metavar="SECONDS",
+        help="response delay, or a min and max delay",
+    )
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--station-error-rate", type=float, default=0.0)
+    ap.add_argument("--br-rate", type=float, default=0.1)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    latency: _Latency = (
+        (args.latency[0], args.latency[1]) if len(args.latency) > 1 else args.latency[0]
+    )
+    server = MockServer(
+        args.host,
+        args.port,
+        latency=latency,
+        error_rate=args.error_rate,
+        station_error_rate=args.station_error_rate,
+        br_rate=args.br_rate,
+        seed=args.seed,
+    )
+    print(f"Serving on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+
+    iceweather: Look up information about Icelandic weather (observations, forecasts,
+    human readable descriptive texts, etc.) using vedur.is xmlweather API.
+
+    Copyright (c) 2019-2023 Miðeind ehf.
+    Original author: Sveinbjorn Thordarson
+
+    BSD 3-clause License (see License.txt).
+
+
+    Process-wide limits on calls to the weather API: a token bucket rate
+    limit and a cap on the number of calls in flight, shared by threads
+    (the thread pool used for chunked fetches) and asyncio tasks in any
+    event loop (see aio.py). Limits can be set for all endpoints together
+    and for each endpoint. Time spent waiting is recorded in the call's
+    CallRecord (as queued) and in the metrics.
+
+"""
+
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+import threading
+import time
+
+from .metrics import CallRecord
+
+if TYPE_CHECKING:
+    import asyncio
+
+# A thread waiting for a call slot, or an asyncio future in its event loop
+# (asyncio is only imported when used, as it is slow to import)
+_AsyncWaiter = Tuple["asyncio.AbstractEventLoop", "asyncio.Future[Any]"]
+_Waiter = Union[threading.Event, _AsyncWaiter]
+
+
+class RateLimit:
+    """Limits calls to at most rate per second on average (with bursts
+    of up to burst calls) and to at most max_in_flight at a time.
+    Either limit can be None for no limit. Calls acquire a slot first
+    and then wait for their turn under the rate limit, in order."""
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: int = 1,
+        max_in_flight: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        if max_in_flight is not None and max_in_flight < 1:
+            raise ValueError("max_in_flight must be positive")
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._in_flight = 0
+        self._waiters: Deque[_Waiter] = deque()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of calls currently holding a slot."""
+        return self._in_flight
+
+    def _reserve(self) -> float:
+        """Take a token from the bucket, returning the number of seconds
+        until it is available. Tokens taken in advance make the balance
+        negative, which queues later callers behind them."""
+        if self.rate is None:
+            return 0.0
+        with self._lock:
+            now = self._clock()
+            elapsed = now - self._updated
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._updated = now
+            self._tokens -= 1.0
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def _take_slot(self, waiter: Callable[[], _Waiter]) -> Optional[_Waiter]:
+        """Take a slot if one is free (and nobody is queued for one),
+        returning None, otherwise queue and return a new waiter, which
+        release() will hand a slot to."""
+        with self._lock:
+            if self.max_in_flight is None:
+                return None
+            if self._in_flight < self.max_in_flight and not self._waiters:
+                self._in_flight += 1
+                return None
+            w = waiter()
+            self._waiters.append(w)
+            return w
+
+    def acquire(self) -> None:
+        """Wait for a slot and for a turn under the rate limit."""
+        event = self._take_slot(threading.Event)
+        if isinstance(event, threading.Event):
+            event.wait()
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """Async version of acquire(), which doesn't block the event loop."""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        waiter = self._take_slot(lambda: (loop, loop.create_future()))
+        if isinstance(waiter, tuple):
+            try:
+                await waiter[1]
+            except asyncio.CancelledError:
+                self._cancel(waiter)
+                raise
+        try:
+            wait = self._reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            self.release()
+            raise
+
+    def _cancel(self, waiter: _AsyncWaiter) -> None:
+        """Clean up after a cancelled async waiter."""
+        with self._lock:
+            try:
+                self._waiters.remove(waiter)
+                return
+            except ValueError:
+                pass
+        # A slot was handed over; give it back unless _wake() will
+        fut = waiter[1]
+        if fut.done() and not fut.cancelled():
+            self.release()
+
+    def _wake(self, fut: "asyncio.Future[Any]") -> None:
+        """Complete an async waiter's future (in its event loop)."""
+        if fut.cancelled():
+            self.release()
+        elif not fut.done():
+            fut.set_result(None)
+
+    def release(self) -> None:
+        """Release a slot, handing it over to the first waiter if any."""
+        with self._lock:
+            if self.max_in_flight is None:
+                return
+            if not self._waiters:
+                self._in_flight -= 1
+                return
+            waiter = self._waiters.popleft()
+        if isinstance(waiter, threading.Event):
+            waiter.set()
+        else:
+            loop, fut = waiter
+            try:
+                loop.call_soon_threadsafe(self._wake, fut)
+            except RuntimeError:
+                # The waiter's event loop is closed
+                self.release()
+
+    def __repr__(self) -> str:
+        return (
+            f"RateLimit(rate={self.rate!r}, burst={self.burst!r}, "
+            f"max_in_flight={self.max_in_flight!r})"
+        )
+
+
+# Limits by endpoint; the None key holds the limit shared by all endpoints
+_limits: Dict[Optional[str], RateLimit] = {}
+
+
+def configure_rate_limit(
+    rate: Optional[float] = None,
+    burst: int = 1,
+    max_in_flight: Optional[int] = None,
+    endpoint: Optional[str] = None,
+) -> None:
+    """Limit calls to the weather API to at most rate calls per second
+    (allowing bursts of up to burst calls) and at most max_in_flight
+    concurrent calls. With endpoint ("obs", "forec" or "txt"), the limit
+    only applies to that endpoint, in addition to the limit for all
+    endpoints. Calling with neither rate nor max_in_flight removes the
+    limit. Retries made within a call (see configure_http) are not
+    counted separately, except in the asyncio API. In the synchronous
+    API, a call is in flight until its response starts to arrive, as the
+    body is parsed incrementally while the caller consumes results."""
+    if rate is None and max_in_flight is None:
+        _limits.pop(endpoint, None)
+    else:
+        _limits[endpoint] = RateLimit(rate, burst, max_in_flight)
+
+
+def rate_limits() -> Dict[Optional[str], RateLimit]:
+    """Return the configured limits, by endpoint (None for all endpoints)."""
+    return dict(_limits)
+
+
+def _limits_for(endpoint: str) -> List[RateLimit]:
+    return [
+        lim for lim in (_limits.get(None), _limits.get(endpoint)) if lim is not None
+    ]
+
+
+@contextmanager
+def limited(endpoint: str, record: CallRecord) -> Iterator[None]:
+    """Context manager which waits until an API call to the endpoint is
+    allowed, holding its slot(s) until the block exits."""
+    limits = _limits_for(endpoint)
+    acquired: List[RateLimit] = []
+    t0 = time.perf_counter()
+    try:
+        for lim in limits:
+            lim.acquire()
+            acquired.append(lim)
+        if limits:
+            record.queued += time.perf_counter() - t0
+        yield
+    finally:
+        for lim in reversed(acquired):
+            lim.release()
+
+
+@asynccontextmanager
+async def limited_async(endpoint: str, record: CallRecord) -> AsyncIterator[None]:
+    """Async version of limited()."""
+    limits = _limits_for(endpoint)
+    acquired: List[RateLimit] = []
+    t0 = time.perf_counter()
+    try:
+        for lim in limits:
+            await lim.acquire_async()
+            acquired.append(lim)
+        if limits:
+            record.queued += time.perf_counter() - t0
+        yield
+    finally:
+        for lim in reversed(acquired):
+            lim.release()
+
+
+def limited_chunks(
+    endpoint: str, record: CallRecord, chunks: Iterator[bytes]
+) -> Iterator[bytes]:
+    """Pass through response body chunks from an API call, starting the
+    call when allowed. Its slot is held until the response starts to
+    arrive (the first chunk), not while the rest of the body streams in
+    and the consumer works through the results, which could otherwise
+    deadlock if the consumer makes API calls of its own."""
+    if not _limits_for(endpoint):
+        yield from chunks
+        return
+    it = iter(chunks)
+    with limited(endpoint, record):
+        first = next(it, None)
+    if first is not None:
+        yield first
+        yield from it
@@ -0,0 +1,259 @@
+"""
+
+    iceweather: Look up information about Icelandic weather (observations, forecasts,
+    human readable descriptive texts, etc.) using vedur.is xmlweather API.
+
+    Copyright (c) 2019-2023 Miðeind ehf.
+    Original author: Sveinbjorn Thordarson
+
+    BSD 3-clause License (see License.txt).
+
+
+    Compact typed records for weather API results, with numeric values
+    parsed once. Missing or unparseable values are None.
+
+"""
+
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from datetime import datetime, timezone
+
+
+# Format of time values in API results (Iceland is on UTC year-round)
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def parse_float(s: Optional[str]) -> Optional[float]:
+    """Parse a numeric value from the API, None if missing or not a number."""
+    if not s:
+        return None
+    try:
+        return float(s.replace(",", "."))
+    except ValueError:
+        return None
+
+
+def parse_int(s: Optional[str]) -> Optional[int]:
+    """Parse an integer value from the API, None if missing or not a number."""
+    if not s:
+        return None
+    try:
+        return int(s)
+    except ValueError:
+        return None
+
+
+def parse_time(s: Optional[str]) -> Optional[datetime]:
+    """Parse a time value from the API to a timezone-aware (UTC) datetime."""
+    if not s:
+        return None
+    try:
+        return datetime.strptime(s, _TIME_FORMAT).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+# Names of the 16 compass points, clockwise from north, per language
+# (Icelandic uses A for austur/east and V for vestur/west)
+COMPASS_POINTS: Dict[str, Tuple[str, ...]] = {
+    "is": tuple("N NNA NA ANA A ASA SA SSA S SSV SV VSV V VNV NV NNV".split()),
+    "en": tuple("N NNE NE ENE E ESE SE SSE S SSW SW WSW W WNW NW NNW".split()),
+}
+
+_COMPASS_DEGREES: Dict[str, float] = {
+    name: i * 22.5 for names in COMPASS_POINTS.values() for i, name in enumerate(names)
+}
+
+
+def parse_direction(s: Optional[str]) -> Optional[float]:
+    """Parse a wind direction (compass point in either language, e.g. SSV
+    or SSW) to degrees clockwise from north. None if missing or calm."""
+    if not s:
+        return None
+    return _COMPASS_DEGREES.get(s.strip().upper())
+
+
+def direction_name(degrees: float, lang: str = "is") -> str:
+    """Return the name of the compass point closest to the given direction."""
+    return COMPASS_POINTS[lang][round((degrees % 360.0) / 22.5) % 16]
+
+
+def _parse_bool(s: Optional[str]) -> Optional[bool]:
+    return None if not s else s != "0"
+
+
+def _parse_str(s: Optional[str]) -> Optional[str]:
+    return s or None
+
+
+def _format(v: Any) -> str:
+    """Format a parsed value back to the string form used by the API
+    (which uses a decimal comma)."""
+    if v is None:
+        return ""
+    if isinstance(v, bool):
+        return "1" if v else "0"
+    if isinstance(v, float):
+        return str(int(v)) if v.is_integer() else repr(v).replace(".", ",")
+    if isinstance(v, datetime):
+        return v.strftime(_TIME_FORMAT)
+    return str(v)
+
+
+_Fields = Tuple[Tuple[str, Callable[[Optional[str]], Any]], ...]
+
+# Weather parameters, shared by observations and forecast steps
+_PARAM_FIELDS: _Fields = (
+    ("F", parse_float),
+    ("FX", parse_float),
+    ("FG", parse_float),
+    ("D", _parse_str),
+    ("T", parse_float),
+    ("W", _parse_str),
+    ("V", parse_float),
+    ("N", parse_float),
+    ("P", parse_float),
+    ("RH", parse_float),
+    ("SNC", _parse_str),
+    ("SND", parse_float),
+    ("SED", _parse_str),
+    ("RTE", parse_float),
+    ("TD", parse_float),
+    ("R", parse_float),
+)
+
+# Parameters with text values (all others are numeric)
+_TEXT_PARAMS = frozenset(k for k, parse in _PARAM_FIELDS if parse is _parse_str)
+
+_STATION_FIELDS: _Fields = (
+    ("id", parse_int),
+    ("name", _parse_str),
+    ("valid", _parse_bool),
+    ("err", _parse_str),
+    ("link", _parse_str),
+)
+
+
+class _Record:
+    """Base class for records. Subclasses define _FIELDS, a tuple of
+    (key, parser) pairs, and matching __slots__."""
+
+    __slots__: Tuple[str, ...] = ("_keys",)
+    _FIELDS: _Fields = ()
+
+    def __init__(self, **kwargs: Any) -> None:
+        for key, _ in self._FIELDS:
+            setattr(self, key, kwargs.get(key))
+        # Keys of the result dict the record was created from (None for all)
+        self._keys: Optional[FrozenSet[str]] = None
+
+    @classmethod
+    def _from_dict(cls, d: Dict) -> Any:
+        r = cls.__new__(cls)
+        for key, parse in cls._FIELDS:
+            setattr(r, key, parse(d.get(key)))
+        r._keys = frozenset(d)
+        return r
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the record in the original (dict of strings) result shape,
+        with the keys of the dict it was created from (e.g. only some of
+        the weather parameters, if only those were requested)."""
+        keys = self._keys
+        return {
+            key: _format(getattr(self, key))
+            for key, _ in self._FIELDS
+            if keys is None or key in keys
+        }
+
+    def __eq__(self, other: object) -> bool:
+        return type(self) is type(other) and all(
+            getattr(self, key) == getattr(other, key) for key, _ in self._FIELDS
+        )
+
+    def __repr__(self) -> str:
+        values = ", ".join(
+            f"{key}={getattr(self, key)!r}"
+            for key, _ in self._FIELDS
+            if getattr(self, key) is not None
+        )
+        return f"{type(self).__name__}({values})"
+
+
+class _StationRecord(_Record):
+    """Base class for per-station results, which may be stale results
+    served from the cache when the API is unavailable (see
+    configure_circuit_breaker), with their age in seconds."""
+
+    __slots__ = ("stale", "age")
+
+    def __init__(
+        self, stale: bool = False, age: Optional[float] = None, **kwargs: Any
+    ) -> None:
+        super().__init__(**kwargs)
+        self.stale = stale
+        self.age = age
+
+    @classmethod
+    def _from_dict(cls, d: Dict) -> Any:
+        r = super()._from_dict(d)
+        r.stale = bool(d.get("stale"))
+        r.age = d.get("age")
+        return r
+
+    def as_dict(self) -> Dict[str, Any]:
+        d = super().as_dict()
+        if self.stale:
+            d["stale"] = True
+            d["age"] = self.age
+        return d
+
+
+class Observation(_StationRecord):
+    """Weather observation from a single station."""
+
+    _FIELDS = _STATION_FIELDS + (("time", parse_time),) + _PARAM_FIELDS
+    __slots__ = tuple(key for key, _ in _FIELDS)
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "Observation":
+        """Create an observation from a result dict."""
+        return cls._from_dict(d)
+
+
+class ForecastStep(_Record):
+    """Weather forecast for a station at a single point in time."""
+
+    _FIELDS = (("ftime", parse_time),) + _PARAM_FIELDS
+    __slots__ = tuple(key for key, _ in _FIELDS)
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "ForecastStep":
+        """Create a forecast step from a dict in a result's forecast list."""
+        return cls._from_dict(d)
+
+
+class StationForecast(_StationRecord):
+    """Weather forecast from a single station, with a list of forecast steps."""
+
+    _FIELDS = _STATION_FIELDS + (("atime", parse_time),)
+    __slots__ = tuple(key for key, _ in _FIELDS) + ("forecast",)
+
+    def __init__(self, forecast: Optional[List[ForecastStep]] = None, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.forecast: List[ForecastStep] = forecast or []
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "StationForecast":
+        """Create a station forecast from a result dict."""
+        r = cls._from_dict(d)
+        r.forecast = [ForecastStep.from_dict(f) for f in d.get("forecast", ())]
+        return r
+
+    def as_dict(self) -> Dict[str, Any]:
+        d = super().as_dict()
+        d["forecast"] = [f.as_dict() for f in self.forecast]
+        return d
+
+    def __eq__(self, other: object) -> bool:
+        return super().__eq__(other) and self.forecast == other.forecast  # type: ignore
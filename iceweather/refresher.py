@@ -0,0 +1,231 @@
+"""
+
+    iceweather: Look up information about Icelandic weather (observations, forecasts,
+    human readable descriptive texts, etc.) using vedur.is xmlweather API.
+
+    Copyright (c) 2019-2023 Miðeind ehf.
+    Original author: Sveinbjorn Thordarson
+
+    BSD 3-clause License (see License.txt).
+
+
+    Background refresher which keeps observations and forecasts for
+    a set of stations warm in the response cache.
+
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+from datetime import datetime, timezone
+import logging
+import threading
+import time
+
+from . import weather
+from .records import parse_time
+from .weather import (
+    _ArgType,
+    _DEFAULT_LANG,
+    _ParamsType,
+    _all_station_ids,
+    _arg_to_str_list,
+    _fetch_results,
+    _params_str,
+)
+
+_LOG = logging.getLogger(__name__)
+
+# Result key holding the time of the data, per endpoint
+_TIME_KEYS: Dict[str, str] = {"obs": "time", "forec": "atime"}
+
+# Initial guess of how often new data appears (seconds), per endpoint,
+# used until the cadence of a station has been observed
+_DEFAULT_INTERVALS: Dict[str, float] = {"obs": 10 * 60.0, "forec": 3 * 3600.0}
+
+# Callback signature: callback(endpoint, result), where endpoint is
+# "obs" or "forec" and result is the new result dict for a station
+Subscriber = Callable[[str, Dict], None]
+
+
+class _StationState:
+    """Polling state for one (endpoint, station) pair."""
+
+    __slots__ = ("due", "last_time", "interval", "misses")
+
+    def __init__(self, interval: float) -> None:
+        self.due = 0.0  # Monotonic time of next poll
+        self.last_time: Optional[datetime] = None  # Time of latest data
+        self.interval = interval  # Estimated time between new data
+        self.misses = 0  # Polls in a row without new data
+
+
+class Refresher:
+    """
+    Keeps observations and/or forecasts for the given stations (default:
+    all stations) warm in the response cache, so that requests for them
+    are served without waiting on the weather API.
+
+    Each station's next poll is scheduled from the time of the data it
+    last returned, using the observed interval between new data for that
+    station, so stations reporting every 10 minutes and stations reporting
+    hourly are each polled at their own cadence. Stations that are due at
+    the same time are fetched together in batched calls. Subscribers are
+    called with (endpoint, result) whenever new data arrives.
+
+    Use start() and stop() (or a with statement) to run the refresher in a
+    background thread, or call refresh_due() periodically from your own loop.
+    """
+
+    def __init__(
+        self,
+        station_ids: Optional[_ArgType] = None,
+        lang: str = _DEFAULT_LANG,
+        observations: bool = True,
+        forecasts: bool = True,
+        params: _ParamsType = None,
+        min_interval: float = 60.0,
+        max_interval: float = 6 * 3600.0,
+        grace: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+        now: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ) -> None:
+        ids = (
+            _all_station_ids() if station_ids is None else _arg_to_str_list(station_ids)
+        )
+        self.lang = lang
+        self.params = _params_str(params)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.grace = grace
+        self._clock = clock
+        self._now = now
+        self._states: Dict[Tuple[str, str], _StationState] = {}
+        endpoints = [e for e, on in (("obs", observations), ("forec", forecasts)) if on]
+        for endpoint in endpoints:
+            for i in dict.fromkeys(ids):
+                self._states[(endpoint, i)] = _StationState(
+                    _DEFAULT_INTERVALS[endpoint]
+                )
+        self._subscribers: List[Subscriber] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, callback: Subscriber) -> None:
+        """Call callback(endpoint, result) whenever new data arrives."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Subscriber) -> None:
+        """Remove a subscriber."""
+        with self._lock:
+            self._subscribers.remove(callback)
+
+    def next_due(self) -> float:
+        """Return the (monotonic) time when the next poll is due."""
+        with self._lock:
+            return min((s.due for s in self._states.values()), default=float("inf"))
+
+    def refresh_due(self) -> int:
+        """Fetch data for all stations whose poll is due.
+        Returns the number of stations polled."""
+        now = self._clock()
+        due: Dict[str, List[str]] = {}
+        with self._lock:
+            for (endpoint, i), state in self._states.items():
+                if state.due <= now:
+                    due.setdefault(endpoint, []).append(i)
+        for endpoint, ids in due.items():
+            self._refresh(endpoint, ids)
+        return sum(len(ids) for ids in due.values())
+
+    def _clamp(self, seconds: float, upper: Optional[float] = None) -> float:
+        return max(self.min_interval, min(seconds, upper or self.max_interval))
+
+    def _refresh(self, endpoint: str, ids: List[str]) -> None:
+        try:
+            results = _fetch_results(
+                endpoint, ids, self.lang, use_cache=False, params=self.params
+            )
+        except Exception:
+            _LOG.exception("Error refreshing %s for %d stations", endpoint, len(ids))
+            retry = self._clock() + self.min_interval
+            with self._lock:
+                for i in ids:
+                    self._states[(endpoint, i)].due = retry
+            return
+
+        by_id = {r.get("id"): r for r in results}
+        now, wall = self._clock(), self._now()
+        fresh: List[Dict] = []
+        with self._lock:
+            for i in ids:
+                state = self._states[(endpoint, i)]
+                r = by_id.get(i)
+                if r is None or r.get("err"):
+                    # Station doesn't return data, check back much later
+                    state.due = now + self.max_interval
+                    continue
+                t = parse_time(r.get(_TIME_KEYS[endpoint]))
+                if t is not None and (state.last_time is None or t > state.last_time):
+                    if state.last_time is not None:
+                        state.interval = self._clamp(
+                            (t - state.last_time).total_seconds()
+                        )
+                    state.last_time = t
+                    state.misses = 0
+                    # Next data is expected one interval after this data
+                    expected = state.interval - (wall - t).total_seconds()
+                    state.due = now + self._clamp(expected + self.grace)
+                    fresh.append(r)
+                else:
+                    # No new data yet, back off exponentially up to the interval
+                    state.misses += 1
+                    backoff = self.min_interval * (2 ** min(state.misses, 16))
+                    state.due = now + self._clamp(backoff, state.interval)
+                # Keep the result in the cache until the next poll
+                weather._CACHE.put(
+                    (endpoint, i, self.lang, self.params),
+                    r,
+                    ttl=state.due - now + self.grace,
+                )
+            subscribers = list(self._subscribers)
+
+        for r in fresh:
+            for callback in subscribers:
+                try:
+                    callback(endpoint, weather._copy_result(r))
+                except Exception:
+                    _LOG.exception("Error in refresher subscriber")
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh_due()
+            except Exception:
+                _LOG.exception("Error in refresher")
+            wait = self.next_due() - self._clock()
+            self._stop.wait(max(1.0, min(wait, self.max_interval)))
+
+    def start(self) -> "Refresher":
+        """Start refreshing in a background (daemon) thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="iceweather-refresher", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the background thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def __enter__(self) -> "Refresher":
+        return self.start()
+
+    def __exit__(self, *args: object) -> None:
+        self.stop()
@@ -0,0 +1,144 @@
+"""
+
+    iceweather: Look up information about Icelandic weather (observations, forecasts,
+    human readable descriptive texts, etc.) using vedur.is xmlweather API.
+
+    Copyright (c) 2019-2023 Miðeind ehf.
+    Original author: Sveinbjorn Thordarson
+
+    BSD 3-clause License (see License.txt).
+
+
+    Spatial index for nearest weather station lookups.
+
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import heapq
+import math
+
+from .util import distance
+
+
+_Vector = Tuple[float, float, float]
+# k-d tree node: (point index, split axis, left subtree, right subtree)
+_Node = Tuple[int, int, Optional["_Node"], Optional["_Node"]]
+
+# Relative and absolute slack when collecting candidates that tie with
+# the k-th nearest station (guards against floating point rounding)
+_TIE_REL_EPS: float = 1e-9
+_TIE_ABS_EPS: float = 1e-12
+
+
+def unit_vector(lat: float, lon: float) -> _Vector:
+    """Convert (lat, lon) in degrees to a 3D unit vector."""
+    rlat = math.radians(lat)
+    rlon = math.radians(lon)
+    clat = math.cos(rlat)
+    return (clat * math.cos(rlon), clat * math.sin(rlon), math.sin(rlat))
+
+
+class StationIndex:
+    """
+    k-d tree over 3D unit vectors of station locations.
+    Ordering by chord length on the unit sphere is the same as ordering
+    by great-circle distance, so the tree can answer k-nearest queries
+    without computing the Haversine distance to every station.
+    """
+
+    def __init__(self, stations: Sequence[Dict]) -> None:
+        self._stations: List[Dict] = list(stations)
+        self._points: List[_Vector] = [
+            unit_vector(s["lat"], s["lon"]) for s in self._stations
+        ]
+        self._root: Optional[_Node] = self._build(list(range(len(self._points))), 0)
+
+    def __len__(self) -> int:
+        return len(self._stations)
+
+    def _build(self, idxs: List[int], depth: int) -> Optional[_Node]:
+        if not idxs:
+            return None
+        axis = depth % 3
+        idxs.sort(key=lambda i: self._points[i][axis])
+        mid = len(idxs) // 2
+        return (
+            idxs[mid],
+            axis,
+            self._build(idxs[:mid], depth + 1),
+            self._build(idxs[mid + 1 :], depth + 1),
+        )
+
+    def _knn(self, q: _Vector, k: int) -> float:
+        """Return the squared chord length to the k-th nearest point."""
+        # Max-heap (negated) of the k best squared distances found so far
+        heap: List[float] = []
+        points = self._points
+        stack: List[Optional[_Node]] = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            idx, axis, left, right = node
+            p = points[idx]
+            dx, dy, dz = p[0] - q[0], p[1] - q[1], p[2] - q[2]
+            d2 = dx * dx + dy * dy + dz * dz
+            if len(heap) < k:
+                heapq.heappush(heap, -d2)
+            elif d2 < -heap[0]:
+                heapq.heapreplace(heap, -d2)
+            diff = q[axis] - p[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            # Visit the far side only if it can hold a closer point
+            if len(heap) < k or diff * diff <= -heap[0]:
+                stack.append(far)
+            stack.append(near)
+        return -heap[0]
+
+    def _within(self, q: _Vector, r2: float) -> List[int]:
+        """Return indices of all points within squared chord length r2 of q."""
+        found: List[int] = []
+        points = self._points
+        stack: List[Optional[_Node]] = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            idx, axis, left, right = node
+            p = points[idx]
+            dx, dy, dz = p[0] - q[0], p[1] - q[1], p[2] - q[2]
+            if dx * dx + dy * dy + dz * dz <= r2:
+                found.append(idx)
+            diff = q[axis] - p[axis]
+            if diff <= 0 or diff * diff <= r2:
+                stack.append(left)
+            if diff >= 0 or diff * diff <= r2:
+                stack.append(right)
+        return found
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> List[Dict]:
+        """
+        Return the k stations nearest to (lat, lon), closest first.
+        Results are identical to sorting all stations by Haversine distance
+        (ties keep the original station order).
+        """
+        if k < 1 or self._root is None:
+            return []
+        if k >= len(self._stations):
+            candidates = list(range(len(self._stations)))
+        else:
+            q = unit_vector(lat, lon)
+            r2 = self._knn(q, k)
+            # Collect everything tied with the k-th nearest point, then
+            # rank the (few) candidates exactly by Haversine distance
+            candidates = self._within(q, r2 * (1 + _TIE_REL_EPS) + _TIE_ABS_EPS)
+        stations = self._stations
+        ranked = sorted(
+            candidates,
+            key=lambda i: (
+                distance((lat, lon), (stations[i]["lat"], stations[i]["lon"])),
+                i,
+            ),
+        )
+        return [stations[i] for i in ranked[:k]]
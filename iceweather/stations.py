@@ -8,320 +8,381 @@
 
     BSD 3-clause License (see License.txt).
 
+
+    Weather stations in Iceland. The station table is kept as a single
+    string and parsed on first use into a compact column-oriented table
+    (arrays of IDs and coordinates plus a tuple of names), so importing
+    the package does no per-station work. STATIONS, the list of station
+    dicts, is likewise created on first access.
+
 """
 
-from typing import List, Dict
+from typing import Dict, List, Optional, Tuple
+
+from array import array
+import threading
+
+
+# One station per line: ID, latitude, longitude and name, separated by spaces
+_STATION_DATA: str = """\
+9010 66.369 -23.019 Aðalvík
+31572 64.3105 -21.966 Akrafjall
+422 65.6856 -18.1002 Akureyri
+3471 65.6961 -18.1113 Akureyri - Krossanesbraut
+31109 64.0888 -21.8366 Arnarnesvegur
+3007 65.123 -20.6961 Austurárdalsháls
+6420 64.0405 -20.2521 Árnes
+4614 66.03 -16.4833 Ásbyrgi
+2175 65.2297 -21.7543 Ásgarður
+195 65.2297 -21.7543 Ásgarður
+4380 65.5235 -13.8167 Bakkagerði
+6237 63.6791 -19.4814 Básar á Goðalandi
+34326 65.5583 -16.0113 Biskupsháls
+2428 65.6794 -23.6122 Bíldudalur
+2304 65.5029 -24.5312 Bjargtangar
+4472 65.7857 -14.3082 Bjarnarey
+2480 65.7284 -21.5718 Bjarnarfjarðarháls
+3585 65.9454 -17.5919 Björg í Kinn
+1936 64.8393 -23.3012 Bláfeldur
+1487 63.9831 -21.6497 Bláfjallaskáli
+1486 63.969 -21.6661 Bláfjöll
+31577 64.2664 -21.8329 Blikdalsá
+3317 65.658 -20.2925 Blönduós
+33419 65.6668 -20.2383 Blönduós Vegagerðarstöð
+2738 66.161 -23.2538 Bolungarvík
+7736 66.1684 -23.2681 Bolungarvík - Traðargil
+35116 64.1848 -15.8145 Borgarhöfn
+32635 66.0808 -23.3733 Botn í Súgandafirði
+1689 64.4529 -21.4034 Botnsheiði
+35965 64.9068 -14.6034 Breiðdalsheiði
+5940 65.1086 -15.5297 Brú á Jökuldal
+5932 64.728 -16.1117 Brúarjökull B10
+5825 64.8281 -16.0897 Brúaröræfi
+3223 65.3784 -20.2473 Brúsastaðir
+36415 64.1575 -20.3675 Bræðratunguvegur
+31932 64.9366 -23.5033 Búlandshöfði
+6430 64.1168 -19.7449 Búrfell
+620 65.2682 -13.5759 Dalatangi
+4193 65.2681 -13.5751 Dalatangi
+9006 65.042 -16.595 Dreki
+7790 64.5039 -17.2348 Dyngjujökull
+571 65.283 -14.4025 Egilsstaðaflugvöllur
+36270 63.7338 -18.1977 Eldhraun
+32390 65.5724 -21.329 Ennisháls
+5981 65.0763 -14.037 Eskifjörður
+5943 64.8151 -15.4235 Eyjabakkar
+1395 63.8692 -21.1602 Eyrarbakki
+34073 65.1264 -14.3327 Fagridalur
+5309 63.8743 -16.6364 Fagurhólsmýri
+5982 64.9372 -14.0407 Fáskrúðsfjörður Ljósaland
+31365 63.8595 -22.3436 Festarfjall
+9003 63.662 -19.4515 Fimmvörðuháls
+1868 64.6943 -22.1473 Fíflholt á Mýrum
+34175 65.2661 -14.259 Fjarðarheiði
+3779 66.1631 -17.8408 Flatey á Skjálfanda
+2631 66.0499 -23.5101 Flateyri
+33487 65.697 -17.5032 Fljótsheiði
+4867 66.3783 -14.5326 Fontur
+31931 64.8479 -23.4807 Fróðárheiði
+4275 65.2235 -14.2589 Gagnheiði
+4276 65.2234 -14.2589 Gagnheiði II
+31475 64.0797 -21.9029 Garðabær - Kauptún
+1474 64.0712 -21.9107 Garðabær - Urriðaholt
+1453 64.0817 -22.6893 Garðskagaviti
+33204 65.3444 -20.804 Gauksmýri
+1480 64.1678 -21.8038 Geldinganes
+32533 65.94 -23.4364 Gemlufallsheiði
+32372 65.5277 -22.0234 Gillastaðamelar
+36391 63.9362 -17.3503 Gígjukvísl
+31599 64.2481 -21.023 Gjábakki
+2693 65.9968 -21.3278 Gjögur
+2692 65.9951 -21.3304 Gjögurflugvöllur
+1361 63.8438 -22.417 Grindavík
+31364 63.8683 -22.4235 Grindavíkurvegur
+3976 66.5438 -18.0167 Grímsey
+495 65.6423 -16.1208 Grímsstaðir
+4323 65.6423 -16.1284 Grímsstaðir á Fjöllum
+1938 64.9213 -23.2513 Grundarfjörður
+34081 65.1682 -14.339 Græfur í Fagradal
+1919 64.9041 -23.9316 Gufuskálar
+36519 64.3077 -20.2119 Gullfoss
+31674 64.4755 -21.9603 Hafnarfjall
+31958 64.831 -22.5328 Hafursfell
+5960 65.0795 -14.6748 Hallormsstaðaháls
+4060 65.0942 -14.7447 Hallormsstaður
+5970 65.0182 -14.4535 Hallsteinsdalsvarp
+35769 64.6558 -14.4527 Hamarsfjörður
+3103 65.1839 -20.785 Haugur
+34450 65.6571 -15.1652 Hauksstaðir
+32322 65.6444 -23.7106 Hálfdán
+34733 66.2532 -15.8161 Hálsar
+33563 65.9518 -18.4593 Hámundarstaðaháls
+6315 63.8257 -20.3654 Hella
+31392 64.0188 -21.3424 Hellisheiði
+1490 64.0333 -21.3665 Hellisskarð
+33654 66.1022 -18.813 Héðinsfjörður
+32365 65.564 -22.2461 Hjallaháls
+931 64.2504 -20.3309 Hjarðarland
+6515 64.2506 -20.3307 Hjarðarland
+32097 64.9899 -21.0576 Holtavörðuheiði
+2862 66.4107 -22.3789 Hornbjargsviti
+34732 66.2984 -15.8933 Hófaskarð
+234 65.8679 -23.5641 Hólar í Dýrafirði
+2530 65.8686 -23.5578 Hólar í Dýrafirði
+33495 65.7374 -17.1057 Hólasandur
+2481 65.6873 -21.6813 Hólmavík
+1481 64.1085 -21.6864 Hólmsheiði
+33652 66.1317 -18.9023 Hólshyrna
+9004 63.9333 -19.1681 Hrafntinnusker
+31840 64.8221 -23.1894 Hraunsmúli
+6802 64.699 -20.869 Húsafell
+3696 66.0418 -17.3281 Húsavík
+35666 64.4074 -14.5393 Hvalnes
+36127 63.5784 -19.9016 Hvammur
+9005 64.015 -16.676 Hvannadalshjúkur
+1779 64.5622 -21.7649 Hvanneyri
+6935 64.8668 -19.5622 Hveravellir
+5544 64.2691 -15.2135 Höfn í Hornafirði
+31399 63.9574 -21.0633 Ingólfsfjall
+5210 63.8028 -16.6509 Ingólfshöfði
+5847 64.8161 -15.3228 Innri Sauðá
+2642 66.0596 -23.1699 Ísafjörður
+34148 65.3019 -15.2237 Jökuldalur
+6670 64.3163 -18.221 Jökulheimar
+33480 65.7426 -17.592 Kaldakinn
+5885 64.8012 -13.8423 Kambanes
+35884 64.7981 -13.8901 Kambaskriður
+6310 63.9628 -20.5669 Kálfhóll
+5933 64.9284 -15.7771 Kárahnjúkar
+990 63.9747 -22.5876 Keflavíkurflugvöllur
+1350 63.9829 -22.6005 Keflavíkurflugvöllur
+6745 64.681 -19.2827 Kerlingarfjöll - Ásgarðsfjall
+6272 63.793 -18.0119 Kirkjubæjarklaustur - Stjórnarsandur
+31579 64.2106 -21.7667 Kjalarnes
+32224 65.5172 -23.7211 Kleifaheiði
+32355 65.655 -22.6088 Klettsháls
+31882 64.6956 -21.6359 Kolás
+31942 64.9665 -23.126 Kolgrafafjarðarbrú
+3225 65.2307 -19.7177 Kolka
+5975 65.0367 -14.2395 Kollaleira í Reyðarfirði
+1479 64.1505 -21.7511 Korpa
+1472 64.1163 -21.8617 Kópavogur - Fossvogsdalur
+4406 65.6945 -16.7748 Krafla
+5316 63.9777 -16.4366 Kvísker
+35315 63.9596 -16.4244 Kvísker Vegagerðarstöð
+2315 65.4924 -24.0925 Lambavatn
+9001 63.99 -19.06 Landmannalaugar
+7366 63.8757 -22.2555 Langihryggur
+6472 64.0255 -18.1196 Laufbali
+32190 65.2066 -21.3277 Laxárdalsheiði
+9008 64.34 -21.216 Leggjarbrjótur
+293 66.0213 -21.425 Litla-Ávík
+36386 63.9575 -17.555 Lómagnúpur
+6459 64.0981 -18.6141 Lónakvísl
+36504 64.2018 -20.8062 Lyngdalsheiði
+36122 63.6216 -20.0285 Markarfljót
+3797 66.1994 -17.1028 Mánárbakki
+4652 66.0668 -15.0799 Miðfjarðarnes
+515 66.0659 -15.0792 Miðfjarðarnes
+31122 65.5807 -23.8552 Miklidalur
+31591 64.214 -21.3448 Mosfellsheiði
+36156 63.4661 -18.6044 Mýrdalssandur
+4300 65.6193 -16.9768 Mývatn
+33394 65.6143 -17.2169 Mývatnsheiði
+34413 65.6576 -16.5006 Mývatnsöræfi
+34238 65.457 -15.5855 Möðrudalsöræfi II
+4830 65.3754 -15.8833 Möðrudalur
+3463 65.7707 -18.2513 Möðruvellir
+6424 64.0293 -20.0189 Mörk á Landi
+3242 65.4583 -19.3691 Nautabú
+5990 65.1503 -13.6694 Neskaupstaður
+5992 65.1618 -13.688 Neskaupstaður - Drangagil
+9007 64.735 -18.073 Nýjidalur
+34087 65.0637 -13.9187 Oddsskarð
+33661 66.0424 -18.5208 Ólafsfjarðarvegur við Sauðanes
+3658 66.0739 -18.6656 Ólafsfjörður
+7659 66.063 -18.6309 Ólafsfjörður - Tindaöxl
+1924 64.8957 -23.7162 Ólafsvík
+5777 64.5911 -14.1747 Papey
+2319 65.5951 -23.9748 Patreksfjörður
+4912 66.5082 -16.5444 Rauðinúpur
+4828 66.456 -15.9527 Raufarhöfn
+2266 65.4377 -22.2056 Reykhólar
+3380 65.5851 -17.7667 Reykir í Fnjóskadal
+2197 65.2543 -21.0978 Reykir í Hrútafirði
+31363 64.0027 -22.2296 Reykjanesbraut
+31640 63.8156 -22.7043 Reykjanesviti
+1 64.1275 -21.9028 Reykjavík
+1470 64.1288 -21.9082 Reykjavík Háahlíð
+1469 64.1411 -21.9436 Reykjavík Hljómskálagarður
+1482 64.1035 -21.7971 Reykjavík Víðidalur
+1477 64.1284 -21.9407 Reykjavíkurflugvöllur
+36049 63.4521 -19.0378 Reynisfjall
+4921 66.5115 -16.1441 Rif á Melrakkasléttu
+6975 64.933 -17.983 Sandbúðir
+31488 64.0624 -21.5577 Sandskeið
+34559 65.8914 -14.8253 Sandvíkurheiði
+400 66.1852 -18.9534 Sauðanesviti
+3751 66.1845 -18.9534 Sauðanesviti
+3433 65.7259 -19.5737 Sauðárkrókur flugvöllur
+6222 63.7354 -20.1091 Sámsstaðir
+3054 65.0628 -18.8383 Sáta
+5993 64.9778 -13.5192 Seley
+6300 63.9355 -20.9707 Selfoss
+2640 66.076 -23.1987 Seljalandsdalur
+2641 66.0687 -23.2103 Seljalandsdalur - skíðaskáli
+1471 64.1545 -22.0325 Seltjarnarnes - Suðurnes
+31380 63.8456 -21.6959 Selvogur
+6748 64.6043 -19.0186 Setur
+4182 65.2549 -14.0064 Seyðisfjörður
+33750 66.129 -19.0721 Siglufjarðarvegur
+33751 66.1784 -18.9752 Siglufjarðarvegur Herkonugil
+3752 66.1349 -18.919 Siglufjörður
+7753 66.1535 -18.9352 Siglufjörður - Hafnarfjall
+6499 64.0157 -16.9667 Skaftafell
+3720 66.1192 -20.0989 Skagatá
+6176 63.5179 -17.9785 Skarðsfjöruviti
+1679 64.4902 -21.7621 Skarðsheiði Miðfitjahóll
+1496 64.0567 -21.3469 Skarðsmýrarfjall
+1590 64.2405 -21.4633 Skálafell
+36411 64.1323 -20.5308 Skálholt
+6393 63.9034 -17.274 Skeiðarársandur
+527 65.7027 -14.8211 Skjaldþingsstaðir
+4455 65.7036 -14.8208 Skjaldþingsstaðir
+1578 64.2318 -21.8046 Skrauthólar
+9009 64.805 -23.775 Snæfellsjökull
+3591 65.821 -17.3446 Staðarhóll
+33643 66.0711 -19.2785 Stafá
+1781 64.643 -21.5893 Stafholtsey
+36132 63.5429 -19.6906 Steinar
+32474 65.7503 -22.1291 Steingrímsfjarðarheiði
+31950 64.986 -22.8084 Stórholt
+6017 63.3996 -20.2882 Stórhöfði
+2941 66.433 -23.133 Straumnesviti
+1473 64.0438 -22.0404 Straumsvík
+35880 64.7199 -14.0363 Streiti
+2050 65.0717 -22.7324 Stykkishólmur
+178 65.074 -22.7339 Stykkishólmur
+2630 66.1251 -23.5077 Suðureyri
+6012 63.2993 -20.5995 Surtsey
+2646 66.0426 -22.986 Súðavík
+3292 65.3419 -17.2465 Svartárkot
+32179 65.3058 -21.7396 Svínadalur í Dölum
+2323 65.6276 -23.8302 Tálknafjörður
+5872 64.6757 -14.3444 Teigarhorn
+6235 63.7757 -19.6773 Tindfjöll
+31578 64.287 -21.812 Tíðaskarð
+34700 66.1487 -16.9752 Tjörnes - Gerðibrekka
+3371 65.501 -18.1616 Torfur
+4019 65.0607 -16.2104 Upptyppingar
+3474 65.7483 -18.0021 Vaðlaheiði
+31948 64.9095 -22.8649 Vatnaleið
+6546 64.1956 -19.0467 Vatnsfell
+33431 65.5085 -19.6945 Vatnsskarð
+34382 65.5623 -13.9897 Vatnsskarð eystra
+802 63.4236 -19.183 Vatnsskarðshólar
+6045 63.4236 -19.183 Vatnsskarðshólar
+5988 64.937 -13.6846 Vattarnes
+6657 64.3951 -18.5048 Veiðivatnahraun
+6015 63.4359 -20.2758 Vestmannaeyjabær
+3477 65.817 -17.8857 Végeirsstaðir í Fnjóskadal
+35985 64.8956 -13.8547 Víkurgerði
+33576 65.813 -17.991 Víkurskarð
+34348 65.5947 -15.3158 Vopnafjarðarheiði
+4500 65.911 -16.9762 Þeistareykir
+1596 64.2807 -21.0875 Þingvellir
+36308 63.9306 -20.6653 Þjórsárbrú
+5965 65.0364 -14.5711 Þórudalur
+31387 63.9876 -21.4633 Þrengsli
+32377 65.5524 -21.833 Þröskuldar
+6760 64.5819 -18.5987 Þúfuver
+33424 65.7801 -20.0186 Þverárfjall
+9002 64.2328 -21.7117 Þverfellshorn á Esju
+2636 66.0444 -23.3074 Þverfjall
+7636 66.0448 -23.3076 Þverfjall vindur
+6208 63.7477 -20.6182 Þykkvibær
+1685 64.3877 -21.4169 Þyrill
+2655 66.1006 -22.6594 Æðey
+32654 66.0449 -22.6817 Ögur
+1493 64.0553 -21.2532 Ölkelduháls
+6134 63.5242 -19.6357 Önundarhorn
+35305 63.9387 -16.7959 Öræfi
+35963 64.8257 -14.6573 Öxi
+33357 65.4676 -18.6987 Öxnadalsheiði
+"""
+
+
+class StationTable:
+    """Column-oriented table of weather stations."""
+
+    __slots__ = ("ids", "lats", "lons", "names", "_by_id", "_by_name")
+
+    def __init__(self, data: str = _STATION_DATA) -> None:
+        rows = [line.split(" ", 3) for line in data.splitlines() if line]
+        self.ids = array("l", (int(r[0]) for r in rows))
+        self.lats = array("d", (float(r[1]) for r in rows))
+        self.lons = array("d", (float(r[2]) for r in rows))
+        self.names: Tuple[str, ...] = tuple(r[3] for r in rows)
+        self._by_id: Optional[Dict[int, int]] = None
+        self._by_name: Optional[Dict[str, List[int]]] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def station(self, i: int) -> Dict:
+        """Return the station at index i as a dict."""
+        return {
+            "id": self.ids[i],
+            "lat": self.lats[i],
+            "lon": self.lons[i],
+            "name": self.names[i],
+        }
+
+    def index_for_id(self, station_id: int) -> Optional[int]:
+        """Return the index of the station with the given ID, or None."""
+        if self._by_id is None:
+            self._by_id = {sid: i for i, sid in enumerate(self.ids)}
+        return self._by_id.get(station_id)
+
+    def indices_for_name(self, name: str) -> List[int]:
+        """Return the indices of all stations with the given name, in order."""
+        if self._by_name is None:
+            by_name: Dict[str, List[int]] = {}
+            for i, n in enumerate(self.names):
+                by_name.setdefault(n, []).append(i)
+            self._by_name = by_name
+        return self._by_name.get(name, [])
+
+
+_lock = threading.Lock()
+_table: Optional[StationTable] = None
+_stations: Optional[List[Dict]] = None
+
+
+def station_table() -> StationTable:
+    """Return the station table, parsing it on first use."""
+    global _table
+    if _table is None:
+        with _lock:
+            if _table is None:
+                _table = StationTable()
+    return _table
+
+
+def station_dicts() -> List[Dict]:
+    """Return the list of stations as dicts with id, lat, lon and name keys,
+    creating it on first use. The same list is returned on every call."""
+    global _stations
+    if _stations is None:
+        table = station_table()
+        with _lock:
+            if _stations is None:
+                _stations = [table.station(i) for i in range(len(table))]
+    return _stations
+
 
-STATIONS: List[Dict] = [
-    {"id": 9010, "lat": 66.369, "lon": -23.019, "name": "Aðalvík"},
-    {"id": 31572, "lat": 64.3105, "lon": -21.966, "name": "Akrafjall"},
-    {"id": 422, "lat": 65.6856, "lon": -18.1002, "name": "Akureyri"},
-    {"id": 3471, "lat": 65.6961, "lon": -18.1113, "name": "Akureyri - Krossanesbraut"},
-    {"id": 31109, "lat": 64.0888, "lon": -21.8366, "name": "Arnarnesvegur"},
-    {"id": 3007, "lat": 65.123, "lon": -20.6961, "name": "Austurárdalsháls"},
-    {"id": 6420, "lat": 64.0405, "lon": -20.2521, "name": "Árnes"},
-    {"id": 4614, "lat": 66.03, "lon": -16.4833, "name": "Ásbyrgi"},
-    {"id": 2175, "lat": 65.2297, "lon": -21.7543, "name": "Ásgarður"},
-    {"id": 195, "lat": 65.2297, "lon": -21.7543, "name": "Ásgarður"},
-    {"id": 4380, "lat": 65.5235, "lon": -13.8167, "name": "Bakkagerði"},
-    {"id": 6237, "lat": 63.6791, "lon": -19.4814, "name": "Básar á Goðalandi"},
-    {"id": 34326, "lat": 65.5583, "lon": -16.0113, "name": "Biskupsháls"},
-    {"id": 2428, "lat": 65.6794, "lon": -23.6122, "name": "Bíldudalur"},
-    {"id": 2304, "lat": 65.5029, "lon": -24.5312, "name": "Bjargtangar"},
-    {"id": 4472, "lat": 65.7857, "lon": -14.3082, "name": "Bjarnarey"},
-    {"id": 2480, "lat": 65.7284, "lon": -21.5718, "name": "Bjarnarfjarðarháls"},
-    {"id": 3585, "lat": 65.9454, "lon": -17.5919, "name": "Björg í Kinn"},
-    {"id": 1936, "lat": 64.8393, "lon": -23.3012, "name": "Bláfeldur"},
-    {"id": 1487, "lat": 63.9831, "lon": -21.6497, "name": "Bláfjallaskáli"},
-    {"id": 1486, "lat": 63.969, "lon": -21.6661, "name": "Bláfjöll"},
-    {"id": 31577, "lat": 64.2664, "lon": -21.8329, "name": "Blikdalsá"},
-    {"id": 3317, "lat": 65.658, "lon": -20.2925, "name": "Blönduós"},
-    {"id": 33419, "lat": 65.6668, "lon": -20.2383, "name": "Blönduós Vegagerðarstöð"},
-    {"id": 2738, "lat": 66.161, "lon": -23.2538, "name": "Bolungarvík"},
-    {"id": 7736, "lat": 66.1684, "lon": -23.2681, "name": "Bolungarvík - Traðargil"},
-    {"id": 35116, "lat": 64.1848, "lon": -15.8145, "name": "Borgarhöfn"},
-    {"id": 32635, "lat": 66.0808, "lon": -23.3733, "name": "Botn í Súgandafirði"},
-    {"id": 1689, "lat": 64.4529, "lon": -21.4034, "name": "Botnsheiði"},
-    {"id": 35965, "lat": 64.9068, "lon": -14.6034, "name": "Breiðdalsheiði"},
-    {"id": 5940, "lat": 65.1086, "lon": -15.5297, "name": "Brú á Jökuldal"},
-    {"id": 5932, "lat": 64.728, "lon": -16.1117, "name": "Brúarjökull B10"},
-    {"id": 5825, "lat": 64.8281, "lon": -16.0897, "name": "Brúaröræfi"},
-    {"id": 3223, "lat": 65.3784, "lon": -20.2473, "name": "Brúsastaðir"},
-    {"id": 36415, "lat": 64.1575, "lon": -20.3675, "name": "Bræðratunguvegur"},
-    {"id": 31932, "lat": 64.9366, "lon": -23.5033, "name": "Búlandshöfði"},
-    {"id": 6430, "lat": 64.1168, "lon": -19.7449, "name": "Búrfell"},
-    {"id": 620, "lat": 65.2682, "lon": -13.5759, "name": "Dalatangi"},
-    {"id": 4193, "lat": 65.2681, "lon": -13.5751, "name": "Dalatangi"},
-    {"id": 9006, "lat": 65.042, "lon": -16.595, "name": "Dreki"},
-    {"id": 7790, "lat": 64.5039, "lon": -17.2348, "name": "Dyngjujökull"},
-    {"id": 571, "lat": 65.283, "lon": -14.4025, "name": "Egilsstaðaflugvöllur"},
-    {"id": 36270, "lat": 63.7338, "lon": -18.1977, "name": "Eldhraun"},
-    {"id": 32390, "lat": 65.5724, "lon": -21.329, "name": "Ennisháls"},
-    {"id": 5981, "lat": 65.0763, "lon": -14.037, "name": "Eskifjörður"},
-    {"id": 5943, "lat": 64.8151, "lon": -15.4235, "name": "Eyjabakkar"},
-    {"id": 1395, "lat": 63.8692, "lon": -21.1602, "name": "Eyrarbakki"},
-    {"id": 34073, "lat": 65.1264, "lon": -14.3327, "name": "Fagridalur"},
-    {"id": 5309, "lat": 63.8743, "lon": -16.6364, "name": "Fagurhólsmýri"},
-    {"id": 5982, "lat": 64.9372, "lon": -14.0407, "name": "Fáskrúðsfjörður Ljósaland"},
-    {"id": 31365, "lat": 63.8595, "lon": -22.3436, "name": "Festarfjall"},
-    {"id": 9003, "lat": 63.662, "lon": -19.4515, "name": "Fimmvörðuháls"},
-    {"id": 1868, "lat": 64.6943, "lon": -22.1473, "name": "Fíflholt á Mýrum"},
-    {"id": 34175, "lat": 65.2661, "lon": -14.259, "name": "Fjarðarheiði"},
-    {"id": 3779, "lat": 66.1631, "lon": -17.8408, "name": "Flatey á Skjálfanda"},
-    {"id": 2631, "lat": 66.0499, "lon": -23.5101, "name": "Flateyri"},
-    {"id": 33487, "lat": 65.697, "lon": -17.5032, "name": "Fljótsheiði"},
-    {"id": 4867, "lat": 66.3783, "lon": -14.5326, "name": "Fontur"},
-    {"id": 31931, "lat": 64.8479, "lon": -23.4807, "name": "Fróðárheiði"},
-    {"id": 4275, "lat": 65.2235, "lon": -14.2589, "name": "Gagnheiði"},
-    {"id": 4276, "lat": 65.2234, "lon": -14.2589, "name": "Gagnheiði II"},
-    {"id": 31475, "lat": 64.0797, "lon": -21.9029, "name": "Garðabær - Kauptún"},
-    {"id": 1474, "lat": 64.0712, "lon": -21.9107, "name": "Garðabær - Urriðaholt"},
-    {"id": 1453, "lat": 64.0817, "lon": -22.6893, "name": "Garðskagaviti"},
-    {"id": 33204, "lat": 65.3444, "lon": -20.804, "name": "Gauksmýri"},
-    {"id": 1480, "lat": 64.1678, "lon": -21.8038, "name": "Geldinganes"},
-    {"id": 32533, "lat": 65.94, "lon": -23.4364, "name": "Gemlufallsheiði"},
-    {"id": 32372, "lat": 65.5277, "lon": -22.0234, "name": "Gillastaðamelar"},
-    {"id": 36391, "lat": 63.9362, "lon": -17.3503, "name": "Gígjukvísl"},
-    {"id": 31599, "lat": 64.2481, "lon": -21.023, "name": "Gjábakki"},
-    {"id": 2693, "lat": 65.9968, "lon": -21.3278, "name": "Gjögur"},
-    {"id": 2692, "lat": 65.9951, "lon": -21.3304, "name": "Gjögurflugvöllur"},
-    {"id": 1361, "lat": 63.8438, "lon": -22.417, "name": "Grindavík"},
-    {"id": 31364, "lat": 63.8683, "lon": -22.4235, "name": "Grindavíkurvegur"},
-    {"id": 3976, "lat": 66.5438, "lon": -18.0167, "name": "Grímsey"},
-    {"id": 495, "lat": 65.6423, "lon": -16.1208, "name": "Grímsstaðir"},
-    {"id": 4323, "lat": 65.6423, "lon": -16.1284, "name": "Grímsstaðir á Fjöllum"},
-    {"id": 1938, "lat": 64.9213, "lon": -23.2513, "name": "Grundarfjörður"},
-    {"id": 34081, "lat": 65.1682, "lon": -14.339, "name": "Græfur í Fagradal"},
-    {"id": 1919, "lat": 64.9041, "lon": -23.9316, "name": "Gufuskálar"},
-    {"id": 36519, "lat": 64.3077, "lon": -20.2119, "name": "Gullfoss"},
-    {"id": 31674, "lat": 64.4755, "lon": -21.9603, "name": "Hafnarfjall"},
-    {"id": 31958, "lat": 64.831, "lon": -22.5328, "name": "Hafursfell"},
-    {"id": 5960, "lat": 65.0795, "lon": -14.6748, "name": "Hallormsstaðaháls"},
-    {"id": 4060, "lat": 65.0942, "lon": -14.7447, "name": "Hallormsstaður"},
-    {"id": 5970, "lat": 65.0182, "lon": -14.4535, "name": "Hallsteinsdalsvarp"},
-    {"id": 35769, "lat": 64.6558, "lon": -14.4527, "name": "Hamarsfjörður"},
-    {"id": 3103, "lat": 65.1839, "lon": -20.785, "name": "Haugur"},
-    {"id": 34450, "lat": 65.6571, "lon": -15.1652, "name": "Hauksstaðir"},
-    {"id": 32322, "lat": 65.6444, "lon": -23.7106, "name": "Hálfdán"},
-    {"id": 34733, "lat": 66.2532, "lon": -15.8161, "name": "Hálsar"},
-    {"id": 33563, "lat": 65.9518, "lon": -18.4593, "name": "Hámundarstaðaháls"},
-    {"id": 6315, "lat": 63.8257, "lon": -20.3654, "name": "Hella"},
-    {"id": 31392, "lat": 64.0188, "lon": -21.3424, "name": "Hellisheiði"},
-    {"id": 1490, "lat": 64.0333, "lon": -21.3665, "name": "Hellisskarð"},
-    {"id": 33654, "lat": 66.1022, "lon": -18.813, "name": "Héðinsfjörður"},
-    {"id": 32365, "lat": 65.564, "lon": -22.2461, "name": "Hjallaháls"},
-    {"id": 931, "lat": 64.2504, "lon": -20.3309, "name": "Hjarðarland"},
-    {"id": 6515, "lat": 64.2506, "lon": -20.3307, "name": "Hjarðarland"},
-    {"id": 32097, "lat": 64.9899, "lon": -21.0576, "name": "Holtavörðuheiði"},
-    {"id": 2862, "lat": 66.4107, "lon": -22.3789, "name": "Hornbjargsviti"},
-    {"id": 34732, "lat": 66.2984, "lon": -15.8933, "name": "Hófaskarð"},
-    {"id": 234, "lat": 65.8679, "lon": -23.5641, "name": "Hólar í Dýrafirði"},
-    {"id": 2530, "lat": 65.8686, "lon": -23.5578, "name": "Hólar í Dýrafirði"},
-    {"id": 33495, "lat": 65.7374, "lon": -17.1057, "name": "Hólasandur"},
-    {"id": 2481, "lat": 65.6873, "lon": -21.6813, "name": "Hólmavík"},
-    {"id": 1481, "lat": 64.1085, "lon": -21.6864, "name": "Hólmsheiði"},
-    {"id": 33652, "lat": 66.1317, "lon": -18.9023, "name": "Hólshyrna"},
-    {"id": 9004, "lat": 63.9333, "lon": -19.1681, "name": "Hrafntinnusker"},
-    {"id": 31840, "lat": 64.8221, "lon": -23.1894, "name": "Hraunsmúli"},
-    {"id": 6802, "lat": 64.699, "lon": -20.869, "name": "Húsafell"},
-    {"id": 3696, "lat": 66.0418, "lon": -17.3281, "name": "Húsavík"},
-    {"id": 35666, "lat": 64.4074, "lon": -14.5393, "name": "Hvalnes"},
-    {"id": 36127, "lat": 63.5784, "lon": -19.9016, "name": "Hvammur"},
-    {"id": 9005, "lat": 64.015, "lon": -16.676, "name": "Hvannadalshjúkur"},
-    {"id": 1779, "lat": 64.5622, "lon": -21.7649, "name": "Hvanneyri"},
-    {"id": 6935, "lat": 64.8668, "lon": -19.5622, "name": "Hveravellir"},
-    {"id": 5544, "lat": 64.2691, "lon": -15.2135, "name": "Höfn í Hornafirði"},
-    {"id": 31399, "lat": 63.9574, "lon": -21.0633, "name": "Ingólfsfjall"},
-    {"id": 5210, "lat": 63.8028, "lon": -16.6509, "name": "Ingólfshöfði"},
-    {"id": 5847, "lat": 64.8161, "lon": -15.3228, "name": "Innri Sauðá"},
-    {"id": 2642, "lat": 66.0596, "lon": -23.1699, "name": "Ísafjörður"},
-    {"id": 34148, "lat": 65.3019, "lon": -15.2237, "name": "Jökuldalur"},
-    {"id": 6670, "lat": 64.3163, "lon": -18.221, "name": "Jökulheimar"},
-    {"id": 33480, "lat": 65.7426, "lon": -17.592, "name": "Kaldakinn"},
-    {"id": 5885, "lat": 64.8012, "lon": -13.8423, "name": "Kambanes"},
-    {"id": 35884, "lat": 64.7981, "lon": -13.8901, "name": "Kambaskriður"},
-    {"id": 6310, "lat": 63.9628, "lon": -20.5669, "name": "Kálfhóll"},
-    {"id": 5933, "lat": 64.9284, "lon": -15.7771, "name": "Kárahnjúkar"},
-    {"id": 990, "lat": 63.9747, "lon": -22.5876, "name": "Keflavíkurflugvöllur"},
-    {"id": 1350, "lat": 63.9829, "lon": -22.6005, "name": "Keflavíkurflugvöllur"},
-    {
-        "id": 6745,
-        "lat": 64.681,
-        "lon": -19.2827,
-        "name": "Kerlingarfjöll - Ásgarðsfjall",
-    },
-    {
-        "id": 6272,
-        "lat": 63.793,
-        "lon": -18.0119,
-        "name": "Kirkjubæjarklaustur - Stjórnarsandur",
-    },
-    {"id": 31579, "lat": 64.2106, "lon": -21.7667, "name": "Kjalarnes"},
-    {"id": 32224, "lat": 65.5172, "lon": -23.7211, "name": "Kleifaheiði"},
-    {"id": 32355, "lat": 65.655, "lon": -22.6088, "name": "Klettsháls"},
-    {"id": 31882, "lat": 64.6956, "lon": -21.6359, "name": "Kolás"},
-    {"id": 31942, "lat": 64.9665, "lon": -23.126, "name": "Kolgrafafjarðarbrú"},
-    {"id": 3225, "lat": 65.2307, "lon": -19.7177, "name": "Kolka"},
-    {"id": 5975, "lat": 65.0367, "lon": -14.2395, "name": "Kollaleira í Reyðarfirði"},
-    {"id": 1479, "lat": 64.1505, "lon": -21.7511, "name": "Korpa"},
-    {"id": 1472, "lat": 64.1163, "lon": -21.8617, "name": "Kópavogur - Fossvogsdalur"},
-    {"id": 4406, "lat": 65.6945, "lon": -16.7748, "name": "Krafla"},
-    {"id": 5316, "lat": 63.9777, "lon": -16.4366, "name": "Kvísker"},
-    {"id": 35315, "lat": 63.9596, "lon": -16.4244, "name": "Kvísker Vegagerðarstöð"},
-    {"id": 2315, "lat": 65.4924, "lon": -24.0925, "name": "Lambavatn"},
-    {"id": 9001, "lat": 63.99, "lon": -19.06, "name": "Landmannalaugar"},
-    {"id": 7366, "lat": 63.8757, "lon": -22.2555, "name": "Langihryggur"},
-    {"id": 6472, "lat": 64.0255, "lon": -18.1196, "name": "Laufbali"},
-    {"id": 32190, "lat": 65.2066, "lon": -21.3277, "name": "Laxárdalsheiði"},
-    {"id": 9008, "lat": 64.34, "lon": -21.216, "name": "Leggjarbrjótur"},
-    {"id": 293, "lat": 66.0213, "lon": -21.425, "name": "Litla-Ávík"},
-    {"id": 36386, "lat": 63.9575, "lon": -17.555, "name": "Lómagnúpur"},
-    {"id": 6459, "lat": 64.0981, "lon": -18.6141, "name": "Lónakvísl"},
-    {"id": 36504, "lat": 64.2018, "lon": -20.8062, "name": "Lyngdalsheiði"},
-    {"id": 36122, "lat": 63.6216, "lon": -20.0285, "name": "Markarfljót"},
-    {"id": 3797, "lat": 66.1994, "lon": -17.1028, "name": "Mánárbakki"},
-    {"id": 4652, "lat": 66.0668, "lon": -15.0799, "name": "Miðfjarðarnes"},
-    {"id": 515, "lat": 66.0659, "lon": -15.0792, "name": "Miðfjarðarnes"},
-    {"id": 31122, "lat": 65.5807, "lon": -23.8552, "name": "Miklidalur"},
-    {"id": 31591, "lat": 64.214, "lon": -21.3448, "name": "Mosfellsheiði"},
-    {"id": 36156, "lat": 63.4661, "lon": -18.6044, "name": "Mýrdalssandur"},
-    {"id": 4300, "lat": 65.6193, "lon": -16.9768, "name": "Mývatn"},
-    {"id": 33394, "lat": 65.6143, "lon": -17.2169, "name": "Mývatnsheiði"},
-    {"id": 34413, "lat": 65.6576, "lon": -16.5006, "name": "Mývatnsöræfi"},
-    {"id": 34238, "lat": 65.457, "lon": -15.5855, "name": "Möðrudalsöræfi II"},
-    {"id": 4830, "lat": 65.3754, "lon": -15.8833, "name": "Möðrudalur"},
-    {"id": 3463, "lat": 65.7707, "lon": -18.2513, "name": "Möðruvellir"},
-    {"id": 6424, "lat": 64.0293, "lon": -20.0189, "name": "Mörk á Landi"},
-    {"id": 3242, "lat": 65.4583, "lon": -19.3691, "name": "Nautabú"},
-    {"id": 5990, "lat": 65.1503, "lon": -13.6694, "name": "Neskaupstaður"},
-    {"id": 5992, "lat": 65.1618, "lon": -13.688, "name": "Neskaupstaður - Drangagil"},
-    {"id": 9007, "lat": 64.735, "lon": -18.073, "name": "Nýjidalur"},
-    {"id": 34087, "lat": 65.0637, "lon": -13.9187, "name": "Oddsskarð"},
-    {
-        "id": 33661,
-        "lat": 66.0424,
-        "lon": -18.5208,
-        "name": "Ólafsfjarðarvegur við Sauðanes",
-    },
-    {"id": 3658, "lat": 66.0739, "lon": -18.6656, "name": "Ólafsfjörður"},
-    {"id": 7659, "lat": 66.063, "lon": -18.6309, "name": "Ólafsfjörður - Tindaöxl"},
-    {"id": 1924, "lat": 64.8957, "lon": -23.7162, "name": "Ólafsvík"},
-    {"id": 5777, "lat": 64.5911, "lon": -14.1747, "name": "Papey"},
-    {"id": 2319, "lat": 65.5951, "lon": -23.9748, "name": "Patreksfjörður"},
-    {"id": 4912, "lat": 66.5082, "lon": -16.5444, "name": "Rauðinúpur"},
-    {"id": 4828, "lat": 66.456, "lon": -15.9527, "name": "Raufarhöfn"},
-    {"id": 2266, "lat": 65.4377, "lon": -22.2056, "name": "Reykhólar"},
-    {"id": 3380, "lat": 65.5851, "lon": -17.7667, "name": "Reykir í Fnjóskadal"},
-    {"id": 2197, "lat": 65.2543, "lon": -21.0978, "name": "Reykir í Hrútafirði"},
-    {"id": 31363, "lat": 64.0027, "lon": -22.2296, "name": "Reykjanesbraut"},
-    {"id": 31640, "lat": 63.8156, "lon": -22.7043, "name": "Reykjanesviti"},
-    # {"id": 1475, "lat": 64.1275, "lon": -21.902, "name": "Reykjavík"},
-    {"id": 1, "lat": 64.1275, "lon": -21.9028, "name": "Reykjavík"},
-    # {"id": 1478, "lat": 64.1292, "lon": -21.8392, "name": "Reykjavík Geirsnef"},
-    {"id": 1470, "lat": 64.1288, "lon": -21.9082, "name": "Reykjavík Háahlíð"},
-    {"id": 1469, "lat": 64.1411, "lon": -21.9436, "name": "Reykjavík Hljómskálagarður"},
-    {"id": 1482, "lat": 64.1035, "lon": -21.7971, "name": "Reykjavík Víðidalur"},
-    {"id": 1477, "lat": 64.1284, "lon": -21.9407, "name": "Reykjavíkurflugvöllur"},
-    {"id": 36049, "lat": 63.4521, "lon": -19.0378, "name": "Reynisfjall"},
-    {"id": 4921, "lat": 66.5115, "lon": -16.1441, "name": "Rif á Melrakkasléttu"},
-    {"id": 6975, "lat": 64.933, "lon": -17.983, "name": "Sandbúðir"},
-    {"id": 31488, "lat": 64.0624, "lon": -21.5577, "name": "Sandskeið"},
-    {"id": 34559, "lat": 65.8914, "lon": -14.8253, "name": "Sandvíkurheiði"},
-    {"id": 400, "lat": 66.1852, "lon": -18.9534, "name": "Sauðanesviti"},
-    {"id": 3751, "lat": 66.1845, "lon": -18.9534, "name": "Sauðanesviti"},
-    {"id": 3433, "lat": 65.7259, "lon": -19.5737, "name": "Sauðárkrókur flugvöllur"},
-    {"id": 6222, "lat": 63.7354, "lon": -20.1091, "name": "Sámsstaðir"},
-    {"id": 3054, "lat": 65.0628, "lon": -18.8383, "name": "Sáta"},
-    {"id": 5993, "lat": 64.9778, "lon": -13.5192, "name": "Seley"},
-    {"id": 6300, "lat": 63.9355, "lon": -20.9707, "name": "Selfoss"},
-    {"id": 2640, "lat": 66.076, "lon": -23.1987, "name": "Seljalandsdalur"},
-    {
-        "id": 2641,
-        "lat": 66.0687,
-        "lon": -23.2103,
-        "name": "Seljalandsdalur - skíðaskáli",
-    },
-    {"id": 1471, "lat": 64.1545, "lon": -22.0325, "name": "Seltjarnarnes - Suðurnes"},
-    {"id": 31380, "lat": 63.8456, "lon": -21.6959, "name": "Selvogur"},
-    {"id": 6748, "lat": 64.6043, "lon": -19.0186, "name": "Setur"},
-    {"id": 4182, "lat": 65.2549, "lon": -14.0064, "name": "Seyðisfjörður"},
-    {"id": 33750, "lat": 66.129, "lon": -19.0721, "name": "Siglufjarðarvegur"},
-    {
-        "id": 33751,
-        "lat": 66.1784,
-        "lon": -18.9752,
-        "name": "Siglufjarðarvegur Herkonugil",
-    },
-    {"id": 3752, "lat": 66.1349, "lon": -18.919, "name": "Siglufjörður"},
-    {"id": 7753, "lat": 66.1535, "lon": -18.9352, "name": "Siglufjörður - Hafnarfjall"},
-    {"id": 6499, "lat": 64.0157, "lon": -16.9667, "name": "Skaftafell"},
-    {"id": 3720, "lat": 66.1192, "lon": -20.0989, "name": "Skagatá"},
-    {"id": 6176, "lat": 63.5179, "lon": -17.9785, "name": "Skarðsfjöruviti"},
-    {"id": 1679, "lat": 64.4902, "lon": -21.7621, "name": "Skarðsheiði Miðfitjahóll"},
-    {"id": 1496, "lat": 64.0567, "lon": -21.3469, "name": "Skarðsmýrarfjall"},
-    {"id": 1590, "lat": 64.2405, "lon": -21.4633, "name": "Skálafell"},
-    {"id": 36411, "lat": 64.1323, "lon": -20.5308, "name": "Skálholt"},
-    {"id": 6393, "lat": 63.9034, "lon": -17.274, "name": "Skeiðarársandur"},
-    {"id": 527, "lat": 65.7027, "lon": -14.8211, "name": "Skjaldþingsstaðir"},
-    {"id": 4455, "lat": 65.7036, "lon": -14.8208, "name": "Skjaldþingsstaðir"},
-    {"id": 1578, "lat": 64.2318, "lon": -21.8046, "name": "Skrauthólar"},
-    {"id": 9009, "lat": 64.805, "lon": -23.775, "name": "Snæfellsjökull"},
-    {"id": 3591, "lat": 65.821, "lon": -17.3446, "name": "Staðarhóll"},
-    {"id": 33643, "lat": 66.0711, "lon": -19.2785, "name": "Stafá"},
-    {"id": 1781, "lat": 64.643, "lon": -21.5893, "name": "Stafholtsey"},
-    {"id": 36132, "lat": 63.5429, "lon": -19.6906, "name": "Steinar"},
-    {"id": 32474, "lat": 65.7503, "lon": -22.1291, "name": "Steingrímsfjarðarheiði"},
-    {"id": 31950, "lat": 64.986, "lon": -22.8084, "name": "Stórholt"},
-    {"id": 6017, "lat": 63.3996, "lon": -20.2882, "name": "Stórhöfði"},
-    {"id": 2941, "lat": 66.433, "lon": -23.133, "name": "Straumnesviti"},
-    {"id": 1473, "lat": 64.0438, "lon": -22.0404, "name": "Straumsvík"},
-    {"id": 35880, "lat": 64.7199, "lon": -14.0363, "name": "Streiti"},
-    {"id": 2050, "lat": 65.0717, "lon": -22.7324, "name": "Stykkishólmur"},
-    {"id": 178, "lat": 65.074, "lon": -22.7339, "name": "Stykkishólmur"},
-    {"id": 2630, "lat": 66.1251, "lon": -23.5077, "name": "Suðureyri"},
-    {"id": 6012, "lat": 63.2993, "lon": -20.5995, "name": "Surtsey"},
-    {"id": 2646, "lat": 66.0426, "lon": -22.986, "name": "Súðavík"},
-    {"id": 3292, "lat": 65.3419, "lon": -17.2465, "name": "Svartárkot"},
-    {"id": 32179, "lat": 65.3058, "lon": -21.7396, "name": "Svínadalur í Dölum"},
-    {"id": 2323, "lat": 65.6276, "lon": -23.8302, "name": "Tálknafjörður"},
-    {"id": 5872, "lat": 64.6757, "lon": -14.3444, "name": "Teigarhorn"},
-    {"id": 6235, "lat": 63.7757, "lon": -19.6773, "name": "Tindfjöll"},
-    {"id": 31578, "lat": 64.287, "lon": -21.812, "name": "Tíðaskarð"},
-    {"id": 34700, "lat": 66.1487, "lon": -16.9752, "name": "Tjörnes - Gerðibrekka"},
-    {"id": 3371, "lat": 65.501, "lon": -18.1616, "name": "Torfur"},
-    {"id": 4019, "lat": 65.0607, "lon": -16.2104, "name": "Upptyppingar"},
-    {"id": 3474, "lat": 65.7483, "lon": -18.0021, "name": "Vaðlaheiði"},
-    {"id": 31948, "lat": 64.9095, "lon": -22.8649, "name": "Vatnaleið"},
-    {"id": 6546, "lat": 64.1956, "lon": -19.0467, "name": "Vatnsfell"},
-    {"id": 33431, "lat": 65.5085, "lon": -19.6945, "name": "Vatnsskarð"},
-    {"id": 34382, "lat": 65.5623, "lon": -13.9897, "name": "Vatnsskarð eystra"},
-    {"id": 802, "lat": 63.4236, "lon": -19.183, "name": "Vatnsskarðshólar"},
-    {"id": 6045, "lat": 63.4236, "lon": -19.183, "name": "Vatnsskarðshólar"},
-    {"id": 5988, "lat": 64.937, "lon": -13.6846, "name": "Vattarnes"},
-    {"id": 6657, "lat": 64.3951, "lon": -18.5048, "name": "Veiðivatnahraun"},
-    {"id": 6015, "lat": 63.4359, "lon": -20.2758, "name": "Vestmannaeyjabær"},
-    {"id": 3477, "lat": 65.817, "lon": -17.8857, "name": "Végeirsstaðir í Fnjóskadal"},
-    {"id": 35985, "lat": 64.8956, "lon": -13.8547, "name": "Víkurgerði"},
-    {"id": 33576, "lat": 65.813, "lon": -17.991, "name": "Víkurskarð"},
-    {"id": 34348, "lat": 65.5947, "lon": -15.3158, "name": "Vopnafjarðarheiði"},
-    {"id": 4500, "lat": 65.911, "lon": -16.9762, "name": "Þeistareykir"},
-    {"id": 1596, "lat": 64.2807, "lon": -21.0875, "name": "Þingvellir"},
-    {"id": 36308, "lat": 63.9306, "lon": -20.6653, "name": "Þjórsárbrú"},
-    {"id": 5965, "lat": 65.0364, "lon": -14.5711, "name": "Þórudalur"},
-    {"id": 31387, "lat": 63.9876, "lon": -21.4633, "name": "Þrengsli"},
-    {"id": 32377, "lat": 65.5524, "lon": -21.833, "name": "Þröskuldar"},
-    {"id": 6760, "lat": 64.5819, "lon": -18.5987, "name": "Þúfuver"},
-    {"id": 33424, "lat": 65.7801, "lon": -20.0186, "name": "Þverárfjall"},
-    {"id": 9002, "lat": 64.2328, "lon": -21.7117, "name": "Þverfellshorn á Esju"},
-    {"id": 2636, "lat": 66.0444, "lon": -23.3074, "name": "Þverfjall"},
-    {"id": 7636, "lat": 66.0448, "lon": -23.3076, "name": "Þverfjall vindur"},
-    {"id": 6208, "lat": 63.7477, "lon": -20.6182, "name": "Þykkvibær"},
-    {"id": 1685, "lat": 64.3877, "lon": -21.4169, "name": "Þyrill"},
-    {"id": 2655, "lat": 66.1006, "lon": -22.6594, "name": "Æðey"},
-    {"id": 32654, "lat": 66.0449, "lon": -22.6817, "name": "Ögur"},
-    {"id": 1493, "lat": 64.0553, "lon": -21.2532, "name": "Ölkelduháls"},
-    {"id": 6134, "lat": 63.5242, "lon": -19.6357, "name": "Önundarhorn"},
-    {"id": 35305, "lat": 63.9387, "lon": -16.7959, "name": "Öræfi"},
-    {"id": 35963, "lat": 64.8257, "lon": -14.6573, "name": "Öxi"},
-    {"id": 33357, "lat": 65.4676, "lon": -18.6987, "name": "Öxnadalsheiði"},
-]
+def __getattr__(name: str) -> List[Dict]:
+    # STATIONS is created lazily on first access
+    if name == "STATIONS":
+        return station_dicts()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,176 @@
+"""
+
+    iceweather: Look up information about Icelandic weather (observations, forecasts,
+    human readable descriptive texts, etc.) using vedur.is xmlweather API.
+
+    Copyright (c) 2019-2023 Miðeind ehf.
+    Original author: Sveinbjorn Thordarson
+
+    BSD 3-clause License (see License.txt).
+
+
+    Persistent SQLite store for observation history.
+
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from datetime import datetime, timezone
+import sqlite3
+import threading
+
+from .records import Observation, _PARAM_FIELDS, parse_float, parse_int, parse_time
+from .weather import (
+    _ArgType,
+    _DEFAULT_LANG,
+    _ParamsType,
+    _params_str,
+    observation_for_stations,
+    PARAMS,
+)
+
+# Parameters stored as numbers (all others are stored as text)
+_NUMERIC_PARAMS = frozenset(key for key, parse in _PARAM_FIELDS if parse is parse_float)
+
+_TimeType = Union[datetime, str, int, float]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    station INTEGER NOT NULL,
+    time INTEGER NOT NULL,
+    {0},
+    PRIMARY KEY (station, time)
+) WITHOUT ROWID
+""".format(
+    ",\n    ".join(
+        f'"{p}" {"REAL" if p in _NUMERIC_PARAMS else "TEXT"}' for p in PARAMS
+    )
+)
+
+_INSERT = "INSERT OR IGNORE INTO observations (station, time, {0}) VALUES ({1})".format(
+    ", ".join(f'"{p}"' for p in PARAMS), ", ".join("?" * (len(PARAMS) + 2))
+)
+
+
+def _timestamp(t: _TimeType) -> int:
+    """Convert a time (datetime, API time string or POSIX timestamp)
+    to integer seconds since the epoch. Naive datetimes are taken as UTC."""
+    if isinstance(t, (int, float)):
+        return int(t)
+    if isinstance(t, str):
+        parsed = parse_time(t)
+        if parsed is None:
+            raise ValueError(f"Invalid time: {t!r}")
+        t = parsed
+    if t.tzinfo is None:
+        t = t.replace(tzinfo=timezone.utc)
+    return int(t.timestamp())
+
+
+def _row(obs: Union[Dict, Observation]) -> Optional[List[Any]]:
+    """Convert an observation result (dict or record) to a table row,
+    or None if it has no station ID or time (e.g. error results)."""
+    if isinstance(obs, Observation):
+        station, t = getattr(obs, "id"), getattr(obs, "time")
+        values = [getattr(obs, p) for p in PARAMS]
+    else:
+        if obs.get("err"):
+            return None
+        station, t = parse_int(obs.get("id")), parse_time(obs.get("time"))
+        values = [
+            parse_float(obs.get(p)) if p in _NUMERIC_PARAMS else obs.get(p) or None
+            for p in PARAMS
+        ]
+    if station is None or t is None:
+        return None
+    return [station, int(t.timestamp())] + values
+
+
+class ObservationStore:
+    """
+    Appends parsed observations to an indexed SQLite table, keyed on
+    (station ID, observation time), and answers time range queries.
+    Observations already in the store are ignored, so overlapping
+    fetches can be added freely. Safe to share between threads.
+    """
+
+    def __init__(self, path: str = ":memory:") -> None:
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "ObservationStore":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM observations").fetchone()[0]
+
+    def add(self, observations: Iterable[Union[Dict, Observation]]) -> int:
+        """Add observations (result dicts or Observation records) in a single
+        transaction. Error results and observations already in the store are
+        skipped. Returns the number of observations added."""
+        rows = [r for r in map(_row, observations) if r is not None]
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(_INSERT, rows)
+            return self._conn.total_changes - before
+
+    def record(
+        self, station_ids: _ArgType, lang: str = _DEFAULT_LANG, use_cache: bool = True
+    ) -> int:
+        """Fetch the latest observations for the given station IDs and add them.
+        Returns the number of new observations added."""
+        return self.add(
+            observation_for_stations(station_ids, lang, use_cache)["results"]
+        )
+
+    def history(
+        self,
+        station_id: Union[str, int],
+        start: Optional[_TimeType] = None,
+        end: Optional[_TimeType] = None,
+        params: _ParamsType = None,
+    ) -> Dict[str, Any]:
+        """
+        Returns stored observations for a station in the time range
+        start <= time < end (either may be None for an open range),
+        in columnar form, sorted by time:
+
+        {
+            "times": [ datetime, ... ],
+            "values": { param: [ value, ... ], ... },
+        }
+
+        Numeric parameters are floats, others strings, with None for
+        missing values. If params is given, only those are included.
+        """
+        keys = _params_str(params).split(";")
+        sql = "SELECT time, {0} FROM observations WHERE station = ?".format(
+            ", ".join(f'"{p}"' for p in keys)
+        )
+        args: List[Any] = [int(station_id)]
+        if start is not None:
+            sql += " AND time >= ?"
+            args.append(_timestamp(start))
+        if end is not None:
+            sql += " AND time < ?"
+            args.append(_timestamp(end))
+        sql += " ORDER BY time"
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        columns = list(zip(*rows)) if rows else [()] * (len(keys) + 1)
+        return {
+            "times": [datetime.fromtimestamp(t, timezone.utc) for t in columns[0]],
+            "values": {p: list(col) for p, col in zip(keys, columns[1:])},
+        }
@@ -10,13 +10,22 @@
 
 """
 
-from typing import Tuple
+from typing import TYPE_CHECKING, Any, Iterator, Sequence, Tuple, Union
 
 import math
 
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# Sequence of (lat, lon) pairs, or an (N, 2) array
+_Coords = Union[Sequence[Tuple[float, float]], "np.ndarray"]
 
 _EARTH_RADIUS: float = 6371.0088  # Earth's radius in km
 
+# Max number of origin rows per block in batch distance computations
+_DISTANCE_CHUNK_SIZE: int = 2048
+
 
 def distance(loc1: Tuple[float, float], loc2: Tuple[float, float]) -> float:
     """
@@ -54,3 +63,83 @@ def distance(loc1: Tuple[float, float], loc2: Tuple[float, float]) -> float:
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
 
     return _EARTH_RADIUS * c
+
+
+def haversine(lat1: Any, lon1: Any, lat2: Any, lon2: Any) -> "np.ndarray":
+    """Vectorized version of distance(), for arrays of latitudes and
+    longitudes in degrees (broadcast against each other). Returns
+    distances in km. Requires NumPy."""
+    import numpy as np
+
+    lat1, lon1, lat2, lon2 = (
+        np.radians(np.asarray(x)) for x in (lat1, lon1, lat2, lon2)
+    )
+    slat = np.sin((lat2 - lat1) / 2)
+    slon = np.sin((lon2 - lon1) / 2)
+    a = np.clip(slat * slat + np.cos(lat1) * np.cos(lat2) * slon * slon, 0.0, 1.0)
+    return 2 * _EARTH_RADIUS * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def _as_coord_array(coords: Any) -> "np.ndarray":
+    """Convert a sequence of (lat, lon) pairs to an (N, 2) float array."""
+    import numpy as np
+
+    a = np.asarray(coords, dtype=np.float64)
+    if a.ndim == 1 and a.size == 2:
+        a = a.reshape(1, 2)
+    if a.ndim != 2 or a.shape[1] != 2:
+        raise ValueError("Expected a sequence of (lat, lon) pairs")
+    return a
+
+
+def iter_distance_matrix(
+    origins: _Coords,
+    destinations: _Coords,
+    chunk_size: int = _DISTANCE_CHUNK_SIZE,
+) -> Iterator[Tuple[int, "np.ndarray"]]:
+    """
+    Vectorized Haversine distances (km) between every origin and every
+    destination, computed in blocks of at most chunk_size origin rows.
+    Yields (row offset, block) tuples, where block has shape
+    (rows, len(destinations)). Requires NumPy.
+    """
+    import numpy as np
+
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+
+    orig = np.radians(_as_coord_array(origins))
+    dest = np.radians(_as_coord_array(destinations))
+    dlat2 = dest[:, 0]
+    dlon2 = dest[:, 1]
+    cos_lat2 = np.cos(dlat2)
+
+    for start in range(0, orig.shape[0], chunk_size):
+        block = orig[start : start + chunk_size]
+        lat1 = block[:, 0:1]
+        lon1 = block[:, 1:2]
+        slat = np.sin((dlat2 - lat1) / 2)
+        slon = np.sin((dlon2 - lon1) / 2)
+        a = slat * slat + np.cos(lat1) * cos_lat2 * slon * slon
+        np.clip(a, 0.0, 1.0, out=a)
+        yield start, 2 * _EARTH_RADIUS * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def distance_matrix(
+    origins: _Coords,
+    destinations: _Coords,
+    chunk_size: int = _DISTANCE_CHUNK_SIZE,
+) -> "np.ndarray":
+    """
+    Batch version of distance(). Returns an array of shape
+    (len(origins), len(destinations)) with Haversine distances in km.
+    Requires NumPy.
+    """
+    import numpy as np
+
+    n = _as_coord_array(origins).shape[0]
+    m = _as_coord_array(destinations).shape[0]
+    out = np.empty((n, m), dtype=np.float64)
+    for start, block in iter_distance_matrix(origins, destinations, chunk_size):
+        out[start : start + block.shape[0]] = block
+    return out
@@ -10,21 +10,63 @@
 
 """
 
-from typing import Iterable, List, Tuple, Dict, Union, Optional, Any, FrozenSet
+from typing import (
+    Iterable,
+    Iterator,
+    List,
+    Tuple,
+    Dict,
+    Union,
+    Optional,
+    Any,
+    FrozenSet,
+    Callable,
+)
 
 import xml.etree.ElementTree as ET
 import math
-import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import requests
 from requests import RequestException
-
-from .stations import STATIONS
-from .util import distance
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .breaker import CircuitBreaker, CircuitOpenError
+from .cache import ResponseCache
+from .metrics import (
+    CallRecord,
+    record_cache,
+    record_short_circuit,
+    record_stale,
+    recording,
+    timed_chunks,
+)
+from .ratelimit import limited_chunks
+from .records import Observation, StationForecast
+from .stations import station_dicts, station_table
+from .lookup import (
+    station_list,
+    closest_stations,
+    closest_stations_many,
+    stations_for_name,
+    id_for_station,
+    station_for_id,
+)
 
 _DEFAULT_LANG: str = "is"
 _SUPPORTED_LANGS: FrozenSet[str] = frozenset(("is", "en"))
 
 
+def __getattr__(name: str) -> List[Dict]:
+    # STATIONS is created lazily on first access (see stations.py)
+    if name == "STATIONS":
+        return station_dicts()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 _ArgType = Union[int, str, Iterable[Union[int, str]]]
 
 
@@ -38,26 +80,702 @@ def _arg_to_str_list(arg: _ArgType) -> List[str]:
     return t
 
 
-def _api_call(url: str) -> ET.Element:
-    """Use requests to call the vedur.is weather API. Return XML tree."""
-    result = requests.get(url)
-    if result.status_code != 200:
-        raise RequestException(f"API status code {result.status_code} for URL: {url}")
+# HTTP settings for calls to the weather API
+_TimeoutType = Union[float, Tuple[float, float]]
+_DEFAULT_TIMEOUT: _TimeoutType = (5.0, 30.0)  # (connect, read) in seconds
+_DEFAULT_RETRIES: int = 2
+_DEFAULT_BACKOFF_FACTOR: float = 0.5
+_DEFAULT_POOL_SIZE: int = 10
+_RETRY_STATUS_CODES: FrozenSet[int] = frozenset((500, 502, 503, 504))
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_timeout: _TimeoutType = _DEFAULT_TIMEOUT
+_retries: int = _DEFAULT_RETRIES
+_backoff_factor: float = _DEFAULT_BACKOFF_FACTOR
+_pool_size: int = _DEFAULT_POOL_SIZE
+
+
+def make_session(
+    retries: int = _DEFAULT_RETRIES,
+    backoff_factor: float = _DEFAULT_BACKOFF_FACTOR,
+    pool_size: int = _DEFAULT_POOL_SIZE,
+) -> requests.Session:
+    """Create a requests session with a keep-alive connection pool of the
+    given size, which retries failed connections and 5xx responses up to
+    `retries` times with exponential backoff."""
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=_RETRY_STATUS_CODES,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def set_session(session: Optional[requests.Session]) -> None:
+    """Use the given requests session for all calls to the weather API.
+    Passing None reverts to a default session, created on next use."""
+    global _session
+    with _session_lock:
+        _session = session
+
+
+def configure_http(
+    timeout: Optional[_TimeoutType] = None,
+    retries: int = _DEFAULT_RETRIES,
+    backoff_factor: float = _DEFAULT_BACKOFF_FACTOR,
+    pool_size: int = _DEFAULT_POOL_SIZE,
+) -> None:
+    """Configure HTTP behaviour for calls to the weather API.
+    timeout is either a single number of seconds or a (connect, read) tuple.
+    Replaces the current session with a new one built by make_session."""
+    global _timeout, _retries, _backoff_factor, _pool_size
+    _timeout = _DEFAULT_TIMEOUT if timeout is None else timeout
+    _retries, _backoff_factor, _pool_size = retries, backoff_factor, pool_size
+    set_session(
+        make_session(
+            retries=retries, backoff_factor=backoff_factor, pool_size=pool_size
+        )
+    )
+
+
+def set_base_url(url: Optional[str] = None) -> None:
+    """Send API calls to the given base URL instead of xmlweather.vedur.is,
+    e.g. a local stand-in server (see mockserver.py). Passing None
+    reverts to the real API. Clears the response cache, which holds
+    results from the previous server."""
+    global _base_url
+    _base_url = _DEFAULT_BASE_URL if url is None else url.rstrip("/") + "/"
+    _CACHE.clear()
+
+
+def _get_session() -> requests.Session:
+    """Return the session used for API calls, creating it if needed."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = make_session()
+        return _session
+
+
+# Size of body chunks read from streamed API responses
+_STREAM_CHUNK_SIZE: int = 64 * 1024
+
+
+def _api_stream(url: str) -> Iterator[bytes]:
+    """Use requests to call the vedur.is weather API.
+    Yields the (undecoded) response body in chunks as it is downloaded."""
+    result = _get_session().get(url, timeout=_timeout, stream=True)
+    with result:
+        if result.status_code != 200:
+            raise RequestException(
+                f"API status code {result.status_code} for URL: {url}"
+            )
+        yield from result.iter_content(chunk_size=_STREAM_CHUNK_SIZE)
+
+
+# Weather parameters supported by the observation and forecast endpoints
+# (see observation_for_stations for descriptions)
+PARAMS: Tuple[str, ...] = (
+    "F",
+    "FX",
+    "FG",
+    "D",
+    "T",
+    "W",
+    "V",
+    "N",
+    "P",
+    "RH",
+    "SNC",
+    "SND",
+    "SED",
+    "RTE",
+    "TD",
+    "R",
+)
+_ALL_PARAMS: str = ";".join(PARAMS)
 
-    # Remove HTML line breaks (which cause confusion in the XML parsing)
-    t: str = re.sub(r"\s*(<br/>)+\s*", r" ", result.text)
+_ParamsType = Optional[Union[str, Iterable[str]]]
 
-    x_tree = ET.fromstring(t)
-    return x_tree
+_DEFAULT_BASE_URL: str = "https://xmlweather.vedur.is/"
+_base_url: str = _DEFAULT_BASE_URL
 
+# Query strings for each endpoint, appended to the base URL
+_OBSERVATIONS_QUERY: str = "?op_w=xml&type=obs&lang={0}&view=xml&ids={1}&params={2}"
+
+_FORECASTS_QUERY: str = "?op_w=xml&type=forec&lang={0}&view=xml&ids={1}&params={2}"
+
+_TEXT_QUERY: str = "?op_w=xml&type=txt&lang={0}&view=xml&ids={1}"
+_TEXT_LANG = "is"
+
+# Max number of IDs per API call when requests are split into chunks,
+# and max number of chunks fetched concurrently
+_DEFAULT_CHUNK_SIZE: int = 50
+_DEFAULT_MAX_WORKERS: int = 4
+
+_chunk_size: int = _DEFAULT_CHUNK_SIZE
+_max_workers: int = _DEFAULT_MAX_WORKERS
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _node_text(node: ET.Element) -> str:
+    """Return the text of an XML element. HTML line breaks (<br/>) within
+    the text, along with surrounding whitespace, are replaced by a space."""
+    if not len(node):
+        return node.text or ""
+    text = node.text or ""
+    for br in node:
+        text = text.rstrip() + " " + (br.tail or "").lstrip()
+    return text
+
+
+def _parse_flat(elem: ET.Element) -> Dict:
+    """Convert an XML element for a station (or text) to a dict
+    of its attributes and child element texts."""
+    d: Dict = {**elem.attrib}
+    for node in elem:
+        d[node.tag] = _node_text(node)
+    return d
+
+
+def _parse_forecast(elem: ET.Element) -> Dict:
+    """Convert an XML element for a station forecast to a dict,
+    with a list of dicts for the forecast steps."""
+    station_dict: Dict[str, Any] = {**elem.attrib, "forecast": []}
+
+    for node in elem:
+        if node.tag == "forecast":
+            forc_dict = dict()
+
+            for x in node:
+                forc_dict[x.tag] = _node_text(x)
+
+            station_dict["forecast"].append(forc_dict)
+
+        else:
+            station_dict[node.tag] = _node_text(node)
+
+    return station_dict
+
+
+# Query template and parser for each API endpoint ("type" query parameter)
+_ENDPOINTS: Dict[str, Tuple[str, Callable[[ET.Element], Dict]]] = {
+    "obs": (_OBSERVATIONS_QUERY, _parse_flat),
+    "forec": (_FORECASTS_QUERY, _parse_forecast),
+    "txt": (_TEXT_QUERY, _parse_flat),
+}
+
+# Cache of parsed results per (endpoint, ID, lang)
+_CACHE = ResponseCache()
+
+# Circuit breaker for API calls (None if disabled), and whether to serve
+# the last known good results from the cache, even if expired, when
+# calls fail or are refused (up to a maximum age in seconds, if set)
+_DEFAULT_MAX_STALE_AGE = 60 * 60.0
+_BREAKER: Optional[CircuitBreaker] = CircuitBreaker()
+_serve_stale: bool = True
+_max_stale_age: Optional[float] = _DEFAULT_MAX_STALE_AGE
+
+
+def _copy_result(d: Dict) -> Dict:
+    """Copy a cached result so callers can't modify the cache contents."""
+    return {k: [dict(x) for x in v] if isinstance(v, list) else v for k, v in d.items()}
+
+
+def _params_str(params: _ParamsType) -> str:
+    """Validate a selection of weather parameters, given as an iterable of
+    keys or a ';'-separated string, and return it in canonical form."""
+    if params is None:
+        return _ALL_PARAMS
+    keys = set(params.split(";") if isinstance(params, str) else params)
+    unknown = keys.difference(PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown weather parameters: {', '.join(sorted(unknown))}")
+    if not keys:
+        raise ValueError("No weather parameters given")
+    return ";".join(p for p in PARAMS if p in keys)
+
+
+def _api_url(
+    endpoint: str, ids: List[str], lang: str, params: str = _ALL_PARAMS
+) -> str:
+    """Return the API URL for the given endpoint, IDs, language and
+    weather parameters (ignored for texts)."""
+    return _base_url + _ENDPOINTS[endpoint][0].format(lang, ";".join(ids), params)
+
+
+class _StreamParser:
+    """Incremental parser for API responses. Feed it the response body
+    in chunks, and it returns parsed results for each station (or text)
+    element as soon as the element is complete. Completed elements are
+    discarded, so the whole document is never held in memory."""
+
+    def __init__(self, endpoint: str) -> None:
+        self._parse = _ENDPOINTS[endpoint][1]
+        self._parser: Any = ET.XMLPullParser(events=("start", "end"))
+        self._root: Optional[ET.Element] = None
+        self._depth = 0
+
+    def feed(self, data: bytes) -> List[Dict]:
+        """Parse a chunk of the response body, return completed results."""
+        self._parser.feed(data)
+        return self._read()
+
+    def close(self) -> List[Dict]:
+        """Finish parsing, return any remaining results."""
+        self._parser.close()
+        return self._read()
+
+    def _read(self) -> List[Dict]:
+        results: List[Dict] = []
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                if self._root is None:
+                    self._root = elem
+                self._depth += 1
+                continue
+            self._depth -= 1
+            if self._depth == 1 and self._root is not None:
+                results.append(self._parse(elem))
+                self._root.remove(elem)
+        return results
+
+
+def _parse_stream(
+    endpoint: str, chunks: Iterable[bytes], record: Optional[CallRecord] = None
+) -> Iterator[Dict]:
+    """Parse an API response body, given as an iterable of chunks,
+    yielding results as they are parsed. If a call record is given,
+    parse times are measured and the call is recorded in the metrics
+    (see metrics.py)."""
+    parser = _StreamParser(endpoint)
+    if record is None:
+        for data in chunks:
+            yield from parser.feed(data)
+        yield from parser.close()
+        return
+
+    with recording(record):
+        for data in chunks:
+            t0 = time.perf_counter()
+            results = parser.feed(data)
+            record.parsed(time.perf_counter() - t0, len(results))
+            yield from results
+        t0 = time.perf_counter()
+        results = parser.close()
+        record.parsed(time.perf_counter() - t0, len(results))
+        yield from results
+
+
+def _cached_results(
+    endpoint: str, ids: List[str], lang: str, params: str, use_cache: bool
+) -> Tuple[Dict[str, Dict], List[str]]:
+    """Look up results in the cache. Returns cached results by ID
+    and a list of IDs which need to be fetched from the API."""
+    if not use_cache:
+        return {}, ids
+
+    found: Dict[str, Dict] = {}
+    missing: List[str] = []
+    for i in dict.fromkeys(ids):  # Unique IDs, in order
+        r = _CACHE.get((endpoint, i, lang, params))
+        if r is None:
+            missing.append(i)
+        else:
+            found[i] = r
+    record_cache(endpoint, len(found), len(missing))
+    return found, missing
+
+
+def _merge_results(
+    endpoint: str,
+    ids: List[str],
+    lang: str,
+    params: str,
+    found: Dict[str, Dict],
+    fetched: List[Dict],
+    use_cache: bool,
+) -> List[Dict]:
+    """Store freshly fetched results in the cache and merge them with
+    the cached ones, in the order of the requested IDs."""
+    if not use_cache:
+        return fetched
+
+    extra: List[Dict] = []
+    for r in fetched:
+        rid = r.get("id")
+        if rid is None or rid in found:
+            extra.append(r)
+            continue
+        found[rid] = r
+        # Don't cache error responses, or stale results from the cache
+        if not r.get("err") and not r.get("stale"):
+            _CACHE.put((endpoint, rid, lang, params), r)
+
+    results = [_copy_result(found.pop(i)) for i in dict.fromkeys(ids) if i in found]
+    # Results with IDs that weren't requested verbatim (should not happen)
+    results.extend(_copy_result(r) for r in found.values())
+    results.extend(extra)
+    return results
+
+
+def configure_fetch(
+    chunk_size: int = _DEFAULT_CHUNK_SIZE, max_workers: int = _DEFAULT_MAX_WORKERS
+) -> None:
+    """Configure how requests for many IDs are split up: at most chunk_size
+    IDs per API call, with up to max_workers calls made concurrently."""
+    global _chunk_size, _max_workers, _executor
+    if chunk_size < 1 or max_workers < 1:
+        raise ValueError("chunk_size and max_workers must be positive")
+    with _executor_lock:
+        _chunk_size, _max_workers = chunk_size, max_workers
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Return the thread pool used for concurrent chunk fetches."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_max_workers, thread_name_prefix="iceweather"
+            )
+        return _executor
+
+
+@contextmanager
+def _circuit(endpoint: str, url: str) -> Iterator[None]:
+    """Context manager for an API call, which raises CircuitOpenError
+    instead if the circuit breaker is open, and otherwise reports the
+    outcome of the call to it."""
+    breaker = _BREAKER
+    if breaker is None:
+        yield
+        return
+    if not breaker.allow():
+        record_short_circuit(endpoint)
+        raise CircuitOpenError(f"Circuit open, not calling URL: {url}")
+    try:
+        yield
+    except RequestException:
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+
+
+def _iter_chunk(
+    endpoint: str, ids: List[str], lang: str, params: str = _ALL_PARAMS
+) -> Iterator[Dict]:
+    """Fetch results for a list of IDs in a single API call, yielding
+    each result as it is parsed from the response."""
+    url = _api_url(endpoint, ids, lang, params)
+    with _circuit(endpoint, url):
+        record = CallRecord(endpoint, url, len(ids))
+        # The call starts when the rate limits allow (see ratelimit.py)
+        chunks = timed_chunks(record, _api_stream(url))
+        yield from _parse_stream(
+            endpoint, limited_chunks(endpoint, record, chunks), record
+        )
+
+
+def _fetch_chunk(
+    endpoint: str, ids: List[str], lang: str, params: str = _ALL_PARAMS
+) -> List[Dict]:
+    """Fetch and parse results for a list of IDs in a single API call."""
+    return list(_iter_chunk(endpoint, ids, lang, params))
+
+
+def _stale_results(
+    endpoint: str, ids: List[str], lang: str, params: str, error: Exception
+) -> List[Dict]:
+    """Return the last known good results for the given IDs from the cache,
+    flagged as stale with their age in seconds, in place of a failed API
+    call. IDs without a cached result (or with one older than the maximum
+    age) get an error result with the call's error message instead. Raises
+    the call's error if no cached result is available at all."""
+    if not _serve_stale:
+        raise error
+    results = []
+    stale = 0
+    for i in ids:
+        found = _CACHE.get_stale((endpoint, i, lang, params))
+        if found is None or (_max_stale_age is not None and found[1] > _max_stale_age):
+            results.append(_error_result(endpoint, i, error))
+            continue
+        r = _copy_result(found[0])
+        r["stale"] = True
+        r["age"] = found[1]
+        results.append(r)
+        stale += 1
+    if not stale:
+        raise error
+    record_stale(endpoint, stale)
+    return results
+
+
+def _error_result(endpoint: str, rid: str, error: Exception) -> Dict:
+    """Return a result for an ID whose API call failed, with the error."""
+    r: Dict = {"id": rid, "valid": "0", "err": str(error)}
+    if endpoint == "forec":
+        r["forecast"] = []
+    return r
+
+
+def _fetch_chunk_or_stale(
+    endpoint: str, ids: List[str], lang: str, params: str, use_cache: bool
+) -> List[Dict]:
+    """Fetch results for a chunk of IDs, falling back on stale cached
+    results if the API call fails (when using the cache)."""
+    try:
+        return _fetch_chunk(endpoint, ids, lang, params)
+    except RequestException as e:
+        if not use_cache:
+            raise
+        return _stale_results(endpoint, ids, lang, params, e)
+
+
+def _fetch_results(
+    endpoint: str,
+    ids: List[str],
+    lang: str,
+    use_cache: bool = True,
+    chunk_size: Optional[int] = None,
+    params: str = _ALL_PARAMS,
+) -> List[Dict]:
+    """Fetch parsed results for the given IDs from an API endpoint.
+    Cached results are used where available (unless use_cache is False),
+    and only the remaining IDs are requested from the API. Long ID lists
+    are split into chunks which are fetched concurrently on a thread pool."""
+    use_cache = use_cache and _CACHE.enabled
+    found, missing = _cached_results(endpoint, ids, lang, params, use_cache)
+    fetched: List[Dict] = []
+    chunks = _chunked(missing, chunk_size or _chunk_size)
+    if len(chunks) == 1:
+        fetched = _fetch_chunk_or_stale(endpoint, chunks[0], lang, params, use_cache)
+    elif chunks:
+        # Executor.map() returns results in the order of the chunks
+        for r in _get_executor().map(
+            lambda chunk: _fetch_chunk_or_stale(
+                endpoint, chunk, lang, params, use_cache
+            ),
+            chunks,
+        ):
+            fetched.extend(r)
+    return _merge_results(endpoint, ids, lang, params, found, fetched, use_cache)
+
+
+def _iter_results(
+    endpoint: str,
+    ids: List[str],
+    lang: str,
+    use_cache: bool = True,
+    chunk_size: Optional[int] = None,
+    params: str = _ALL_PARAMS,
+) -> Iterator[Dict]:
+    """Generator version of _fetch_results. Yields cached results first,
+    then results from the API (one chunk of IDs at a time) as they are
+    parsed from the response."""
+    use_cache = use_cache and _CACHE.enabled
+    found, missing = _cached_results(endpoint, ids, lang, params, use_cache)
+    for r in found.values():
+        yield _copy_result(r)
+    for chunk in _chunked(missing, chunk_size or _chunk_size):
+        done = set()
+        try:
+            for r in _iter_chunk(endpoint, chunk, lang, params):
+                rid = r.get("id")
+                if use_cache and rid is not None and not r.get("err"):
+                    _CACHE.put((endpoint, rid, lang, params), _copy_result(r))
+                done.add(rid)
+                yield r
+        except RequestException as e:
+            if not use_cache:
+                raise
+            rest = [i for i in chunk if i not in done]
+            yield from _stale_results(endpoint, rest, lang, params, e)
+
+
+def configure_cache(
+    enabled: Optional[bool] = None,
+    maxsize: Optional[int] = None,
+    ttls: Optional[Dict[str, float]] = None,
+) -> None:
+    """Configure the response cache. ttls maps endpoint ("obs", "forec"
+    or "txt") to time-to-live in seconds."""
+    if enabled is not None:
+        _CACHE.enabled = enabled
+    if maxsize is not None:
+        _CACHE.maxsize = maxsize
+    if ttls:
+        _CACHE.ttls.update(ttls)
+
+
+def configure_circuit_breaker(
+    enabled: bool = True,
+    failure_threshold: int = 5,
+    reset_timeout: float = 30.0,
+    serve_stale: bool = True,
+    max_stale_age: Optional[float] = _DEFAULT_MAX_STALE_AGE,
+) -> None:
+    """Configure the circuit breaker for API calls. After failure_threshold
+    consecutive failed calls, calls are refused (raising CircuitOpenError)
+    for reset_timeout seconds, before a trial call is let through.
+    With serve_stale, results which can't be fetched because a call fails
+    or is refused are replaced by the last results in the cache, even if
+    expired, but not older than max_stale_age seconds (None for no limit).
+    These have "stale" set to True and their "age" in seconds. Stations
+    (or texts) without such a result get a result with "valid" set to
+    "0" and the call's error in "err"; if none of the results for a call
+    are available, its error is raised. The cache must be enabled and in
+    use (use_cache=True) for this to work."""
+    global _BREAKER, _serve_stale, _max_stale_age
+    _BREAKER = CircuitBreaker(failure_threshold, reset_timeout) if enabled else None
+    _serve_stale = serve_stale
+    _max_stale_age = max_stale_age
+
+
+def circuit_state() -> Optional[str]:
+    """Return the state of the circuit breaker for API calls: "closed",
+    "open" or "half-open" (None if disabled)."""
+    breaker = _BREAKER
+    return None if breaker is None else breaker.state
+
+
+def cache_stats() -> Dict[str, int]:
+    """Return response cache statistics (hits, misses, evictions, size)."""
+    return _CACHE.stats()
+
+
+def invalidate_cache(
+    endpoint: Optional[str] = None,
+    ids: Optional[_ArgType] = None,
+    lang: Optional[str] = None,
+) -> int:
+    """Remove cached results matching the given endpoint ("obs", "forec"
+    or "txt"), IDs and language (None matches all). Returns the number of
+    results removed."""
+    return _CACHE.invalidate(
+        endpoint, None if ids is None else _arg_to_str_list(ids), lang
+    )
+
+
+def clear_cache() -> None:
+    """Remove all cached results and reset cache statistics."""
+    _CACHE.clear()
+
+
+def _is_valid_result(r: Optional[Dict]) -> bool:
+    """Check whether a station result has data (no error, valid flag set)."""
+    return r is not None and not r.get("err") and r.get("valid") == "1"
+
+
+def _station_ids(stations: List[Dict]) -> List[str]:
+    """Return the IDs of the given stations as strings."""
+    return [str(s["id"]) for s in stations]
+
+
+def _all_station_ids() -> List[str]:
+    """Return the IDs of all stations as strings."""
+    return [str(i) for i in station_table().ids]
 
-_OBSERVATIONS_URL: str = (
-    "https://xmlweather.vedur.is/?op_w=xml&type=obs&lang={0}&view=xml"
-    "&ids={1}&params=F;FX;FG;D;T;W;V;N;P;RH;SNC;SND;SED;RTE;TD;R"
-)
 
+def _chunked(ids: List[str], chunk_size: int) -> List[List[str]]:
+    """Split a list of IDs into chunks of at most chunk_size IDs."""
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    return [ids[i : i + chunk_size] for i in range(0, len(ids), chunk_size)]
 
-def observation_for_stations(station_ids: _ArgType, lang: str = _DEFAULT_LANG) -> Dict:
+
+def _pick_result(
+    stations: List[Dict], results_by_id: Dict[str, Dict]
+) -> Tuple[Dict, Dict]:
+    """Return ({"results": [result]}, station) for the first of the given
+    stations (in order) with a valid result, falling back on the first station.
+    Returns ({"results": []}, {}) if there are no stations (e.g. if all of
+    them have been marked as dead)."""
+    if not stations:
+        return {"results": []}, {}
+    for s in stations:
+        r = results_by_id.get(str(s["id"]))
+        if _is_valid_result(r):
+            return {"results": [r]}, s
+    r = results_by_id.get(str(stations[0]["id"]))
+    return {"results": [r] if r else []}, stations[0]
+
+
+def _result_for_closest(
+    endpoint: str,
+    lat: float,
+    lon: float,
+    lang: str,
+    num_stations_to_try: int,
+    use_cache: bool,
+    params: str = _ALL_PARAMS,
+) -> Tuple[Dict, Dict]:
+    """Fetch results for the closest stations in a single API call
+    and return the first valid one (see _pick_result)."""
+    stations = closest_stations(lat, lon, limit=max(num_stations_to_try, 1))
+    ids = _station_ids(stations)
+    results = _fetch_results(endpoint, ids, lang, use_cache, params=params)
+    return _pick_result(stations, {r.get("id", ""): r for r in results})
+
+
+def _closest_candidates(
+    points: Iterable[Tuple[float, float]], num_stations_to_try: int
+) -> Tuple[List[List[Dict]], List[str]]:
+    """Return the closest stations to each of the given (lat, lon) points,
+    and the IDs of all of them, without duplicates. Stations for repeated
+    points are only looked up once."""
+    limit = max(num_stations_to_try, 1)
+    found: Dict[Tuple[float, float], List[Dict]] = {}
+    candidates = []
+    for lat, lon in points:
+        stations = found.get((lat, lon))
+        if stations is None:
+            stations = found[(lat, lon)] = closest_stations(lat, lon, limit=limit)
+        candidates.append(stations)
+    ids = list(dict.fromkeys(i for s in found.values() for i in _station_ids(s)))
+    return candidates, ids
+
+
+def _results_for_closest_many(
+    endpoint: str,
+    points: Iterable[Tuple[float, float]],
+    lang: str,
+    num_stations_to_try: int,
+    use_cache: bool,
+    params: str = _ALL_PARAMS,
+) -> List[Tuple[Dict, Dict]]:
+    """Fetch results for the closest stations to all points in a single
+    (chunked) batch and pick the first valid one for each point."""
+    candidates, ids = _closest_candidates(points, num_stations_to_try)
+    results = _fetch_results(endpoint, ids, lang, use_cache, params=params)
+    by_id = {r.get("id", ""): r for r in results}
+    return [_pick_result(stations, by_id) for stations in candidates]
+
+
+def observation_for_stations(
+    station_ids: _ArgType,
+    lang: str = _DEFAULT_LANG,
+    use_cache: bool = True,
+    chunk_size: Optional[int] = None,
+    typed: bool = False,
+    params: _ParamsType = None,
+) -> Dict:
     """
     Returns weather observations for the given station IDs.
     Keys in the resulting dictionary are the following:
@@ -94,115 +812,208 @@ def observation_for_stations(station_ids: _ArgType, lang: str = _DEFAULT_LANG) -
               'en': 'Dew limit (°C)'},
     'R'   : { 'is': 'Uppsöfnuð úrkoma (mm/klst) úr sjálfvirkum mælum',
               'en': 'Cumulative precipitation (mm/h) from automatic measuring units'}
+
+    Use params (an iterable of keys, or a ';'-separated string) to request
+    only some of the weather parameters, which makes the API response smaller.
+
+    All values are strings. With typed=True, results are Observation
+    records instead, with numeric values and times parsed (see records.py).
     """
     assert lang in _SUPPORTED_LANGS
 
     ids = _arg_to_str_list(station_ids)
-    x_tree = _api_call(_OBSERVATIONS_URL.format(lang, ";".join(ids)))
-    ret_data: Dict[str, List[Dict]] = {"results": []}
-
-    for station in x_tree:
-        station_dict: Dict = {**station.attrib}
+    p = _params_str(params)
+    results = _fetch_results("obs", ids, lang, use_cache, chunk_size, p)
+    if typed:
+        return {"results": [Observation.from_dict(r) for r in results]}
+    return {"results": results}
+
+
+def observation_for_all_stations(
+    lang: str = _DEFAULT_LANG,
+    use_cache: bool = True,
+    chunk_size: Optional[int] = None,
+    typed: bool = False,
+    params: _ParamsType = None,
+) -> Dict:
+    """Returns weather observations for all weather stations in Iceland,
+    fetched in concurrent chunks of station IDs."""
+    return observation_for_stations(
+        _all_station_ids(),
+        lang,
+        use_cache=use_cache,
+        chunk_size=chunk_size,
+        typed=typed,
+        params=params,
+    )
 
-        for node in station:
-            station_dict[node.tag] = node.text or ""
 
-        ret_data["results"].append(station_dict)
+def iter_observations(
+    station_ids: _ArgType,
+    lang: str = _DEFAULT_LANG,
+    use_cache: bool = True,
+    chunk_size: Optional[int] = None,
+    typed: bool = False,
+    params: _ParamsType = None,
+) -> Iterator[Any]:
+    """Generator version of observation_for_stations. Yields the observation
+    for each station as soon as it has been parsed from the API response
+    (cached results first), rather than in the order requested."""
+    assert lang in _SUPPORTED_LANGS
 
-    return ret_data
+    ids = _arg_to_str_list(station_ids)
+    p = _params_str(params)
+    it = _iter_results("obs", ids, lang, use_cache, chunk_size, p)
+    return map(Observation.from_dict, it) if typed else it
 
 
 def observation_for_station(
-    station_id: Union[str, int], lang: str = _DEFAULT_LANG
+    station_id: Union[str, int],
+    lang: str = _DEFAULT_LANG,
+    use_cache: bool = True,
+    typed: bool = False,
+    params: _ParamsType = None,
 ) -> Dict:
     """Returns weather observations for the given station ID.
     Wrapper for observation_for_stations."""
     assert lang in _SUPPORTED_LANGS
     assert isinstance(station_id, (str, int))
 
-    return observation_for_stations(station_id, lang)
+    return observation_for_stations(
+        station_id, lang, use_cache, typed=typed, params=params
+    )
 
 
 def observation_for_closest(
-    lat: float, lon: float, lang: str = _DEFAULT_LANG, num_stations_to_try: int = 3
+    lat: float,
+    lon: float,
+    lang: str = _DEFAULT_LANG,
+    num_stations_to_try: int = 3,
+    use_cache: bool = True,
+    params: _ParamsType = None,
 ) -> Tuple[Dict, Dict]:
     """Returns weather observation from closest weather station given coordinates.
     Tries up to num_stations_to_try stations, returns the first one that works."""
     assert lang in _SUPPORTED_LANGS
 
-    stations = closest_stations(lat, lon, limit=num_stations_to_try)
-    for s in stations:
-        o = observation_for_station(s["id"], lang=lang)
-        if o["results"] and not o["results"][0].get("err") and o["results"][0]["valid"]:
-            return o, s
-    return observation_for_station(stations[0]["id"], lang=lang), stations[0]
-
-
-_FORECASTS_URL: str = (
-    "https://xmlweather.vedur.is?op_w=xml&type=forec&lang={0}&view=xml"
-    "&ids={1}&params=F;FX;FG;D;T;W;V;N;P;RH;SNC;SND;SED;RTE;TD;R"
-)
+    return _result_for_closest(
+        "obs", lat, lon, lang, num_stations_to_try, use_cache, _params_str(params)
+    )
 
 
-def forecast_for_stations(station_ids: _ArgType, lang: str = _DEFAULT_LANG) -> Dict:
-    """Returns weather forecast from given weather station IDs."""
+def observation_for_closest_many(
+    points: Iterable[Tuple[float, float]],
+    lang: str = _DEFAULT_LANG,
+    num_stations_to_try: int = 3,
+    use_cache: bool = True,
+    params: _ParamsType = None,
+) -> List[Tuple[Dict, Dict]]:
+    """Batch version of observation_for_closest, for many (lat, lon) points.
+    The closest stations of all points are fetched together, with each
+    station requested only once, and for each point the result from the
+    first of its num_stations_to_try closest stations that works is
+    returned, as (observation, station) in the order of the points.
+    Points sharing a station share its result dict."""
     assert lang in _SUPPORTED_LANGS
 
-    ids = _arg_to_str_list(station_ids)
-    x_tree = _api_call(_FORECASTS_URL.format(lang, ";".join(ids)))
-
-    ret_data: Dict[str, List[Dict]] = {"results": []}
-
-    for station in x_tree:
-        station_dict: Dict[str, Any] = {**station.attrib, "forecast": []}
-
-        for node in station:
-            if node.tag == "forecast":
-                forc_dict = dict()
-
-                for x in node:
-                    forc_dict[x.tag] = x.text or ""
+    return _results_for_closest_many(
+        "obs", points, lang, num_stations_to_try, use_cache, _params_str(params)
+    )
 
-                station_dict["forecast"].append(forc_dict)
 
-            else:
-                station_dict[node.tag] = node.text or ""
+def forecast_for_stations(
+    station_ids: _ArgType,
+    lang: str = _DEFAULT_LANG,
+    use_cache: bool = True,
+    chunk_size: Optional[int] = None,
+    typed: bool = False,
+    params: _ParamsType = None,
+) -> Dict:
+    """Returns weather forecast from given weather station IDs.
+    Use params to request only some of the weather parameters (see
+    observation_for_stations).
+    With typed=True, results are StationForecast records instead of dicts,
+    with numeric values and times parsed (see records.py)."""
+    assert lang in _SUPPORTED_LANGS
 
-        ret_data["results"].append(station_dict)
+    ids = _arg_to_str_list(station_ids)
+    p = _params_str(params)
+    results = _fetch_results("forec", ids, lang, use_cache, chunk_size, p)
+    if typed:
+        return {"results": [StationForecast.from_dict(r) for r in results]}
+    return {"results": results}
+
+
+def iter_forecasts(
+    station_ids: _ArgType,
+    lang: str = _DEFAULT_LANG,
+    use_cache: bool = True,
+    chunk_size: Optional[int] = None,
+    typed: bool = False,
+    params: _ParamsType = None,
+) -> Iterator[Any]:
+    """Generator version of forecast_for_stations. Yields the forecast
+    for each station as soon as it has been parsed from the API response
+    (cached results first), rather than in the order requested."""
+    assert lang in _SUPPORTED_LANGS
 
-    return ret_data
+    ids = _arg_to_str_list(station_ids)
+    p = _params_str(params)
+    it = _iter_results("forec", ids, lang, use_cache, chunk_size, p)
+    return map(StationForecast.from_dict, it) if typed else it
 
 
 def forecast_for_station(
-    station_id: Union[str, int], lang: str = _DEFAULT_LANG
+    station_id: Union[str, int],
+    lang: str = _DEFAULT_LANG,
+    use_cache: bool = True,
+    typed: bool = False,
+    params: _ParamsType = None,
 ) -> Dict:
     """Returns weather forecast from given weather station ID.
     Wrapper for forecast_for_stations."""
     assert lang in _SUPPORTED_LANGS
     assert isinstance(station_id, (str, int))
 
-    return forecast_for_stations(station_id, lang)
+    return forecast_for_stations(
+        station_id, lang, use_cache, typed=typed, params=params
+    )
 
 
 def forecast_for_closest(
-    lat: float, lon: float, lang=_DEFAULT_LANG, num_stations_to_try: int = 3
+    lat: float,
+    lon: float,
+    lang=_DEFAULT_LANG,
+    num_stations_to_try: int = 3,
+    use_cache: bool = True,
+    params: _ParamsType = None,
 ) -> Tuple[Dict, Dict]:
-    """Returns weather forecast from closest weather station given coordinates."""
+    """Returns weather forecast from closest weather station given coordinates.
+    Tries up to num_stations_to_try stations, returns the first one that works."""
     assert lang in _SUPPORTED_LANGS
 
-    stations = closest_stations(lat, lon, limit=num_stations_to_try)
-    for s in stations:
-        o = forecast_for_station(s["id"], lang=lang)
-        if o["results"] and not o["results"][0].get("err") and o["results"][0]["valid"]:
-            return o, s
+    return _result_for_closest(
+        "forec", lat, lon, lang, num_stations_to_try, use_cache, _params_str(params)
+    )
 
-    return forecast_for_station(stations[0]["id"], lang=lang), stations[0]
 
+def forecast_for_closest_many(
+    points: Iterable[Tuple[float, float]],
+    lang: str = _DEFAULT_LANG,
+    num_stations_to_try: int = 3,
+    use_cache: bool = True,
+    params: _ParamsType = None,
+) -> List[Tuple[Dict, Dict]]:
+    """Batch version of forecast_for_closest, for many (lat, lon) points
+    (see observation_for_closest_many)."""
+    assert lang in _SUPPORTED_LANGS
 
-_TEXT_URL = "https://xmlweather.vedur.is?op_w=xml&type=txt&lang=is&view=xml&ids={0}"
+    return _results_for_closest_many(
+        "forec", points, lang, num_stations_to_try, use_cache, _params_str(params)
+    )
 
 
-def forecast_text(types: _ArgType) -> Dict:
+def forecast_text(types: _ArgType, use_cache: bool = True) -> Dict:
     """Request a descriptive text from the weather API.
 
     Text types:
@@ -232,46 +1043,11 @@ def forecast_text(types: _ArgType) -> Dict:
     """
 
     t = _arg_to_str_list(types)
+    return {"results": _fetch_results("txt", t, _TEXT_LANG, use_cache, params="")}
 
-    x_tree = _api_call(_TEXT_URL.format(";".join(t)))
-
-    ret_data: Dict[str, List[Dict]] = {"results": []}
-
-    for text in x_tree:
-        text_dict = {**text.attrib}
-
-        for node in text:
-            text_dict[node.tag] = node.text or ""
-
-        ret_data["results"].append(text_dict)
-
-    return ret_data
 
-
-def station_list() -> List[Dict]:
-    """Return a list of all weather stations in Iceland."""
-    return STATIONS
-
-
-def closest_stations(lat: float, lon: float, limit: int = 1) -> List[Dict]:
-    """Find the weather station closest to the given location."""
-    dist_sorted = sorted(
-        STATIONS, key=lambda s: distance((lat, lon), (s["lat"], s["lon"]))
-    )
-    return dist_sorted[:limit]
-
-
-def id_for_station(station_name: str) -> Optional[int]:
-    """Return the numerical ID for a weather station, given its name."""
-    for s in STATIONS:
-        if s["name"] == station_name:
-            return s["id"]
-    return None
-
-
-def station_for_id(station_id: int) -> Optional[Dict]:
-    """Return the name of a weather station, given its numerical ID."""
-    for s in STATIONS:
-        if s["id"] == station_id:
-            return s
-    return None
+def iter_texts(types: _ArgType, use_cache: bool = True) -> Iterator[Dict]:
+    """Generator version of forecast_text. Yields each text as soon as it
+    has been parsed from the API response (cached results first)."""
+    t = _arg_to_str_list(types)
+    return _iter_results("txt", t, _TEXT_LANG, use_cache, params="")
@@ -14,16 +14,20 @@
 
 """
 
-import time
 from pprint import pprint
 
 import requests
 from bs4 import BeautifulSoup
 
+from iceweather.ratelimit import RateLimit
+
 STATIONS_URL = "https://www.vedur.is/vedur/stodvar"
 
 STATIONS = []
 
+# Let's be polite and give the server some breathing space
+LIMIT = RateLimit(rate=2.0)
+
 result = requests.get(STATIONS_URL)
 
 if result.status_code != 200:
@@ -45,6 +49,7 @@ for s in samples:
     href = a[0]["href"]
 
     uppl_url = "https://www.vedur.is" + href
+    LIMIT.acquire()
     result = requests.get(uppl_url)
     if result.status_code != 200:
         print("Failed to fetch " + uppl_url)
@@ -89,8 +94,7 @@ for s in samples:
     STATIONS.append(station_info)
     pprint(station_info)
 
-    # Let's be polite and give the server some breathing space
-    time.sleep(0.5)
-
 print("-------------------")
-pprint(STATIONS)
+# Print in the table format used in iceweather/stations.py
+for s in STATIONS:
+    print(f"{s['id']} {s['lat']!r} {s['lon']!r} {s['name']}")
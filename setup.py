@@ -27,6 +27,7 @@ setuptools.setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     install_requires=["requests"],
+    extras_require={"numpy": ["numpy"], "aio": ["aiohttp"]},
     packages=["iceweather"],
     classifiers=[
         "License :: OSI Approved :: BSD License",
@@ -0,0 +1,38 @@
+"""
+
+    iceweather: Look up information about Icelandic weather (observations, forecasts,
+    human readable descriptive texts, etc.) using vedur.is xmlweather API.
+
+    Copyright (c) 2019-2023 Miðeind ehf.
+    Original author: Sveinbjorn Thordarson
+
+    BSD 3-clause License (see License.txt).
+
+
+    Test configuration. Tests run against a local stand-in for the
+    weather API, unless the ICEWEATHER_LIVE_TESTS environment variable
+    is set to 1, in which case the real API is used.
+
+"""
+
+import os
+
+import pytest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def weather_api():
+    """Point the library at a local mock server for the test session."""
+    if os.environ.get("ICEWEATHER_LIVE_TESTS") == "1":
+        yield None
+        return
+
+    from iceweather.mockserver import MockServer
+    from iceweather.weather import set_base_url
+
+    with MockServer() as server:
+        set_base_url(server.url)
+        try:
+            yield server
+        finally:
+            set_base_url(None)
@@ -48,6 +48,15 @@ def test_iceweather():
     assert s and isinstance(s, dict)
     assert s["name"] == "Reykjavík"
 
+    # Stations sharing a name
+    asg = stations_for_name("Ásgarður")
+    assert len(asg) == 2 and all(s["name"] == "Ásgarður" for s in asg)
+    assert id_for_station("Ásgarður") == asg[0]["id"]
+    assert stations_for_name("Reykjavík") == [station_for_id(1)]
+    assert stations_for_name("Engin stöð") == []
+    assert id_for_station("Engin stöð") is None
+    assert station_for_id(-1) is None
+
 
 def test_observation_for_station():
     """Test observation_for_station."""
@@ -219,3 +228,1261 @@ def test_closest_stations():
         "Seltjarnarnes"
         in closest_stations(_SELTJ_COORDS[0], _SELTJ_COORDS[1])[0]["name"]
     )
+
+    # Spatial index must give the same results as sorting all stations
+    from iceweather.util import distance
+
+    for lat in (63.0, 63.4, 64.1, 64.15, 65.2297, 66.0, 67.0):
+        for lon in (-25.0, -21.9, -21.7543, -18.1, -15.0, -13.0):
+            dist_sorted = sorted(
+                STATIONS, key=lambda s: distance((lat, lon), (s["lat"], s["lon"]))
+            )
+            for limit in (1, 2, 3, 10, len(STATIONS), len(STATIONS) + 1):
+                assert closest_stations(lat, lon, limit=limit) == dist_sorted[:limit]
+
+
+def test_closest_stations_many():
+    """Test batched closest station logic."""
+    import numpy as np
+    from iceweather.util import distance, distance_matrix
+
+    points = [
+        (lat / 10, lon / 10)
+        for lat in range(630, 670, 3)
+        for lon in range(-250, -130, 7)
+    ]
+    coords = [(s["lat"], s["lon"]) for s in STATIONS]
+
+    # Vectorized distances agree with the scalar reference
+    dm = distance_matrix(points, coords, chunk_size=7)
+    assert dm.shape == (len(points), len(STATIONS))
+    for i in range(0, len(points), 11):
+        for j in range(0, len(STATIONS), 13):
+            assert abs(dm[i, j] - distance(points[i], coords[j])) < 1e-6
+
+    for limit in (1, 3):
+        many = closest_stations_many(points, limit=limit)
+        assert len(many) == len(points)
+        for p, stations in zip(points, many):
+            assert [s["id"] for s in stations] == [
+                s["id"] for s in closest_stations(p[0], p[1], limit=limit)
+            ]
+
+    assert closest_stations_many([]) == []
+    assert "Reykjavík" in closest_stations_many([_RVK_COORDS])[0][0]["name"]
+    every = closest_stations_many([_RVK_COORDS], limit=len(STATIONS) + 5)[0]
+    assert len(every) == len(STATIONS)
+    assert every[:3] == closest_stations_many([_RVK_COORDS], limit=3)[0]
+
+    # Partial selection keeps ties in column order, like a stable sort
+    from iceweather.lookup import _smallest
+
+    block = np.array([[2.0, 1.0, 1.0, 0.5, 1.0], [3.0, 3.0, 3.0, 3.0, 0.0]])
+    for limit in range(1, 6):
+        expected = np.argsort(block, axis=1, kind="stable")[:, :limit]
+        assert (_smallest(block, limit) == expected).all()
+
+
+def test_http_session():
+    """Test HTTP session configuration."""
+    import iceweather.weather as w
+
+    s = make_session(retries=4, backoff_factor=0.1, pool_size=3)
+    adapter = s.get_adapter("https://xmlweather.vedur.is/")
+    assert adapter.max_retries.total == 4
+    assert 503 in adapter.max_retries.status_forcelist
+    assert adapter._pool_maxsize == 3
+
+    set_session(s)
+    assert w._get_session() is s
+    set_session(None)
+    assert w._get_session() is not s
+
+    configure_http(timeout=2.5, retries=0)
+    assert w._timeout == 2.5
+    configure_http()
+    assert w._timeout == w._DEFAULT_TIMEOUT
+
+
+def _fake_api(calls, errors=()):
+    """Return a stand-in for weather._api_stream which records the requested
+    station IDs and returns a minimal observation for each of them
+    (with an error message for IDs in errors), in small chunks."""
+    from urllib.parse import parse_qs, urlparse
+
+    def _api_stream(url):
+        ids = parse_qs(urlparse(url).query)["ids"][0].split(";")
+        calls.append(ids)
+        body = (
+            '<?xml version="1.0" encoding="utf-8"?><observations>'
+            + "".join(
+                f'<station id="{i}" valid="1"><name>Stöð {i}</name>'
+                f"<err>{'Villa' if i in errors else ''}</err>"
+                f"<T>{len(calls)}.5</T><W>Skýjað <br/><br/> og þurrt</W></station>"
+                for i in ids
+            )
+            + "</observations>"
+        ).encode("utf-8")
+        for i in range(0, len(body), 100):
+            yield body[i : i + 100]
+
+    return _api_stream
+
+
+def test_response_cache(monkeypatch):
+    """Test caching of API results."""
+    import iceweather.weather as w
+    from iceweather.cache import DEFAULT_TTLS
+
+    calls = []
+    monkeypatch.setattr(w, "_api_stream", _fake_api(calls))
+    clear_cache()
+
+    r = observation_for_stations((1, 422))
+    assert [s["id"] for s in r["results"]] == ["1", "422"]
+    assert calls == [["1", "422"]]
+
+    # Only the missing ID is fetched, results are in requested order
+    r = observation_for_stations((422, 178, 1))
+    assert [s["id"] for s in r["results"]] == ["422", "178", "1"]
+    assert calls[-1] == ["178"]
+    assert r["results"][0]["T"] == "1.5"
+
+    # Results are copies
+    r["results"][0]["T"] = "99"
+    assert observation_for_station(422)["results"][0]["T"] == "1.5"
+    stats = cache_stats()
+    assert stats["hits"] == 3 and stats["misses"] == 3 and stats["size"] == 3
+
+    # Bypass and invalidation
+    assert observation_for_station(1, use_cache=False)["results"][0]["T"] == "3.5"
+    assert invalidate_cache("obs", ids=[422]) == 1
+    observation_for_stations((1, 422))
+    assert calls[-1] == ["422"]
+    assert invalidate_cache(lang="en") == 0
+
+    # Expiry
+    configure_cache(ttls={"obs": 0.0})
+    try:
+        observation_for_station(1)
+        assert calls[-1] == ["1"]
+    finally:
+        configure_cache(ttls={"obs": DEFAULT_TTLS["obs"]})
+        clear_cache()
+
+
+def test_closest_fallback(monkeypatch):
+    """Test that *_for_closest fetch all candidate stations in one call."""
+    import iceweather.weather as w
+
+    calls = []
+    stations = closest_stations(_RVK_COORDS[0], _RVK_COORDS[1], limit=3)
+    ids = [str(s["id"]) for s in stations]
+    monkeypatch.setattr(w, "_api_stream", _fake_api(calls, errors=ids[:2]))
+
+    o, s = observation_for_closest(*_RVK_COORDS, use_cache=False)
+    assert calls == [ids]
+    assert s == stations[2]
+    assert [r["id"] for r in o["results"]] == [ids[2]]
+
+    # All candidates fail: fall back on the closest one
+    monkeypatch.setattr(w, "_api_stream", _fake_api(calls, errors=ids))
+    o, s = observation_for_closest(*_RVK_COORDS, use_cache=False)
+    assert len(calls) == 2
+    assert s == stations[0]
+    assert o["results"][0]["err"] == "Villa"
+
+    # A result without an error but with valid="0" is skipped too
+    results = {i: {"id": i, "valid": "0", "err": ""} for i in ids}
+    results[ids[1]] = {"id": ids[1], "valid": "1", "err": ""}
+    assert w._pick_result(stations, results) == (
+        {"results": [results[ids[1]]]},
+        stations[1],
+    )
+
+
+def test_closest_many(monkeypatch):
+    """Test batched *_for_closest for many locations."""
+    import iceweather.weather as w
+
+    calls = []
+    points = [_RVK_COORDS, _SELTJ_COORDS, (65.68, -18.1), _RVK_COORDS] * 50
+    candidates = [closest_stations(*p, limit=2) for p in points[:3]]
+    ids = {str(s["id"]) for c in candidates for s in c}
+    # The closest station to Reykjavík fails, so its fallback is used
+    failing = str(candidates[0][0]["id"])
+    monkeypatch.setattr(w, "_api_stream", _fake_api(calls, errors=(failing,)))
+    configure_fetch(chunk_size=2)
+    try:
+        r = observation_for_closest_many(points, num_stations_to_try=2, use_cache=False)
+        # Each candidate station is requested once, in chunks
+        assert sorted(sum(calls, [])) == sorted(ids)
+        assert len(calls) == (len(ids) + 1) // 2
+        assert len(r) == len(points)
+        for p, (o, s) in zip(points, r):
+            o1, s1 = observation_for_closest(*p, num_stations_to_try=2)
+            assert s == s1 and o["results"][0]["id"] == o1["results"][0]["id"]
+        assert r[0][1] == candidates[0][1] and r[3] == r[0]
+        assert r[0][0]["results"][0]["id"] == str(candidates[0][1]["id"])
+        assert r[1][1] in candidates[1]
+
+        del calls[:]
+        r = forecast_for_closest_many([_RVK_COORDS], num_stations_to_try=1)
+        assert calls == [[failing]] and r[0][1] == candidates[0][0]
+        assert observation_for_closest_many([]) == []
+    finally:
+        configure_fetch()
+        clear_cache()
+
+
+def test_aio(monkeypatch):
+    """Test asyncio API with chunked, concurrent fan-out."""
+    import asyncio
+    from iceweather import aio
+
+    calls = []
+    fake = _fake_api(calls, errors=("1",))
+    in_flight = [0, 0]  # Current, max
+
+    async def _fetch_chunk(endpoint, ids, lang, params):
+        async with aio._semaphore():
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+            await asyncio.sleep(0.01)
+            in_flight[0] -= 1
+        url = aio._api_url(endpoint, ids, lang, params)
+        return list(aio.weather._parse_stream(endpoint, fake(url)))
+
+    monkeypatch.setattr(aio, "_fetch_chunk", _fetch_chunk)
+    aio.configure(concurrency=2)
+    clear_cache()
+
+    async def _run():
+        ids = [s["id"] for s in STATIONS[:25]]
+        r = await aio.observation_for_stations(ids, chunk_size=4, use_cache=False)
+        assert [s["id"] for s in r["results"]] == [str(i) for i in ids]
+        assert len(calls) == 7 and in_flight[1] == 2
+
+        r = await aio.observation_for_station(422)
+        assert r["results"][0]["id"] == "422"
+        o, s = await aio.observation_for_closest(*_RVK_COORDS)
+        assert s["id"] != 1 and o["results"][0]["id"] == str(s["id"])
+        del calls[:]
+        r = await aio.observation_for_closest_many([_RVK_COORDS] * 3, use_cache=False)
+        assert len(calls) == 1 and len(calls[0]) == 3
+        assert [x[1] for x in r] == [s] * 3
+        await aio.close()
+
+    try:
+        asyncio.run(_run())
+    finally:
+        aio.configure()
+        clear_cache()
+
+
+def test_aio_http():
+    """Test the asyncio API over HTTP, with retries and session cleanup."""
+    import asyncio
+    import gc
+    import warnings
+
+    import pytest
+    from requests import RequestException
+
+    from iceweather import aio
+    from iceweather.mockserver import MockServer
+    import iceweather.weather as w
+
+    previous = w._base_url
+    with MockServer() as server, warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always", ResourceWarning)
+        set_base_url(server.url)
+        configure_http(retries=1, backoff_factor=0.01)
+        reset_metrics()
+        try:
+            # A 503 response is retried
+            server.fail_next = 1
+            r = asyncio.run(aio.observation_for_stations([1, 422], use_cache=False))
+            assert [s["id"] for s in r["results"]] == ["1", "422"]
+            assert r["results"][0]["name"] == "Reykjavík"
+            assert server.requests == 2
+            m = metrics_snapshot()
+            assert m["iceweather_api_errors_total"][(("endpoint", "obs"),)] == 1
+
+            # Timeouts are retried, then raised as RequestException
+            configure_http(timeout=0.05, retries=1, backoff_factor=0.01)
+            server.latency = 0.2
+            with pytest.raises(RequestException):
+                asyncio.run(aio.observation_for_station(1, use_cache=False))
+            assert server.requests == 4
+            server.latency = 0.0
+
+            # The default session is closed when each event loop shuts down
+            configure_http()
+            r = asyncio.run(aio.forecast_for_station(422, use_cache=False))
+            assert len(r["results"][0]["forecast"]) == 24
+            gc.collect()
+            assert not [x for x in caught if "Unclosed" in str(x.message)]
+        finally:
+            configure_http()
+            configure_circuit_breaker()
+            set_base_url(previous)
+            reset_metrics()
+
+
+def test_chunked_fetch(monkeypatch):
+    """Test splitting of large requests into concurrently fetched chunks."""
+    import iceweather.weather as w
+
+    calls = []
+    monkeypatch.setattr(w, "_api_stream", _fake_api(calls))
+    clear_cache()
+    configure_fetch(chunk_size=30, max_workers=3)
+    try:
+        r = observation_for_all_stations(use_cache=False)
+        assert [s["id"] for s in r["results"]] == [str(s["id"]) for s in STATIONS]
+        assert len(calls) == (len(STATIONS) + 29) // 30
+        assert all(len(c) <= 30 for c in calls)
+
+        # Cached results are merged in input order with fetched chunks
+        observation_for_stations([1, 422])
+        del calls[:]
+        ids = [s["id"] for s in STATIONS[20:40]] + [1, 422]
+        r = observation_for_stations(list(reversed(ids)), chunk_size=5)
+        assert [s["id"] for s in r["results"]] == [str(i) for i in reversed(ids)]
+        assert len(calls) == 4 and "1" not in sum(calls, [])
+    finally:
+        configure_fetch()
+        clear_cache()
+
+
+def test_streaming(monkeypatch):
+    """Test incremental parsing and generator results."""
+    import iceweather.weather as w
+
+    calls = []
+    monkeypatch.setattr(w, "_api_stream", _fake_api(calls))
+    clear_cache()
+    try:
+        observation_for_station(422)
+        it = iter_observations([1, 178, 422, 2481], chunk_size=2)
+        first = next(it)
+        assert first["id"] == "422" and len(calls) == 1  # From cache
+        assert next(it)["id"] == "1" and len(calls) == 2
+        rest = list(it)
+        assert [r["id"] for r in rest] == ["178", "2481"] and len(calls) == 3
+        assert rest[0]["name"] == "Stöð 178"
+        assert rest[0]["W"] == "Skýjað og þurrt"
+        assert cache_stats()["size"] == 4
+
+        # The first result arrives before the rest of the body is read,
+        # with or without a rate limit
+        fake = _fake_api([])
+        pulled = []
+
+        def _api_stream(url):
+            for chunk in fake(url):
+                pulled.append(chunk)
+                yield chunk
+
+        monkeypatch.setattr(w, "_api_stream", _api_stream)
+        for limit in (None, 1):
+            configure_rate_limit(max_in_flight=limit)
+            del pulled[:]
+            it = iter_observations([1, 178, 422], use_cache=False)
+            assert next(it)["id"] == "1"
+            n = len(pulled)
+            assert len(list(it)) == 2 and n < len(pulled)
+    finally:
+        configure_rate_limit()
+        clear_cache()
+
+
+def test_typed_records(monkeypatch):
+    """Test typed result records."""
+    from datetime import datetime, timezone
+    import iceweather.weather as w
+
+    calls = []
+    monkeypatch.setattr(w, "_api_stream", _fake_api(calls))
+    r = observation_for_stations([1, 422], use_cache=False, typed=True)
+    o = r["results"][0]
+    assert isinstance(o, Observation)
+    assert o.id == 1 and o.T == 1.5 and o.valid is True
+    assert o.err is None and o.F is None
+    assert o.W == "Skýjað og þurrt"
+    assert o.as_dict()["T"] == "1,5" and o.as_dict()["id"] == "1"
+    assert Observation.from_dict(o.as_dict()) == o
+    # Only the parameters which were requested are written back
+    p = observation_for_stations([1], use_cache=False, typed=True, params="T;F")
+    raw = observation_for_stations([1], use_cache=False, params="T;F")["results"]
+    assert set(p["results"][0].as_dict()) == set(raw[0])
+    assert [x.id for x in iter_observations([178], typed=True)] == [178]
+
+    d = {
+        "id": "1",
+        "name": "Reykjavík",
+        "valid": "1",
+        "err": "",
+        "atime": "2023-01-09 06:00:00",
+        "forecast": [
+            {"ftime": "2023-01-09 12:00:00", "F": "3", "D": "SSV", "T": "-2,5"},
+            {"ftime": "2023-01-09 13:00:00", "F": "", "D": "", "T": "x"},
+        ],
+    }
+    f = StationForecast.from_dict(d)
+    assert f.atime == datetime(2023, 1, 9, 6, tzinfo=timezone.utc)
+    assert len(f.forecast) == 2 and isinstance(f.forecast[0], ForecastStep)
+    assert f.forecast[0].F == 3.0 and f.forecast[0].T == -2.5
+    assert f.forecast[1].F is None and f.forecast[1].D is None
+    assert f.forecast[1].T is None
+    assert f.as_dict()["forecast"][0]["F"] == "3"
+    assert f.as_dict()["forecast"][0]["T"] == "-2,5"
+    assert set(f.as_dict()["forecast"][0]) == set(d["forecast"][0])
+    assert StationForecast.from_dict(f.as_dict()) == f
+
+
+def test_forecast_columns(monkeypatch):
+    """Test columnar export of forecasts."""
+    from urllib.parse import parse_qs, urlparse
+
+    import numpy as np
+    import iceweather.weather as w
+    import iceweather.columnar as c
+
+    stations = {
+        "1": '<station id="1" valid="1"><name>Reykjavík</name>'
+        "<atime>2023-01-09 06:00:00</atime><err></err>"
+        "<forecast><ftime>2023-01-09 12:00:00</ftime><F>3</F><D>SSV</D>"
+        "<T>-2.5</T></forecast>"
+        "<forecast><ftime>2023-01-09 13:00:00</ftime><F>4</F><D>S</D>"
+        "<T></T></forecast></station>",
+        "422": '<station id="422" valid="1"><name>Akureyri</name>'
+        "<forecast><ftime>2023-01-09 13:00:00</ftime><F>7</F><D>N</D>"
+        "<T>1</T></forecast>"
+        "<forecast><ftime>2023-01-09 15:00:00</ftime><F>8</F><D></D>"
+        "<T>2</T></forecast></station>",
+    }
+    calls = []
+
+    def _api_stream(url):
+        ids = parse_qs(urlparse(url).query)["ids"][0].split(";")
+        calls.append(ids)
+        body = "<forecasts>" + "".join(stations[i] for i in ids) + "</forecasts>"
+        yield body.encode("utf-8")
+
+    monkeypatch.setattr(w, "_api_stream", _api_stream)
+    monkeypatch.setattr(c, "_api_stream", _api_stream)
+    clear_cache()
+    r = forecast_columns([1, 422], use_cache=False)
+    assert r["ids"].tolist() == [1, 422]
+    assert r["times"].dtype == np.dtype("datetime64[s]")
+    assert [str(t) for t in r["times"]] == [
+        "2023-01-09T12:00:00",
+        "2023-01-09T13:00:00",
+        "2023-01-09T15:00:00",
+    ]
+    v = r["values"]
+    assert set(v) == {"F", "D", "T"}
+    assert np.array_equal(v["F"], [[3, 4, np.nan], [np.nan, 7, 8]], equal_nan=True)
+    assert np.array_equal(
+        v["T"], [[-2.5, np.nan, np.nan], [np.nan, 1, 2]], equal_nan=True
+    )
+    assert v["D"].tolist() == [["SSV", "S", None], [None, "N", None]]
+    assert set(forecast_columns([1, 422], params=["T"], use_cache=False)["values"]) == {
+        "T"
+    }
+    # Chunks are fetched concurrently
+    del calls[:]
+    r = forecast_columns([1, 422], use_cache=False, chunk_size=1)
+    assert sorted(calls) == [["1"], ["422"]] and r["ids"].tolist() == [1, 422]
+    assert np.array_equal(r["values"]["F"], v["F"], equal_nan=True)
+
+    # Cached results are used, in the requested station order
+    try:
+        forecast_for_station(422)
+        del calls[:]
+        r = forecast_columns([1, 422])
+        assert calls == [["1"]] and r["ids"].tolist() == [1, 422]
+        assert np.array_equal(r["values"]["F"], v["F"], equal_nan=True)
+        assert r["values"]["D"].tolist() == v["D"].tolist()
+        # Results from the API aren't cached here
+        assert cache_stats()["size"] == 1
+    finally:
+        clear_cache()
+
+
+def test_params(monkeypatch):
+    """Test selection of weather parameters."""
+    import pytest
+    import iceweather.weather as w
+
+    urls = []
+    fake = _fake_api([])
+
+    def _api_stream(url):
+        urls.append(url)
+        return fake(url)
+
+    monkeypatch.setattr(w, "_api_stream", _api_stream)
+    clear_cache()
+    try:
+        observation_for_station(1, params=["T", "F"])
+        assert urls[-1].endswith("&params=F;T")
+        observation_for_station(1, params="T;F")
+        assert len(urls) == 1  # Cached
+        observation_for_station(1)
+        assert urls[-1].endswith("&params=" + ";".join(PARAMS))
+        forecast_for_station(1, params=("D", "T", "T"))
+        assert "type=forec" in urls[-1] and urls[-1].endswith("&params=D;T")
+        with pytest.raises(ValueError):
+            observation_for_station(1, params=["T", "X"])
+        with pytest.raises(ValueError):
+            observation_for_station(1, params=[])
+    finally:
+        clear_cache()
+
+
+def test_refresher(monkeypatch):
+    """Test adaptive background refreshing of station data."""
+    from datetime import datetime, timedelta, timezone
+    import iceweather.weather as w
+
+    calls = []
+    # Station 1 reports every 10 minutes, station 422 every hour
+    start = datetime(2023, 1, 9, 12, 0, tzinfo=timezone.utc)
+    clock = [0.0]
+
+    def now():
+        return start + timedelta(seconds=clock[0])
+
+    def data_time(i):
+        step = 600 if i == "1" else 3600
+        return start + timedelta(seconds=clock[0] // step * step)
+
+    def _api_stream(url):
+        from urllib.parse import parse_qs, urlparse
+
+        ids = parse_qs(urlparse(url).query)["ids"][0].split(";")
+        calls.append(ids)
+        yield (
+            "<observations>"
+            + "".join(
+                f'<station id="{i}" valid="1"><err></err>'
+                f"<time>{data_time(i):%Y-%m-%d %H:%M:%S}</time><T>1</T></station>"
+                for i in ids
+            )
+            + "</observations>"
+        ).encode("utf-8")
+
+    monkeypatch.setattr(w, "_api_stream", _api_stream)
+    clear_cache()
+    received = []
+    r = Refresher((1, 422), forecasts=False, clock=lambda: clock[0], now=now, grace=30)
+    r.subscribe(lambda endpoint, result: received.append((endpoint, result["id"])))
+    try:
+        assert r.refresh_due() == 2
+        assert calls == [["1", "422"]]
+        assert received == [("obs", "1"), ("obs", "422")]
+        # Refreshed data is served from the cache
+        observation_for_stations((1, 422))
+        assert len(calls) == 1
+
+        # Poll for a few hours; once the cadence of each station has been
+        # seen, station 1 is polled far more often than station 422
+        first_hour = 0
+        while clock[0] < 4 * 3600:
+            clock[0] = max(clock[0] + 1, r.next_due())
+            r.refresh_due()
+            if clock[0] < 3600 + 60:
+                first_hour = len(calls)
+        # Polls in the last three hours, after the first new data was seen
+        recent = calls[first_hour:]
+        polls_1 = sum("1" in c for c in recent)
+        polls_422 = sum("422" in c for c in recent)
+        assert polls_1 >= 3 * 6
+        assert polls_422 <= 4
+        # Every new observation was delivered exactly once
+        assert received.count(("obs", "1")) == 4 * 6 + 1
+        assert received.count(("obs", "422")) in (4, 5)
+    finally:
+        clear_cache()
+
+
+def test_observation_store(tmp_path, monkeypatch):
+    """Test the SQLite observation history store."""
+    from datetime import datetime, timezone
+    import iceweather.weather as w
+
+    def obs(i, hour, t):
+        return {
+            "id": str(i),
+            "valid": "1",
+            "err": "",
+            "time": f"2023-01-09 {hour:02}:00:00",
+            "T": t,
+            "D": "SSV",
+            "F": "",
+        }
+
+    path = str(tmp_path / "history.db")
+    with ObservationStore(path) as store:
+        assert store.add([obs(1, h, f"{h},5") for h in range(10)]) == 10
+        # Duplicates and error results are skipped
+        dup = [obs(1, 3, "99"), obs(422, 3, "-1"), {"id": "2", "err": "Villa"}]
+        assert store.add(dup) == 1
+        assert store.add([Observation.from_dict(obs(422, 4, "-2"))]) == 1
+        assert len(store) == 12
+
+    with ObservationStore(path) as store:
+        h = store.history(1, "2023-01-09 02:00:00", datetime(2023, 1, 9, 5))
+        assert h["times"] == [
+            datetime(2023, 1, 9, hour, tzinfo=timezone.utc) for hour in (2, 3, 4)
+        ]
+        assert h["values"]["T"] == [2.5, 3.5, 4.5]
+        assert h["values"]["D"] == ["SSV"] * 3
+        assert h["values"]["F"] == [None] * 3
+        h = store.history("422", params=["T"])
+        assert h["values"] == {"T": [-1.0, -2.0]}
+        assert store.history(178) == {
+            "times": [],
+            "values": {p: [] for p in PARAMS},
+        }
+
+        monkeypatch.setattr(w, "_api_stream", _fake_api([]))
+        clear_cache()
+        try:
+            # The fake API returns no observation time
+            assert store.record([1, 422]) == 0
+        finally:
+            clear_cache()
+
+
+def test_station_table():
+    """Test the compact, lazily loaded station table."""
+    import subprocess
+    import sys
+    from iceweather.stations import station_table
+
+    table = station_table()
+    assert len(table) == len(STATIONS) == len(station_list())
+    for i, s in enumerate(STATIONS):
+        assert table.station(i) == s
+        assert table.index_for_id(s["id"]) == STATIONS.index(station_for_id(s["id"]))
+        assert s in stations_for_name(s["name"])
+    assert table.index_for_id(-1) is None
+    assert table.indices_for_name("Ásgarður") == [8, 9]
+    assert station_list() is STATIONS
+
+    # Importing the package does not load the station table
+    code = (
+        "import iceweather, iceweather.stations as s; "
+        "assert s._table is None and s._stations is None; "
+        "assert len(iceweather.STATIONS) == len(s._table)"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+# Budget (in microseconds) for importing the package and the modules
+# needed for offline station lookups. Typically a few milliseconds.
+_LOOKUP_IMPORT_BUDGET_US = 100_000
+
+
+def test_import_time():
+    """Test that station lookups don't import the network and parsing
+    dependencies, and stay within the import time budget."""
+    import subprocess
+    import sys
+
+    heavy = ("requests", "xml.etree.ElementTree", "concurrent.futures", "sqlite3")
+    code = (
+        "import sys, iceweather; "
+        "iceweather.closest_stations(64.1, -21.9); iceweather.station_for_id(1); "
+        "iceweather.stations_for_name('Akureyri'); "
+        f"print(','.join(m for m in {heavy!r} if m in sys.modules))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert proc.stdout.strip() == ""
+
+    # Sum the cumulative times of top-level imports from iceweather onwards
+    total = 0
+    seen = False
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if name.strip() == "iceweather":
+            seen = True
+        if seen and not name.startswith("  "):
+            total += int(cumulative)
+    assert seen
+    assert total < _LOOKUP_IMPORT_BUDGET_US
+
+
+def test_submodule_attributes():
+    """Test that submodules are available as attributes of the package
+    without importing them explicitly."""
+    import subprocess
+    import sys
+
+    code = (
+        "import iceweather; "
+        "assert iceweather.weather.observation_for_station; "
+        "assert iceweather.stations.station_table; "
+        "assert iceweather.util.distance; "
+        "assert not hasattr(iceweather, 'nosuchmodule')"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_mock_server():
+    """Test the local stand-in for the weather API."""
+    import requests
+    from iceweather.mockserver import MockServer
+    import iceweather.weather as w
+
+    previous = w._base_url
+    set_base_url(None)
+    assert w._api_url("obs", ["1"], "is").startswith("https://xmlweather.vedur.is/?")
+
+    with MockServer(br_rate=1.0, station_error_rate=1.0, seed=7) as server:
+        set_base_url(server.url)
+        try:
+            assert w._api_url("obs", ["1"], "is").startswith(server.url + "?op_w=xml")
+            r = observation_for_stations([1, 999999], use_cache=False)["results"]
+            assert [s["id"] for s in r] == ["1", "999999"]
+            assert r[0]["valid"] == "1" and r[0]["name"] == "Reykjavík" and r[0]["err"]
+            assert r[1]["valid"] == "0" and r[1]["err"] and not r[1]["name"]
+            assert server.requests == 1
+
+            server.station_error_rate = 0.0
+            r = observation_for_station(1, "en", use_cache=False, params=["T", "W"])
+            s = r["results"][0]
+            assert not s["err"] and "F" not in s
+            assert s["W"] == "" or "<br" not in s["W"] and "  " not in s["W"]
+            f = forecast_for_station(422, use_cache=False)["results"][0]
+            assert len(f["forecast"]) == 24
+            assert set(f["forecast"][0]) == {
+                "ftime",
+                "F",
+                "D",
+                "T",
+                "W",
+                "N",
+                "TD",
+                "R",
+            }
+
+            server.error_rate = 1.0
+            assert requests.get(w._api_url("txt", ["2"], "is")).status_code == 503
+            server.error_rate = 0.0
+            assert requests.get(server.url + "?op_w=xml&type=x").status_code == 400
+        finally:
+            set_base_url(previous)
+
+
+def test_metrics(monkeypatch):
+    """Test instrumentation of API calls."""
+    import pytest
+    from requests import RequestException
+    import iceweather.metrics as metrics
+    import iceweather.weather as w
+
+    records = []
+
+    def _bad_hook(record):
+        raise RuntimeError("Errors in hooks are ignored")
+
+    monkeypatch.setattr(w, "_api_stream", _fake_api([]))
+    clear_cache()
+    reset_metrics()
+    add_call_hook(records.append)
+    add_call_hook(_bad_hook)
+    try:
+        observation_for_stations([1, 422])
+        observation_for_stations([1, 422, 178])
+        assert [(r.endpoint, r.ids, r.results, r.error) for r in records] == [
+            ("obs", 2, 2, None),
+            ("obs", 1, 1, None),
+        ]
+        r = records[0]
+        assert "ids=1;422" in r.url and r.bytes > 100
+        assert r.wait > 0 and r.parse > 0 and r.total >= r.wait + r.parse
+
+        def _failing(url):
+            yield b"<observations>"
+            raise RequestException("API status code 503")
+
+        monkeypatch.setattr(w, "_api_stream", _failing)
+        with pytest.raises(RequestException):
+            observation_for_station(2)
+        assert records[-1].error == "API status code 503"
+
+        m = metrics_snapshot()
+        obs = (("endpoint", "obs"),)
+        assert m["iceweather_api_calls_total"][obs] == 3
+        assert m["iceweather_api_errors_total"][obs] == 1
+        assert m["iceweather_api_ids_requested_total"][obs] == 4
+        assert m["iceweather_api_results_total"][obs] == 3
+        assert m["iceweather_cache_hits_total"][obs] == 2
+        assert m["iceweather_cache_misses_total"][obs] == 4
+        wait = m["iceweather_api_phase_seconds"][obs + (("phase", "wait"),)]
+        assert wait["count"] == 3 and wait["buckets"][float("inf")] == 3
+
+        text = prometheus_metrics()
+        assert "# TYPE iceweather_api_phase_seconds histogram" in text
+        assert 'iceweather_api_calls_total{endpoint="obs"} 3\n' in text
+        assert (
+            'iceweather_api_phase_seconds_bucket{endpoint="obs",phase="parse",le="+Inf"} 3'
+            in text
+        )
+    finally:
+        remove_call_hook(records.append)
+        remove_call_hook(_bad_hook)
+        assert not metrics._hooks
+        clear_cache()
+
+
+def test_interpolation(monkeypatch):
+    """Test inverse distance weighted observations at arbitrary locations."""
+    from urllib.parse import parse_qs, urlparse
+
+    import iceweather.weather as w
+    from iceweather.records import direction_name, parse_direction
+
+    calls = []
+
+    def _api_stream(url):
+        # Temperature is the station ID; wind from the north or east
+        # for even and odd IDs, except at stations with errors
+        ids = parse_qs(urlparse(url).query)["ids"][0].split(";")
+        calls.append(ids)
+        yield (
+            '<?xml version="1.0" encoding="utf-8"?><observations>'
+            + "".join(
+                f'<station id="{i}" valid="1"><name>Stöð {i}</name>'
+                f"<err>{'Villa' if int(i) % 5 == 0 else ''}</err>"
+                f"<T>{i}</T><D>{'N' if int(i) % 2 == 0 else 'A'}</D></station>"
+                for i in ids
+            )
+            + "</observations>"
+        ).encode("utf-8")
+
+    assert parse_direction("SSV") == parse_direction("SSW") == 202.5
+    assert parse_direction("Logn") is None and parse_direction("") is None
+    assert direction_name(359.0) == "N" and direction_name(100.0, "en") == "E"
+
+    monkeypatch.setattr(w, "_api_stream", _api_stream)
+    clear_cache()
+    try:
+        r = observation_at(*_RVK_COORDS, k=4, use_cache=False)
+        assert len(calls) == 1 and len(calls[0]) == 4
+        assert 0 < len(r["stations"]) <= 4
+        assert abs(sum(s["weight"] for s in r["stations"]) - 1.0) < 1e-9
+        assert all(s["id"] % 5 != 0 for s in r["stations"])
+        dists = [s["distance"] for s in r["stations"]]
+        weights = [s["weight"] for s in r["stations"]]
+        assert dists == sorted(dists) and weights == sorted(weights, reverse=True)
+        expected = sum(s["id"] * s["weight"] for s in r["stations"])
+        assert abs(r["values"]["T"] - expected) < 1e-9
+        assert r["values"]["F"] is None and "W" not in r["values"]
+
+        # Wind direction is a vector mean of north (0) and east (90)
+        north = sum(s["weight"] for s in r["stations"] if s["id"] % 2 == 0)
+        if 0 < north < 1:
+            assert 0 < r["wind_direction"] < 90
+        assert r["values"]["D"] == direction_name(r["wind_direction"])
+
+        # At a station's location, its observation is returned as is
+        s = next(s for s in STATIONS if s["id"] % 5 != 0)
+        r = observation_at(s["lat"], s["lon"], params=["T", "D"], lang="en")
+        assert r["values"] == {"T": s["id"], "D": "N" if s["id"] % 2 == 0 else "E"}
+        assert [(x["id"], x["weight"]) for x in r["stations"]] == [(s["id"], 1.0)]
+
+        # Batched interpolation fetches all neighbours at once
+        del calls[:]
+        points = [_RVK_COORDS, _SELTJ_COORDS, (65.68, -18.1), (64.25, -15.2)]
+        many = observations_at(points, k=3, use_cache=False)
+        assert len(calls) == 1 and len(calls[0]) == len(set(calls[0])) <= 12
+        for p, r in zip(points, many):
+            assert (r["lat"], r["lon"]) == p
+            assert r == observation_at(*p, k=3)
+        assert observations_at([]) == []
+    finally:
+        clear_cache()
+
+
+def test_grid(monkeypatch):
+    """Test gridded interpolation of observations from all stations."""
+    import numpy as np
+
+    import iceweather.weather as w
+    from iceweather.grid import _grid_weights
+    from iceweather.stations import station_table
+
+    table = station_table()
+    ids = np.asarray(table.ids, dtype=float)
+
+    # With k=1, each cell gets the value of its nearest station
+    grid = Grid(resolution=0.5, k=1)
+    assert grid.shape == (len(grid.lats), len(grid.lons)) == (8, 24)
+    assert grid.lats[0] == 63.2 and abs(grid.lats[-1] - 66.7) < 1e-9
+    raster = grid.interpolate(ids)
+    assert raster.shape == grid.shape
+    for i in (0, 3, 7):
+        for j in (0, 10, 23):
+            nearest = closest_stations(grid.lats[i], grid.lons[j])[0]
+            assert abs(raster[i, j] - nearest["id"]) < 1e-6
+
+    # Missing values are skipped, with the remaining weights renormalized
+    grid = Grid(resolution=0.5)
+    values = np.column_stack([np.ones(len(ids)), np.full(len(ids), np.nan)])
+    values[::2, 0] = np.nan
+    raster = grid.interpolate(values)
+    assert raster.shape == (2,) + grid.shape
+    assert np.allclose(raster[0], 1.0) and np.isnan(raster[1]).all()
+
+    # Weights are computed once per grid configuration
+    hits = _grid_weights.cache_info().hits
+    Grid(resolution=0.5)
+    assert _grid_weights.cache_info().hits == hits + 1
+
+    # Distant cells have no value if max_distance is given
+    r = Grid(resolution=0.5, max_distance=20).interpolate(ids)
+    assert np.isnan(r).any() and not np.isnan(r).all()
+
+    from urllib.parse import parse_qs, urlparse
+
+    calls = []
+
+    def _api_stream(url):
+        # Temperature is the station ID; wind from the east everywhere
+        ids = parse_qs(urlparse(url).query)["ids"][0].split(";")
+        calls.append(ids)
+        yield (
+            '<?xml version="1.0" encoding="utf-8"?><observations>'
+            + "".join(
+                f'<station id="{i}" valid="1"><name>Stöð {i}</name><err></err>'
+                f"<T>{i}</T><D>A</D></station>"
+                for i in ids
+            )
+            + "</observations>"
+        ).encode("utf-8")
+
+    monkeypatch.setattr(w, "_api_stream", _api_stream)
+    clear_cache()
+    try:
+        r = grid_observations(resolution=0.5, k=1, params="T;F;D", use_cache=False)
+        assert sum(len(c) for c in calls) == len(STATIONS)
+        assert list(r["values"]) == ["F", "T"]
+        assert np.isnan(r["values"]["F"]).all()
+        assert np.allclose(r["values"]["T"], Grid(0.5, k=1).interpolate(ids))
+        assert np.allclose(r["wind_direction"], 90.0)
+        r = grid_observations(resolution=0.5, params=["T"], use_cache=False)
+        assert "wind_direction" not in r and r["values"]["T"].shape == (8, 24)
+    finally:
+        clear_cache()
+
+
+def test_rate_limit(monkeypatch):
+    """Test the shared rate limiter and concurrency cap for API calls."""
+    import asyncio
+    import threading
+    import time
+
+    import iceweather.weather as w
+    from iceweather.ratelimit import RateLimit
+
+    # Token bucket: a burst, then one call per 1/rate seconds, in order
+    clock = [0.0]
+    lim = RateLimit(rate=10, burst=2, clock=lambda: clock[0])
+    assert [round(lim._reserve(), 6) for _ in range(4)] == [0, 0, 0.1, 0.2]
+    clock[0] = 1.0
+    assert lim._reserve() == 0
+
+    # Threads are capped by max_in_flight, and queued time is recorded
+    calls = []
+    fake = _fake_api(calls)
+    in_flight = [0, 0]  # Current, max
+    lock = threading.Lock()
+
+    def _api_stream(url):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+        time.sleep(0.01)
+        yield from fake(url)
+        with lock:
+            in_flight[0] -= 1
+
+    monkeypatch.setattr(w, "_api_stream", _api_stream)
+    configure_fetch(chunk_size=2, max_workers=6)
+    configure_rate_limit(max_in_flight=2)
+    configure_rate_limit(rate=100, burst=1, endpoint="obs")
+    reset_metrics()
+    try:
+        assert set(rate_limits()) == {None, "obs"}
+        ids = [s["id"] for s in STATIONS[:24]]
+        t0 = time.perf_counter()
+        r = observation_for_stations(ids, use_cache=False)
+        assert len(r["results"]) == 24 and len(calls) == 12
+        assert in_flight[1] == 2
+        # 12 calls at 100 per second
+        assert time.perf_counter() - t0 >= 0.1
+        m = metrics_snapshot()["iceweather_api_phase_seconds"]
+        queued = m[(("endpoint", "obs"), ("phase", "queued"))]
+        assert queued["count"] == 12 and queued["sum"] > 0.1
+        assert rate_limits()[None].in_flight == 0
+
+        # The slot is released before results are yielded, so API calls
+        # made while iterating don't wait for the iterator's own call
+        configure_rate_limit(max_in_flight=1)
+        nested = []
+
+        def _iterate():
+            for o in iter_observations(ids[:2], use_cache=False):
+                nested.append(observation_for_station(o["id"], use_cache=False))
+
+        t = threading.Thread(target=_iterate, daemon=True)
+        t.start()
+        t.join(5)
+        assert not t.is_alive() and len(nested) == 2
+    finally:
+        configure_rate_limit()
+        configure_rate_limit(endpoint="obs")
+        configure_fetch()
+        reset_metrics()
+    assert rate_limits() == {}
+
+    # The same limit is shared by threads and asyncio tasks
+    lim = RateLimit(max_in_flight=1)
+    lim.acquire()
+    order = []
+
+    async def _task(name):
+        await lim.acquire_async()
+        order.append(name)
+        await asyncio.sleep(0.01)
+        lim.release()
+
+    async def _run():
+        t1 = asyncio.ensure_future(_task("a"))
+        t2 = asyncio.ensure_future(_task("b"))
+        t3 = asyncio.ensure_future(_task("c"))
+        await asyncio.sleep(0.01)
+        assert order == [] and len(lim._waiters) == 3
+        # Cancelled waiters give up their place without leaking a slot
+        t2.cancel()
+        threading.Timer(0.01, lim.release).start()
+        await asyncio.gather(t1, t3)
+        assert t2.cancelled()
+
+    asyncio.run(_run())
+    assert order == ["a", "c"] and lim.in_flight == 0 and not lim._waiters
+
+
+def test_circuit_breaker(monkeypatch):
+    """Test the circuit breaker and stale results fallback."""
+    import asyncio
+
+    import pytest
+    from requests import RequestException
+
+    import iceweather.weather as w
+    from iceweather import aio
+    from iceweather.breaker import CircuitBreaker
+    from iceweather.cache import DEFAULT_TTLS
+
+    clock = [0.0]
+    b = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: clock[0])
+    b.record_failure()
+    assert b.state == "closed" and b.allow()
+    b.record_failure()
+    assert b.state == "open" and not b.allow()
+    clock[0] = 10.0
+    assert b.state == "half-open"
+    # A single trial call is let through; if it fails, the circuit stays open
+    assert b.allow() and not b.allow()
+    b.record_failure()
+    clock[0] = 19.0
+    assert not b.allow()
+    clock[0] = 20.0
+    assert b.allow()
+    b.record_success()
+    assert b.state == "closed" and b.allow()
+
+    calls = []
+    monkeypatch.setattr(w, "_api_stream", _fake_api(calls))
+    clear_cache()
+    reset_metrics()
+    configure_circuit_breaker(failure_threshold=2, reset_timeout=60)
+    assert w._max_stale_age == 3600
+    try:
+        fresh = observation_for_stations([1, 422])["results"]
+        assert "stale" not in fresh[0]
+
+        def _failing(url):
+            calls.append(url)
+            raise RequestException("API status code 503")
+            yield b""
+
+        # Cached results have expired and the API fails: serve them anyway
+        configure_cache(ttls={"obs": 0})
+        monkeypatch.setattr(w, "_api_stream", _failing)
+        r = observation_for_stations([1, 422])["results"]
+        assert len(calls) == 2 and circuit_state() == "closed"
+        assert [s["id"] for s in r] == ["1", "422"]
+        assert all(s["stale"] and s["age"] >= 0 for s in r)
+        assert r[0]["T"] == fresh[0]["T"]
+        # Stale results are not stored back in the cache
+        assert w._CACHE.get_stale(("obs", "1", "is", w._ALL_PARAMS))[0] == fresh[0]
+
+        # No fallback without the cache; stations not in it get the error
+        with pytest.raises(RequestException):
+            observation_for_stations([1], use_cache=False)
+        assert circuit_state() == "open" and len(calls) == 3
+        r = observation_for_stations([1, 178])["results"]
+        assert [s["id"] for s in r] == ["1", "178"] and r[0]["stale"]
+        assert r[1]["valid"] == "0" and r[1]["err"].startswith("Circuit open")
+        o = observation_for_stations([1, 178], typed=True)["results"]
+        assert o[0].stale and o[0].age >= 0 and o[0].as_dict()["stale"]
+        assert not o[1].stale and o[1].age is None and "stale" not in o[1].as_dict()
+        with pytest.raises(CircuitOpenError):
+            list(iter_observations([178]))
+
+        # The API isn't called while the circuit is open
+        r = list(iter_observations([1, 422]))
+        assert len(calls) == 3 and all(s["stale"] for s in r)
+        rvk = station_for_id(1)
+        o, s = observation_for_closest(rvk["lat"], rvk["lon"], num_stations_to_try=1)
+        assert len(calls) == 3 and o["results"][0]["stale"]
+
+        async def _run():
+            r = await aio.observation_for_stations([422])
+            await aio.close()
+            return r
+
+        assert asyncio.run(_run())["results"][0]["stale"]
+        m = metrics_snapshot()
+        assert m["iceweather_circuit_open_total"][(("endpoint", "obs"),)] >= 5
+        assert m["iceweather_stale_results_total"][(("endpoint", "obs"),)] >= 6
+
+        # Results older than max_stale_age aren't served
+        configure_circuit_breaker(failure_threshold=2, max_stale_age=0.0)
+        with pytest.raises(RequestException):
+            observation_for_stations([1])
+        assert len(calls) == 4
+
+        configure_circuit_breaker(enabled=False, serve_stale=False)
+        assert circuit_state() is None
+        with pytest.raises(RequestException):
+            observation_for_stations([1])
+        assert len(calls) == 5
+    finally:
+        configure_circuit_breaker()
+        configure_cache(ttls=DEFAULT_TTLS)
+        clear_cache()
+        reset_metrics()
+
+
+def test_dead_stations(tmp_path, capsys, weather_api):
+    """Test the station health check and skipping of dead stations."""
+    import importlib.util
+    import json
+    import os
+
+    nearest = closest_stations(*_RVK_COORDS, limit=3)
+    ids = [s["id"] for s in nearest]
+    try:
+        set_dead_stations([ids[0], str(ids[1])])
+        assert dead_stations() == frozenset(ids[:2])
+        assert closest_stations(*_RVK_COORDS)[0]["id"] == ids[2]
+        assert closest_stations_many([_RVK_COORDS])[0][0]["id"] == ids[2]
+        o, s = observation_for_closest(*_RVK_COORDS, use_cache=False)
+        assert s["id"] == ids[2]
+        # Lookups by ID are unaffected
+        assert station_for_id(ids[0])["id"] == ids[0]
+        set_dead_stations([])
+        assert closest_stations(*_RVK_COORDS)[0]["id"] == ids[0]
+
+        # With no stations left, closest station lookups find nothing
+        set_dead_stations(s["id"] for s in STATIONS)
+        assert closest_stations(*_RVK_COORDS) == []
+        assert closest_stations_many([_RVK_COORDS, _SELTJ_COORDS]) == [[], []]
+        assert observation_for_closest(*_RVK_COORDS) == ({"results": []}, {})
+        r = forecast_for_closest_many([_RVK_COORDS])
+        assert r == [({"results": []}, {})]
+        set_dead_stations([])
+
+        # Check all stations against the mock server (see conftest.py)
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        spec = importlib.util.spec_from_file_location(
+            "check_stations", os.path.join(root, "check_stations.py")
+        )
+        check = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(check)
+        if os.environ.get("ICEWEATHER_LIVE_TESTS") == "1":
+            return
+        report = tmp_path / "report.json"
+        dead = tmp_path / "dead.json"
+        args = ["--report", str(report), "--dead-list", str(dead), "--threshold", "2"]
+        try:
+            assert check.main(args + ["--chunk-size", "100"]) == 0
+            first = json.loads(report.read_text("utf-8"))
+            assert len(first["stations"]) == len(STATIONS) and first["dead"] == []
+            s = first["stations"][0]
+            assert set(s) == {
+                "id",
+                "name",
+                "status",
+                "err",
+                "valid",
+                "time",
+                "age",
+                "failures",
+            }
+            assert s["status"] == "ok" and s["valid"] and s["age"] >= 0
+            assert json.loads(dead.read_text()) == []
+
+            # Pretend the first station also failed the previous check
+            first["stations"][0]["failures"] = 1
+            report.write_text(json.dumps(first), "utf-8")
+            assert check.main(args + ["--max-age", "0"]) == 0
+            second = json.loads(report.read_text("utf-8"))
+            assert {s["status"] for s in second["stations"]} == {"old"}
+            assert second["dead"] == [first["stations"][0]["id"]]
+            assert "dead" in capsys.readouterr().out
+
+            assert load_dead_stations(str(dead)) == frozenset(second["dead"])
+            assert load_dead_stations(str(report)) == frozenset(second["dead"])
+
+            # Failed API calls only affect the stations in them, and don't
+            # count as failures of those stations
+            report.unlink()
+            # One API call per chunk, however large
+            requests = weather_api.requests
+            assert len(
+                check.check_stations(chunk_size=len(STATIONS), workers=1)
+            ) == len(STATIONS)
+            assert weather_api.requests == requests + 1
+            configure_http(retries=0)
+            weather_api.fail_next = 5
+            assert check.main(args + ["--chunk-size", "10", "--threshold", "1"]) == 0
+            third = json.loads(report.read_text("utf-8"))["stations"]
+            assert len(third) == len(STATIONS)
+            unavailable = [s for s in third if s["status"] == "unavailable"]
+            assert len(unavailable) == 50
+            assert all("503" in s["err"] and s["failures"] == 0 for s in unavailable)
+            assert all(s["status"] == "ok" for s in third if s not in unavailable)
+            assert json.loads(dead.read_text()) == []
+        finally:
+            configure_fetch()
+            configure_http()
+            configure_circuit_breaker()
+    finally:
+        set_dead_stations([])